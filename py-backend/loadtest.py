@@ -0,0 +1,153 @@
+"""
+Mixed-traffic load test for the API
+Runs a weighted mix of read endpoints (plus an optional write) at increasing
+concurrency levels and prints throughput and latency per level, so the gain
+from non-blocking handlers is visible: with a blocking driver throughput stays
+flat as concurrency grows, with motor it scales until the pool/DB saturates.
+
+Usage:
+    python loadtest.py --token <jwt> --project-id <id> --concurrency 1 8 32 64
+    python loadtest.py --base-url http://localhost:8000 --duration 20 --with-writes
+"""
+
+import os
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from collections import defaultdict
+from typing import List, Dict, Tuple, Optional
+
+import httpx
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def build_mix(project_ids: List[str], with_writes: bool) -> List[Tuple[str, str, str, Optional[dict], int]]:
+    """(label, method, path, json body, weight) for each request type."""
+    mix = [
+        ("health", "GET", "/health", None, 1),
+        ("candidate_me", "GET", "/api/candidate/me", None, 3),
+        ("my_applications", "GET", "/api/applications/mine", None, 3),
+        ("my_projects", "GET", "/api/get-my-projects", None, 2),
+        ("application_counts", "GET", "/api/applications/counts-for-my-projects", None, 1),
+        ("relevant_projects", "GET", "/api/candidate/relevant-projects?top_k=20", None, 2),
+    ]
+    for project_id in project_ids:
+        mix.append(("project", "GET", f"/api/project/{project_id}", None, 2))
+        mix.append(("applicants", "GET", f"/api/applications/by-project/{project_id}", None, 2))
+        mix.append(("ranked_candidates", "POST", "/api/get-ranked-candidates",
+                    {"project_id": project_id, "top_k": 20}, 1))
+        if with_writes:
+            mix.append(("apply", "POST", "/api/applications/apply", {"project_id": project_id}, 1))
+    return mix
+
+
+async def _worker(client: httpx.AsyncClient, mix, deadline: float,
+                  latencies: Dict[str, List[float]], errors: Dict[str, int]):
+    weights = [item[4] for item in mix]
+    while time.perf_counter() < deadline:
+        label, method, path, body, _ = random.choices(mix, weights=weights)[0]
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, json=body)
+            if response.status_code >= 500:
+                errors[label] += 1
+        except httpx.HTTPError:
+            errors[label] += 1
+            continue
+        latencies[label].append(time.perf_counter() - started)
+
+
+async def run_level(base_url: str, token: Optional[str], mix, concurrency: int, duration: float) -> Dict:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    cookies = {"token": token} if token else None
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, cookies=cookies, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*[_worker(client, mix, deadline, latencies, errors) for _ in range(concurrency)])
+
+    everything = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "concurrency": concurrency,
+        "requests": len(everything),
+        "errors": sum(errors.values()),
+        "throughput": len(everything) / duration,
+        "p50_ms": _percentile(everything, 50) * 1000,
+        "p95_ms": _percentile(everything, 95) * 1000,
+        "p99_ms": _percentile(everything, 99) * 1000,
+        "per_endpoint": {
+            label: {
+                "count": len(samples),
+                "mean_ms": statistics.mean(samples) * 1000 if samples else 0.0,
+                "p95_ms": _percentile(samples, 95) * 1000,
+                "errors": errors.get(label, 0),
+            }
+            for label, samples in sorted(latencies.items())
+        },
+    }
+
+
+async def discover_project_ids(base_url: str, token: Optional[str], limit: int) -> List[str]:
+    if not token:
+        return []
+    async with httpx.AsyncClient(base_url=base_url, cookies={"token": token}, timeout=30) as client:
+        try:
+            response = await client.get("/api/get-my-projects")
+            projects = response.json().get("projects", [])
+        except (httpx.HTTPError, ValueError):
+            return []
+    return [str(p["_id"]) for p in projects[:limit]]
+
+
+async def main_async(args):
+    project_ids = args.project_id or await discover_project_ids(args.base_url, args.token, limit=5)
+    mix = build_mix(project_ids, args.with_writes)
+    print(f"Target {args.base_url}, {len(project_ids)} projects, {len(mix)} request types, {args.duration:.0f}s per level")
+
+    results = []
+    for concurrency in args.concurrency:
+        result = await run_level(args.base_url, args.token, mix, concurrency, args.duration)
+        results.append(result)
+        print(
+            f"  c={concurrency:<4} {result['throughput']:8.1f} req/s  "
+            f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms  "
+            f"p99 {result['p99_ms']:7.1f} ms  errors {result['errors']}"
+        )
+        if args.verbose:
+            for label, stats in result["per_endpoint"].items():
+                print(
+                    f"      {label:<20} n={stats['count']:<6} mean {stats['mean_ms']:7.1f} ms  "
+                    f"p95 {stats['p95_ms']:7.1f} ms  errors {stats['errors']}"
+                )
+
+    baseline = results[0]["throughput"] if results and results[0]["throughput"] else 0.0
+    if baseline:
+        print("Throughput relative to first level:")
+        for result in results:
+            print(f"  c={result['concurrency']:<4} x{result['throughput'] / baseline:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mixed-traffic load test at several concurrency levels.")
+    parser.add_argument("--base-url", default=os.getenv("LOADTEST_BASE_URL", "http://localhost:8000"))
+    parser.add_argument("--token", default=os.getenv("LOADTEST_TOKEN"), help="JWT sent as the `token` cookie")
+    parser.add_argument("--project-id", action="append", help="Project to exercise (repeatable); "
+                                                               "defaults to the token owner's projects")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per concurrency level")
+    parser.add_argument("--with-writes", action="store_true", help="Include apply requests in the mix")
+    parser.add_argument("--verbose", action="store_true", help="Print per-endpoint latency")
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
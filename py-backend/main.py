@@ -1,6 +1,7 @@
 # main.py (updated with proper ID management)
 import os
 import json
+import asyncio
 import logging
 import tempfile
 import re
@@ -9,21 +10,78 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Any, Optional
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, status, Request, Body
+from fastapi import FastAPI, UploadFile, File, HTTPException, status, Request, Body, BackgroundTasks, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from pymongo import MongoClient
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from typing import List, Dict, Any
-import jwt  # Make sure you have pyjwt installed: pip install pyjwt
-import emails
 
 # --- Services ---
 from services.resumeParser import extract_text_from_pdf, parse_resume_with_genai
 from services.vectoriser import pinecone_vectoriser
 from services.retrival import CandidateRetrievalPipeline
 from services.project_retrieval import ProjectRetrievalPipeline
+from services.relevant_projects_cache import relevant_projects_cache
+from services.response_cache import response_cache, etag_for, etag_matches
+from services.serialization import FastJSONResponse, dumps, json_bytes_response, shape_like
+from services.compression import (
+    CompressionMiddleware,
+    compress_response,
+    compression_stats,
+    choose_encoding,
+    encode_variants,
+)
+from services.match_store import MATCH_STORE_TOP_N, MatchStore
+from services.application_scores import ApplicationScores, unavailable_match
+from services.db import sync_collections, async_collections, close_clients
+from services.repositories import candidate_repo, project_repo, application_repo, repository_stats
+from services.email_queue import OutgoingEmail, email_queue, smtp_configured
+from services.jobs import job_registry
+from services.dataset_backup import dataset_backup
+from services.bulk_resumes import (
+    BULK_RESUME_MAX_FILES,
+    BULK_RESUME_MAX_UPLOAD_BYTES,
+    BulkUploadError,
+    bulk_resume_parser,
+    collect_pdfs,
+    limited_receive,
+    read_uploads,
+)
+from services.single_flight import ranking_flights, relevant_projects_flights, single_flight_stats
+from services.idempotency import fingerprint, idempotency_store
+from services.vectorization_queue import (
+    VECTOR_PENDING,
+    VECTOR_READY,
+    client_fields,
+    pending_fields,
+    vectorization_queue,
+)
+from services.auth import AuthMiddleware, require_user_id, optional_user_id, token_verifier
+from services.indexes import apply_indexes, check_hot_queries
+from services.pagination import page_query, next_cursor, ndjson_page, parse_fields, projection_for
+from services.application_counts import (
+    APPLICATION_STATUSES,
+    COUNTS_FIELD,
+    WHERE_COUNTED,
+    empty_counts,
+    created_inc,
+    status_change_inc,
+    counts_pipeline,
+    fold_counts,
+)
+from services.admission import admission, admission_stats
+from services.executors import (
+    ExecutorSaturated,
+    openai_executor,
+    pinecone_executor,
+    pdf_executor,
+    executor_stats,
+    shutdown_executors,
+)
 from services.models import (
     ProjectRegisterRequest,
     ProjectUpdateRequest,
@@ -33,6 +91,7 @@ from services.models import (
     CandidateResponse,
     GetRankedCandidatesRequest,
     GetRankedCandidatesResponse,
+    RankedCandidate,
     RelevantProjectsResponse,
     ParseResumeResponse,
     CandidateSummaryResponse,
@@ -49,50 +108,30 @@ import os
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-JWT_SECRET = os.getenv("JWT_SECRET")
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def sanitize_mongo_name(name: str) -> str:
-    """
-    Sanitize MongoDB database/collection names by replacing invalid characters.
-    MongoDB names cannot contain: '.', ' ', '/', '\\', or null character.
-    """
-    if not name:
-        return name
-    # Replace invalid characters with underscore
-    invalid_chars = ['.', ' ', '/', '\\', '\x00']
-    sanitized = name
-    for char in invalid_chars:
-        sanitized = sanitized.replace(char, '_')
-    # Remove leading/trailing underscores and ensure it's not empty
-    sanitized = sanitized.strip('_')
-    if not sanitized:
-        sanitized = "default"
-    return sanitized
-
-MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
-MONGO_DB_RAW = os.getenv("MONGO_DB", "rag_ats")
-MONGO_DB = sanitize_mongo_name(MONGO_DB_RAW)
-MONGO_COL_RAW = os.getenv("MONGO_COL", "candidates")
-MONGO_COL = sanitize_mongo_name(MONGO_COL_RAW)
-DATASET_DIR = os.getenv("DATASET_DIR", "dataset")
-os.makedirs(DATASET_DIR, exist_ok=True)
-
-# Log if sanitization occurred
-if MONGO_DB_RAW != MONGO_DB:
-    logger.warning(f"MongoDB database name sanitized from '{MONGO_DB_RAW}' to '{MONGO_DB}'")
-if MONGO_COL_RAW != MONGO_COL:
-    logger.warning(f"MongoDB collection name sanitized from '{MONGO_COL_RAW}' to '{MONGO_COL}'")
-
-client = MongoClient(MONGO_URI)
-db = client[MONGO_DB]
-candidates_col = db[MONGO_COL]
-projects_col = db[sanitize_mongo_name(os.getenv("MONGO_PROJECT_COL", "projects"))]
-evaluations_col = db[sanitize_mongo_name(os.getenv("MONGO_EVAL_COL", "evaluations"))]
-applications_col = db[sanitize_mongo_name(os.getenv("MONGO_APP_COL", "applications"))]
+# Request handlers await motor collections; background jobs use the pymongo ones
+candidates_col = async_collections.candidates
+projects_col = async_collections.projects
+evaluations_col = async_collections.evaluations
+applications_col = async_collections.applications
+
+match_store = MatchStore(
+    sync_collections.matches,
+    sync_collections.candidates,
+    sync_collections.projects,
+    async_matches_col=async_collections.matches,
+)
+application_scores = ApplicationScores(
+    sync_collections.applications,
+    sync_collections.candidates,
+    sync_collections.projects,
+    sync_collections.matches,
+    on_update=lambda application_ids: application_repo.invalidate(*application_ids),
+)
 
 # ------------------------------------------------------------
 # FastAPI app
@@ -101,6 +140,7 @@ app = FastAPI(
     title="RAG-based ATS API with Pinecone",
     description="API for resume parsing, registration, and vectorization using Pinecone",
     version="2.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -111,6 +151,182 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Resolves the auth cookie once per request into request.state.user_id
+app.add_middleware(AuthMiddleware)
+# gzip/br for routes that opt in with dependencies=COMPRESSED
+app.add_middleware(CompressionMiddleware)
+COMPRESSED = [Depends(compress_response)]
+
+@app.on_event("startup")
+def ensure_collection_indexes():
+    """Apply the index manifest, then verify no hot query scans a collection."""
+    try:
+        apply_indexes(sync_collections)
+        for problem in check_hot_queries(sync_collections):
+            logger.error(f"Unindexed hot query: {problem}")
+    except Exception as e:
+        logger.warning(f"Could not ensure collection indexes: {e}")
+
+
+@app.on_event("startup")
+async def resume_pending_vectorizations():
+    """Re-queue candidates a previous process left with vector_status pending."""
+    vectorization_queue.on_change = _on_candidate_vectorized
+    try:
+        await vectorization_queue.requeue_pending()
+    except Exception as e:
+        logger.warning(f"Could not re-queue pending vectorizations: {e}")
+
+
+@app.on_event("shutdown")
+def close_mongo_clients():
+    vectorization_queue.close()
+    email_queue.close()
+    dataset_backup.close()
+    close_clients()
+    shutdown_executors()
+
+# ------------------------------------------------------------
+# Match store background jobs (recompute on write)
+# ------------------------------------------------------------
+def _refresh_project_matches(project_id: str):
+    """Recompute a new/updated project's match column and its applications' scores."""
+    try:
+        match_store.recompute_project(project_id)
+        project_repo.invalidate(project_id)
+        relevant_projects_cache.invalidate_all()
+        # my-projects is cached under the interviewer tag and shows the match stamp
+        project = sync_collections.projects.find_one({"_id": project_id}, {"interviewer_id": 1}) or {}
+        response_cache.invalidate(f"project:{project_id}", f"interviewer:{project.get('interviewer_id')}")
+    except Exception:
+        logger.exception(f"Match column recompute failed for project {project_id}")
+    try:
+        application_scores.refresh_project(project_id)
+    except Exception:
+        logger.exception(f"Application score refresh failed for project {project_id}")
+
+
+def _refresh_candidate_matches(candidate_id: str):
+    """Recompute a candidate's match row and their applications' scores after their vectors changed."""
+    try:
+        match_store.recompute_candidate(candidate_id)
+        candidate_repo.invalidate(candidate_id)
+        relevant_projects_cache.invalidate_candidate(candidate_id)
+        # /api/candidate/me is cached under the user tag and shows the match stamp
+        candidate = sync_collections.candidates.find_one({"_id": candidate_id}, {"user_id": 1}) or {}
+        response_cache.invalidate(f"candidate:{candidate_id}", f"user:{candidate.get('user_id')}")
+    except Exception:
+        logger.exception(f"Match row recompute failed for candidate {candidate_id}")
+    try:
+        application_scores.refresh_candidate(candidate_id)
+    except Exception:
+        logger.exception(f"Application score refresh failed for candidate {candidate_id}")
+
+
+MATCH_REFRESH_SATURATED_RETRIES = 5
+
+
+async def _refresh_in_background(refresh, entity_id: str):
+    """
+    Run a match/score refresh on the pinecone executor's background lane, behind
+    interactive retrieval, backing off while that lane is full.
+    """
+    for attempt in range(MATCH_REFRESH_SATURATED_RETRIES):
+        try:
+            return await pinecone_executor.run_background(refresh, entity_id)
+        except ExecutorSaturated:
+            if attempt == MATCH_REFRESH_SATURATED_RETRIES - 1:
+                # Reads keep falling back to live retrieval until the next write
+                logger.error(f"Dropped {refresh.__name__}({entity_id}): pinecone executor saturated")
+                return
+            await asyncio.sleep(2 ** attempt)
+
+
+async def _on_candidate_vectorized(candidate_id: str, vector_status: str):
+    """Vectorization queue hook: the candidate's document (and maybe vectors) changed."""
+    candidate_repo.invalidate(candidate_id)
+    relevant_projects_cache.invalidate_candidate(candidate_id)
+    doc = await candidate_repo.get(candidate_id)
+    tags = [f"candidate:{candidate_id}"] + ([f"user:{doc['user_id']}"] if doc and doc.get("user_id") else [])
+    response_cache.invalidate(*tags)
+    if vector_status == VECTOR_READY:
+        await _refresh_in_background(_refresh_candidate_matches, candidate_id)
+
+
+# ------------------------------------------------------------
+# Live retrieval (run on the pinecone executor; pipelines connect on construction)
+# ------------------------------------------------------------
+def _retrieve_relevant_projects(vector_ids: Dict[str, str], top_k: int) -> Dict[str, Any]:
+    return ProjectRetrievalPipeline().get_relevant_projects_for_candidate(
+        candidate_vector_ids=vector_ids,
+        top_k=top_k
+    )
+
+
+def _retrieve_ranked_candidates(project_description: str, required_skills: List[str],
+                                filters: Dict[str, Any]) -> Dict[str, Any]:
+    return CandidateRetrievalPipeline().retrieve_ranked_candidates(
+        project_description=project_description,
+        required_skills=required_skills,
+        filters=filters
+    )
+
+# ------------------------------------------------------------
+# ETag-cached reads
+# ------------------------------------------------------------
+CACHED_RESPONSE_HEADERS = {"Cache-Control": "private, no-cache"}
+
+
+async def _cached_json(request: Request, route: str, ident: str, tags: List[str],
+                       build, model=None) -> Response:
+    """
+    Serve a read from the response cache: 304 if the client's If-None-Match is
+    current, otherwise the cached (or freshly built) body with its ETag.
+    build() returns the response dict; model, if given, shapes it like response_model.
+    Bodies are cached serialized and pre-compressed, so a hit costs no encoding
+    or compression; each encoding gets its own ETag.
+    """
+    key = response_cache.key_for(route, ident, tags)
+    cached = response_cache.get(key)
+    if cached is None:
+        body = await build()
+        body = dumps(model.model_validate(body) if model else body)
+        cached = (etag_for(body), body, encode_variants(body))
+        response_cache.set(key, *cached)
+
+    etag, body, variants = cached
+    headers = {**CACHED_RESPONSE_HEADERS, "Vary": "Accept-Encoding"}
+    encoding = choose_encoding(request.headers.get("accept-encoding"), variants)
+    if encoding:
+        etag = f'{etag[:-1]}-{encoding}"'
+        headers["Content-Encoding"] = encoding
+    headers["ETag"] = etag
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        response_cache.not_modified += 1
+        headers.pop("Content-Encoding", None)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if encoding:
+        compression_stats.record(len(body), len(variants[encoding]))
+        body = variants[encoding]
+    return json_bytes_response(body, headers=headers)
+
+# ------------------------------------------------------------
+# Streamed lists
+# ------------------------------------------------------------
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _wants_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def _stream_ndjson(cursor, row, sort, limit: Optional[int]) -> StreamingResponse:
+    """
+    Stream a Mongo cursor (fetched with limit + 1 for look-ahead) as one JSON object
+    per line, batch by batch, without buffering the list; see pagination.ndjson_page.
+    """
+    return StreamingResponse(ndjson_page(cursor, row, sort, limit), media_type=NDJSON_MEDIA_TYPE)
+
 # ------------------------------------------------------------
 # Health endpoints
 # ------------------------------------------------------------
@@ -122,29 +338,80 @@ async def root():
 async def health_check():
     return {"status": "healthy", "service": "RAG-based ATS API with Pinecone", "version": "2.0.0"}
 
+@app.get("/metrics/executors")
+async def get_executor_metrics():
+    """Queue depth, wait and run times of the blocking-work executors and the email queue."""
+    return {
+        "success": True,
+        "executors": executor_stats(),
+        "email_queue": email_queue.stats(),
+        "bulk_resumes": bulk_resume_parser.stats(),
+        "dataset_backup": dataset_backup.stats(),
+        "vectorization_queue": vectorization_queue.stats(),
+        "jobs": job_registry.stats(),
+    }
+
+@app.get("/metrics/admission")
+async def get_admission_metrics():
+    """Per-route concurrency limits, queue depth, shed (503) and coalesced requests."""
+    return {"success": True, "routes": admission_stats(), "coalescing": single_flight_stats()}
+
+@app.get("/metrics/auth")
+async def get_auth_metrics():
+    """Verified-token cache size and hit rate."""
+    return {"success": True, "token_cache": token_verifier.stats()}
+
+@app.get("/metrics/caches")
+async def get_cache_metrics():
+    """Hit rates of the response, relevant-projects and document caches."""
+    return {
+        "success": True,
+        "responses": response_cache.stats(),
+        "relevant_projects": relevant_projects_cache.stats(),
+        "compression": compression_stats.stats(),
+        "repositories": repository_stats(candidate_repo, project_repo, application_repo),
+        "idempotency": idempotency_store.stats(),
+    }
+
 # ------------------------------------------------------------
 # 1. Parse-Resume endpoint (unchanged)
 # ------------------------------------------------------------
-@app.post("/api/parse-resume", response_model=ParseResumeResponse)
-async def parse_resume(file: UploadFile = File(...)):
-    """Parse a resume PDF file and return structured JSON data."""
+@app.post("/api/parse-resume", response_model=ParseResumeResponse,
+          dependencies=[Depends(admission("parse_resume"))])
+async def parse_resume(file: UploadFile = File(...),
+                       idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+                       user_id: Optional[str] = Depends(optional_user_id)):
+    """
+    Parse a resume PDF file and return structured JSON data.
+    A retry with the same Idempotency-Key returns the original result; keys are
+    scoped per user, so sending one requires authentication.
+    """
+    if idempotency_key is not None and not user_id:
+        raise HTTPException(status_code=401, detail="Authentication required to use Idempotency-Key")
     if not file.filename.lower().endswith(".pdf"):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Only PDF files are supported",
         )
 
+    content = await file.read()
+    return await idempotency_store.run(
+        f"parse-resume:{user_id}", idempotency_key, fingerprint(content),
+        lambda: _parse_resume(file.filename, content), ParseResumeResponse,
+    )
+
+
+async def _parse_resume(filename: str, content: bytes) -> Dict[str, Any]:
     temp_file_path = None
     try:
         with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
             temp_file_path = temp_file.name
-            content = await file.read()
             temp_file.write(content)
             temp_file.flush()
 
-        logger.info(f"Processing resume file: {file.filename}")
+        logger.info(f"Processing resume file: {filename}")
 
-        resume_text = extract_text_from_pdf(temp_file_path)
+        resume_text = await pdf_executor.run(extract_text_from_pdf, temp_file_path)
         if not resume_text:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -153,7 +420,7 @@ async def parse_resume(file: UploadFile = File(...)):
 
         logger.info(f"Extracted {len(resume_text)} characters from PDF")
 
-        parsed_data = parse_resume_with_genai(resume_text)
+        parsed_data = await openai_executor.run(parse_resume_with_genai, resume_text)
         if "error" in parsed_data:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -166,7 +433,7 @@ async def parse_resume(file: UploadFile = File(...)):
             "success": True,
             "message": "Resume parsed successfully",
             "data": parsed_data,
-            "filename": file.filename,
+            "filename": filename,
             "text_length": len(resume_text),
         }
 
@@ -185,6 +452,60 @@ async def parse_resume(file: UploadFile = File(...)):
             except Exception as e:
                 logger.warning(f"Failed to clean up temporary file: {e}")
 
+
+@app.post("/api/parse-resumes", status_code=202, dependencies=[Depends(admission("bulk_resumes"))])
+async def parse_resumes(request: Request, user_id: str = Depends(require_user_id)):
+    """
+    Bulk resume parsing: accept many PDFs and/or zip archives of PDFs (multipart
+    field "files") and return a job ID immediately. Poll
+    /api/parse-resume-jobs/{job_id} for progress and the parsed JSON of each file.
+    The form is parsed here rather than by FastAPI so size limits apply while
+    the body streams in, after authentication and admission.
+    """
+    try:
+        content_length = request.headers.get("content-length", "")
+        if content_length.isdigit() and int(content_length) > BULK_RESUME_MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                                detail=f"Upload exceeds {BULK_RESUME_MAX_UPLOAD_BYTES} bytes")
+        try:
+            limited = Request(request.scope, limited_receive(request.receive))
+            async with limited.form(max_files=BULK_RESUME_MAX_FILES, max_fields=BULK_RESUME_MAX_FILES) as form:
+                files = [f for f in form.getlist("files") if not isinstance(f, str)]
+                if not files:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No files uploaded")
+                uploads, too_large = await read_uploads(files)
+            pdfs, skipped = await run_in_threadpool(collect_pdfs, uploads)
+            skipped = too_large + skipped
+        except BulkUploadError as e:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+        if not pdfs:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No PDF files found in the upload")
+
+        job = bulk_resume_parser.submit(pdfs, user_id=user_id, skipped=skipped)
+        logger.info(f"Queued bulk resume job {job.job_id}: {len(pdfs)} PDFs, {len(skipped)} skipped")
+
+        return {
+            "success": True,
+            "job_id": job.job_id,
+            "queued": len(pdfs),
+            "skipped": skipped,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to queue bulk resume upload")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/parse-resume-jobs/{job_id}", dependencies=COMPRESSED)
+async def get_parse_resume_job(job_id: str, user_id: str = Depends(require_user_id)):
+    """Progress and per-file results (parsed data or error) of a bulk resume upload."""
+    job = job_registry.get(job_id)
+    if not job or job.kind != "resume_parse" or job.meta.get("user_id") != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "job": job.to_dict()}
+
 # ------------------------------------------------------------
 # 2. Register confirmed JSON + add to Pinecone (UPDATED)
 # ------------------------------------------------------------
@@ -238,95 +559,83 @@ async def parse_resume(file: UploadFile = File(...)):
 # ------------------------------------------------------------
 # 2. Register confirmed JSON + add to Pinecone (UPDATED with user_id)
 # ------------------------------------------------------------
-@app.post("/api/register-json", status_code=201, response_model=CandidateResponse)
-async def register_json(payload: dict, request: Request):
+@app.post("/api/register-json", status_code=201, response_model=CandidateResponse,
+          dependencies=[Depends(admission("register_json"))])
+async def register_json(payload: dict, user_id: str = Depends(require_user_id),
+                        idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
     """
-    Accept confirmed JSON, store in MongoDB, and add to Pinecone incrementally.
-    Now includes JWT user_id from authentication.
+    Accept confirmed JSON and store it in MongoDB with vector_status "pending";
+    the vectorization queue adds it to Pinecone behind the request.
+    Now includes JWT user_id from authentication. A retry with the same
+    Idempotency-Key returns the original response.
     """
+    return await idempotency_store.run(
+        f"register-json:{user_id}", idempotency_key, fingerprint(payload),
+        lambda: _register_candidate(payload, user_id), CandidateResponse, status_code=201,
+    )
+
+
+async def _register_candidate(payload: dict, user_id: str) -> Dict[str, Any]:
     try:
-        # Extract JWT user_id from request
-        user_id = getattr(request.state, 'user_id', None)
-        
-        # If not found in request state, try to extract from JWT token in cookie
-        if not user_id:
-            token = request.cookies.get("token")
-            if token:
-                try:
-                    decoded = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-                    user_id = (
-                        decoded.get("userId") or 
-                        decoded.get("user_id") or 
-                        decoded.get("id") or
-                        decoded.get("userID")
-                    )
-                except jwt.ExpiredSignatureError:
-                    raise HTTPException(status_code=401, detail="Token expired")
-                except jwt.InvalidTokenError:
-                    raise HTTPException(status_code=401, detail="Invalid token")
-
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Authentication required")
-
-        print(f"[INFO] Registering candidate for user_id: {user_id}")
+        logger.info(f"Registering candidate for user_id: {user_id}")
 
         # Check if candidate already exists with this user_id
-        existing_candidate = candidates_col.find_one({"user_id": user_id})
+        existing_candidate = await candidate_repo.get_by_user(user_id)
         
         candidate_id = None
         if existing_candidate:
             # Update existing candidate
             candidate_id = existing_candidate["_id"]
-            print(f"[OK] Updating existing candidate with ID: {candidate_id} for user_id: {user_id}")
+            logger.info(f"Updating existing candidate with ID: {candidate_id} for user_id: {user_id}")
         else:
             # Create new candidate with UUID _id
             candidate_id = str(uuid4())
-            print(f"[OK] Creating new candidate with ID: {candidate_id} for user_id: {user_id}")
+            logger.info(f"Creating new candidate with ID: {candidate_id} for user_id: {user_id}")
 
-        # Add to Pinecone FIRST to get vector IDs
-        pinecone_result = pinecone_vectoriser.add_candidate(payload, candidate_id)
-        
-        if not pinecone_result["success"]:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to add candidate to Pinecone: {pinecone_result.get('error', 'Unknown error')}"
-            )
+        # Reject before storing anything if the vectorization backlog is full
+        vectorization_queue.check_capacity()
 
-        # Prepare MongoDB document
+        # Prepare MongoDB document from the payload; vectors are added behind the
+        # request, and identity/vector fields are the server's, not the client's
+        request_id = str(uuid4())
         mongo_doc = {
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            **client_fields(payload),
             "_id": candidate_id,
             "user_id": user_id,  # Store the JWT user_id
-            "created_at": datetime.utcnow().isoformat() + "Z",
-            "vector_ids": pinecone_result["vector_ids"],
-            "pinecone_metadata": pinecone_result["metadata"]
+            **pending_fields(request_id),
         }
-        
-        # Merge with the payload data
-        mongo_doc.update(payload)
+        # Keep serving the previous vectors until the new ones are ready
+        vector_ids = existing_candidate.get("vector_ids") if existing_candidate else None
+        if vector_ids:
+            mongo_doc["vector_ids"] = vector_ids
+            mongo_doc["pinecone_metadata"] = existing_candidate.get("pinecone_metadata")
 
         if existing_candidate:
             # Update existing candidate
-            candidates_col.replace_one({"_id": candidate_id}, mongo_doc)
+            await candidate_repo.replace(candidate_id, mongo_doc)
         else:
             # Insert new candidate
-            candidates_col.insert_one(mongo_doc)
+            await candidate_repo.insert(mongo_doc)
         
         logger.info(f"[OK] Saved candidate to MongoDB: {candidate_id} for user: {user_id}")
+        relevant_projects_cache.invalidate_candidate(candidate_id)
+        response_cache.invalidate(f"candidate:{candidate_id}", f"user:{user_id}")
+        # Match refresh runs from the queue's hook once the vectors are ready
+        vectorization_queue.enqueue(candidate_id, request_id)
 
-        # Save JSON to dataset/ (optional, for backup)
-        file_path = Path(DATASET_DIR) / f"{candidate_id}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(mongo_doc, f, ensure_ascii=False, indent=2)
+        # Backup to the dataset segment log (written behind the request)
+        dataset_backup.record(candidate_id, mongo_doc)
 
         logger.info(f"[OK] Successfully registered candidate: {candidate_id} for user: {user_id}")
-        logger.info(f"[OK] Vector IDs stored: {pinecone_result['vector_ids']}")
 
         return {
             "success": True, 
             "candidate_id": candidate_id,
             "user_id": user_id,
-            "vector_ids": pinecone_result["vector_ids"],
-            "message": "Candidate registered successfully and added to vector database"
+            "vector_ids": vector_ids,
+            "vector_status": VECTOR_PENDING,
+            "message": "Candidate registered successfully; adding to vector database"
         }
 
     except HTTPException:
@@ -338,32 +647,34 @@ async def register_json(payload: dict, request: Request):
 # ------------------------------------------------------------
 # 3. Retrieve candidate (UPDATED to include vector IDs)
 # ------------------------------------------------------------
-@app.get("/api/candidate-get/{candidate_id}", response_model=CandidateResponse)
-async def get_candidate(candidate_id: str):
-    doc = candidates_col.find_one({"_id": candidate_id})
-    if not doc:
-        raise HTTPException(status_code=404, detail="Candidate not found")
-    
-    # Convert ObjectId to string for JSON serialization
-    doc["_id"] = str(doc["_id"])
-    
-    return {
-        "success": True, 
-        "candidate": doc,
-        "vector_ids": doc.get("vector_ids", {})
-    }
+@app.get("/api/candidate-get/{candidate_id}", response_model=CandidateResponse, dependencies=COMPRESSED)
+async def get_candidate(candidate_id: str, request: Request):
+    async def build():
+        doc = await candidate_repo.get(candidate_id)
+        if not doc:
+            raise HTTPException(status_code=404, detail="Candidate not found")
+
+        # Convert ObjectId to string for JSON serialization
+        doc["_id"] = str(doc["_id"])
+
+        return {
+            "success": True,
+            "candidate": doc,
+            "vector_ids": doc.get("vector_ids", {})
+        }
+
+    return await _cached_json(request, "candidate-get", candidate_id, [f"candidate:{candidate_id}"],
+                              build, CandidateResponse)
 
 
-@app.get("/api/candidate/me", response_model=CandidateResponse)
-async def get_candidate_for_current_user(request: Request):
+@app.get("/api/candidate/me", response_model=CandidateResponse, dependencies=COMPRESSED)
+async def get_candidate_for_current_user(request: Request, user_id: str = Depends(require_user_id)):
     """
     Fetch candidate profile for the currently logged-in user based on JWT user_id.
     Useful when the frontend doesn't yet know the candidate_id.
     """
-    try:
-        user_id = _extract_user_id_from_request(request)
-
-        doc = candidates_col.find_one({"user_id": user_id})
+    async def build():
+        doc = await candidate_repo.get_by_user(user_id)
         if not doc:
             raise HTTPException(status_code=404, detail="Candidate not found")
 
@@ -374,6 +685,9 @@ async def get_candidate_for_current_user(request: Request):
             "candidate": doc,
             "vector_ids": doc.get("vector_ids", {}),
         }
+
+    try:
+        return await _cached_json(request, "candidate-me", user_id, [f"user:{user_id}"], build, CandidateResponse)
     except HTTPException:
         raise
     except Exception as e:
@@ -437,21 +751,11 @@ async def get_candidate_for_current_user(request: Request):
 # 4. Update candidate JSON + update Pinecone (UPDATED with user_id support)
 # ------------------------------------------------------------
 @app.put("/api/candidate-put/{candidate_id}", response_model=CandidateResponse)
-async def update_candidate(candidate_id: str, payload: dict, request: Request):
+async def update_candidate(candidate_id: str, payload: dict, background_tasks: BackgroundTasks,
+                           user_id: Optional[str] = Depends(optional_user_id)):
     try:
-        # Extract JWT user_id for verification
-        user_id = getattr(request.state, 'user_id', None)
-        if not user_id:
-            token = request.cookies.get("token")
-            if token:
-                try:
-                    decoded = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-                    user_id = decoded.get("userId") or decoded.get("id")
-                except:
-                    pass
-
         # Check if candidate exists
-        existing_doc = candidates_col.find_one({"_id": candidate_id})
+        existing_doc = await candidate_repo.get(candidate_id)
         if not existing_doc:
             raise HTTPException(status_code=404, detail="Candidate not found")
 
@@ -459,11 +763,11 @@ async def update_candidate(candidate_id: str, payload: dict, request: Request):
         if user_id and existing_doc.get("user_id") != user_id:
             raise HTTPException(status_code=403, detail="Not authorized to update this candidate")
 
-        # Convert payload to dict for Pinecone
-        payload_dict = payload
+        # Convert payload to dict for Pinecone (without server-managed fields)
+        payload_dict = client_fields(payload)
         
         # Update in Pinecone
-        pinecone_result = pinecone_vectoriser.update_candidate(payload_dict, candidate_id)
+        pinecone_result = await pinecone_executor.run(pinecone_vectoriser.update_candidate, payload_dict, candidate_id)
         
         if not pinecone_result["success"]:
             raise HTTPException(
@@ -477,7 +781,9 @@ async def update_candidate(candidate_id: str, payload: dict, request: Request):
             "_id": candidate_id,
             "updated_at": datetime.utcnow().isoformat() + "Z",
             "vector_ids": pinecone_result["vector_ids"],
-            "pinecone_metadata": pinecone_result["metadata"]
+            "pinecone_metadata": pinecone_result["metadata"],
+            # Vectorized inline; replacing the document also supersedes any queued job
+            "vector_status": VECTOR_READY,
         }
         
         # Preserve user_id if it exists
@@ -486,12 +792,13 @@ async def update_candidate(candidate_id: str, payload: dict, request: Request):
         elif user_id:
             update_data["user_id"] = user_id
 
-        candidates_col.replace_one({"_id": candidate_id}, update_data, upsert=True)
+        await candidate_repo.replace(candidate_id, update_data, upsert=True)
+        relevant_projects_cache.invalidate_candidate(candidate_id)
+        response_cache.invalidate(f"candidate:{candidate_id}", f"user:{update_data.get('user_id')}")
+        background_tasks.add_task(_refresh_in_background, _refresh_candidate_matches, candidate_id)
 
-        # Update dataset file (optional backup)
-        file_path = Path(DATASET_DIR) / f"{candidate_id}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(update_data, f, ensure_ascii=False, indent=2)
+        # Backup to the dataset segment log (written behind the request)
+        dataset_backup.record(candidate_id, update_data)
 
         logger.info(f"[OK] Successfully updated candidate: {candidate_id}")
         logger.info(f"[OK] Updated vector IDs: {pinecone_result['vector_ids']}")
@@ -516,28 +823,29 @@ async def update_candidate(candidate_id: str, payload: dict, request: Request):
 async def delete_candidate(candidate_id: str):
     try:
         # Get candidate first to log vector IDs
-        candidate = candidates_col.find_one({"_id": candidate_id})
+        candidate = await candidate_repo.get(candidate_id)
         if not candidate:
             raise HTTPException(status_code=404, detail="Candidate not found")
 
         # Delete from MongoDB
-        result = candidates_col.delete_one({"_id": candidate_id})
+        result = await candidate_repo.delete(candidate_id, user_id=candidate.get("user_id"))
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Candidate not found")
+        await run_in_threadpool(match_store.remove_candidate, candidate_id)
+        relevant_projects_cache.invalidate_candidate(candidate_id)
+        response_cache.invalidate(f"candidate:{candidate_id}", f"user:{candidate.get('user_id')}")
 
         # Delete from Pinecone using stored vector IDs
         vector_ids = candidate.get("vector_ids", {})
         logger.info(f"Deleting candidate {candidate_id} with vector IDs: {vector_ids}")
         
-        success = pinecone_vectoriser.delete_candidate(candidate_id)
+        success = await pinecone_executor.run(pinecone_vectoriser.delete_candidate, candidate_id)
         
         if not success:
             logger.warning(f"Failed to delete candidate {candidate_id} from Pinecone")
 
-        # Delete dataset file (optional)
-        file_path = Path(DATASET_DIR) / f"{candidate_id}.json"
-        if file_path.exists():
-            file_path.unlink()
+        # Tombstone in the dataset backup
+        dataset_backup.delete(candidate_id)
 
         return {
             "success": True, 
@@ -557,7 +865,7 @@ async def delete_candidate(candidate_id: str):
 @app.get("/candidate/{candidate_id}/vectors", response_model=CandidateVectorsResponse)
 async def get_candidate_vectors(candidate_id: str):
     """Get the vector IDs for a candidate"""
-    doc = candidates_col.find_one({"_id": candidate_id})
+    doc = await candidate_repo.get(candidate_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
@@ -664,7 +972,7 @@ def extract_candidate_summary(doc: Dict[str, Any]) -> Dict[str, Any]:
 # 7. Get candidate summary details by ID (Final)
 # ------------------------------------------------------------
 @app.get("/candidate/{candidate_id}/summary", response_model=CandidateSummaryResponse)
-async def get_candidate_summary(candidate_id: str):
+async def get_candidate_summary(candidate_id: str, request: Request):
     """
     Retrieve candidate summary details:
     1) Highest qualification (only qualification + category)
@@ -672,12 +980,15 @@ async def get_candidate_summary(candidate_id: str):
     3) Experience - designation + description + experience_skills
     4) Certifications
     """
-    doc = candidates_col.find_one({"_id": candidate_id})
-    if not doc:
-        raise HTTPException(status_code=404, detail="Candidate not found")
+    async def build():
+        doc = await candidate_repo.get(candidate_id)
+        if not doc:
+            raise HTTPException(status_code=404, detail="Candidate not found")
 
-    summary = extract_candidate_summary(doc)
-    return summary
+        return extract_candidate_summary(doc)
+
+    return await _cached_json(request, "candidate-summary", candidate_id, [f"candidate:{candidate_id}"],
+                              build, CandidateSummaryResponse)
 
 
 
@@ -778,11 +1089,23 @@ async def get_candidate_summary(candidate_id: str):
 #         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/register-project", status_code=201, response_model=ProjectResponse)
-async def register_project(payload: ProjectRegisterRequest, request: Request):
+async def register_project(payload: ProjectRegisterRequest, background_tasks: BackgroundTasks,
+                           interviewer_id: str = Depends(require_user_id),
+                           idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")):
     """
     Register a project with project_description and project_skills.
     The interviewer_id is automatically taken from the authenticated user (cookie).
+    A retry with the same Idempotency-Key returns the original project instead
+    of creating (and vectorizing) another one.
     """
+    return await idempotency_store.run(
+        f"register-project:{interviewer_id}", idempotency_key, fingerprint(payload.model_dump()),
+        lambda: _register_project(payload, background_tasks, interviewer_id), ProjectResponse, status_code=201,
+    )
+
+
+async def _register_project(payload: ProjectRegisterRequest, background_tasks: BackgroundTasks,
+                            interviewer_id: str) -> Dict[str, Any]:
     try:
         # Convert Pydantic model to dict
         payload_dict = payload.model_dump(exclude_none=True)
@@ -804,31 +1127,6 @@ async def register_project(payload: ProjectRegisterRequest, request: Request):
                 detail="project_skills is required (list or string)"
             )
         
-        # Get interviewer_id from the authenticated user (from cookie)
-        # This depends on how your authentication middleware works
-        # If you're using some auth middleware that sets req.user:
-        interviewer_id = getattr(request.state, 'user_id', None) or getattr(request, 'user_id', None)
-        
-        # If you're using a different approach, you might need to decode the JWT from the cookie
-        if not interviewer_id:
-            # Try to get the token from cookies and decode it
-            token = request.cookies.get("token")
-            if token:
-                try:
-                    # Decode the JWT token to get user ID
-                    decoded = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-                    interviewer_id = decoded.get("userId") or decoded.get("id")
-                except jwt.ExpiredSignatureError:
-                    raise HTTPException(status_code=401, detail="Token expired")
-                except jwt.InvalidTokenError:
-                    raise HTTPException(status_code=401, detail="Invalid token")
-        
-        if not interviewer_id:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Authentication required. Please log in."
-            )
-        
         # Handle project_skills if it's a string (convert to list)
         if isinstance(project_skills, str):
             # Split by comma and clean up
@@ -869,7 +1167,7 @@ async def register_project(payload: ProjectRegisterRequest, request: Request):
             payload_copy["job_title"] = payload_copy["project_heading"]
         
         # Add to Pinecone FIRST to get vector IDs
-        pinecone_result = pinecone_vectoriser.add_project(payload_copy, project_id)
+        pinecone_result = await pinecone_executor.run(pinecone_vectoriser.add_project, payload_copy, project_id)
         
         if not pinecone_result["success"]:
             raise HTTPException(
@@ -883,10 +1181,16 @@ async def register_project(payload: ProjectRegisterRequest, request: Request):
         payload_copy["vector_ids"] = pinecone_result["vector_ids"]  # Store vector IDs
         payload_copy["pinecone_metadata"] = pinecone_result["metadata"]  # Store Pinecone metadata
         payload_copy["interviewer_id"] = interviewer_id  # Store interviewer ID from cookie
+        payload_copy[COUNTS_FIELD] = empty_counts()
         
         # Insert in MongoDB
-        projects_col.insert_one(payload_copy)
+        await project_repo.insert(payload_copy)
         logger.info(f"Saved project to MongoDB with id: {project_id} for interviewer: {interviewer_id}")
+
+        # A new project can enter any candidate's relevant list
+        relevant_projects_cache.invalidate_all()
+        response_cache.invalidate(f"interviewer:{interviewer_id}")
+        background_tasks.add_task(_refresh_in_background, _refresh_project_matches, project_id)
         
         logger.info(f"Successfully registered project: {project_id} for interviewer: {interviewer_id}")
         logger.info(f"Vector IDs stored: {pinecone_result['vector_ids']}")
@@ -1029,192 +1333,155 @@ async def register_project(payload: ProjectRegisterRequest, request: Request):
 #             detail=f"Error retrieving relevant projects: {str(e)}"
 #         )
 
-@app.get("/api/candidate/relevant-projects")
+@app.get("/api/candidate/relevant-projects",
+         dependencies=COMPRESSED + [Depends(admission("relevant_projects"))])
 async def get_relevant_projects_for_current_candidate(
-    request: Request,
-    top_k: int = 100
+    top_k: int = 100,
+    user_id: str = Depends(require_user_id),
 ):
     """
     Get relevant projects for the currently logged-in candidate based on their profile.
     candidate_id is automatically extracted from cookie/JWT token.
     """
     try:
-        # Try to extract user_id from request state (set by middleware)
-        user_id = getattr(request.state, 'user_id', None)
-        # print(f"🔍 Initial user_id from request.state: {user_id}")
-
-        # If not found in request state, try to extract from JWT token in cookie
-        if not user_id:
-            token = request.cookies.get("token")
-            # print(f"🔍 Token found in cookies: {bool(token)}")
-            
-            if token:
-                try:
-                    decoded = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-                    # print(f"🔍 Decoded JWT payload: {decoded}")
-                    
-                    # Extract user_id from JWT
-                    user_id = (
-                        decoded.get("userId") or 
-                        decoded.get("user_id") or 
-                        decoded.get("id") or
-                        decoded.get("userID")
-                    )
-                    # print(f"🔍 Extracted user_id from JWT: {user_id}")
-                    
-                except jwt.ExpiredSignatureError:
-                    raise HTTPException(status_code=401, detail="Token expired")
-                except jwt.InvalidTokenError as e:
-                    print(f"[ERROR] JWT decode error: {str(e)}")
-                    raise HTTPException(status_code=401, detail="Invalid token")
-
-        if not user_id:
-            print("[ERROR] No user_id found in request or token")
-            raise HTTPException(status_code=401, detail="Authentication required")
-
-        print(f"[INFO] Final user_id being used: {user_id}")
-
         # ✅ FIXED: Search candidate by user_id field (which matches JWT user_id)
-        candidate_doc = candidates_col.find_one({"user_id": user_id})
-        
+        candidate_doc = await candidate_repo.get_by_user(user_id)
+
         if not candidate_doc:
-            print(f"[ERROR] Candidate not found in MongoDB for user_id: {user_id}")
-            
-            # Check if any candidates exist at all
-            total_candidates = candidates_col.count_documents({})
-            print(f"[INFO] Total candidates in database: {total_candidates}")
-            
-            if total_candidates == 0:
-                raise HTTPException(
-                    status_code=404, 
-                    detail="No candidate profiles found in database. Please complete your profile first."
-                )
-            else:
-                # List available candidates for debugging
-                available_candidates = list(candidates_col.find({}, {'_id': 1, 'user_id': 1, 'name': 1}))
-                available_info = []
-                for doc in available_candidates:
-                    info = {
-                        "_id": str(doc['_id']),
-                        "user_id": str(doc.get('user_id', 'No user_id')),
-                        "name": doc.get('name', 'Unknown')
-                    }
-                    available_info.append(info)
-                
-                print(f"[INFO] Available candidates: {available_info}")
-                
-                raise HTTPException(
-                    status_code=404, 
-                    detail="Candidate profile not found. Please complete your profile setup first."
-                )
+            logger.warning(f"Candidate not found in MongoDB for user_id: {user_id}")
+            raise HTTPException(
+                status_code=404,
+                detail="Candidate profile not found. Please complete your profile setup first."
+            )
         
         # print(f"[OK] Candidate found: {candidate_doc.get('name', 'Unknown')} (MongoDB ID: {candidate_doc['_id']}, JWT user_id: {candidate_doc.get('user_id')})")
         
         # Get candidate's vector IDs
         vector_ids = candidate_doc.get("vector_ids", {})
+        if not vector_ids and candidate_doc.get("vector_status") == VECTOR_PENDING:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Candidate profile is still being processed. Please retry shortly.",
+                headers={"Retry-After": "5"},
+            )
         if not vector_ids:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Candidate vector IDs not found. Candidate profile may not be properly processed."
             )
-        
-        # Initialize retrieval pipeline
-        retrieval_pipeline = ProjectRetrievalPipeline()
-        
-        # Get relevant projects
-        results = retrieval_pipeline.get_relevant_projects_for_candidate(
-            candidate_vector_ids=vector_ids,
-            top_k=top_k
-        )
-        
-        # Extract project IDs from combined ranked results
-        project_results = [
-            {
-                "project_id": result["project_id"],
-                "overall_score": result["overall_score"],
-                "description_score": result["description_score"],
-                "skills_score": result["skills_score"]
-            }
-            for result in results["combined_ranked"]
-        ]
-        
-        # Filter out projects with past deadlines and fetch full project details
-        current_time = datetime.now(timezone.utc)
-        valid_projects = []
-        
-        for project_result in project_results:
-            project_id = project_result["project_id"]
-            
-            # Fetch project document from MongoDB
-            project_doc = projects_col.find_one({"_id": project_id})
+
+        # Serve from the per-candidate cache when nothing relevant changed
+        candidate_id = str(candidate_doc["_id"])
+        cache_key = relevant_projects_cache.key_for(candidate_id, top_k)
+        cached = relevant_projects_cache.get(cache_key)
+        if cached is not None:
+            return json_bytes_response(cached)
+        
+        async def build() -> bytes:
+            # Serve from the match store (indexed top-k read) once this candidate's
+            # row has been computed; fall back to live retrieval until then, or
+            # for more results than the store keeps per candidate
+            if candidate_doc.get("matches_computed_at") and top_k <= MATCH_STORE_TOP_N:
+                project_results = await match_store.top_projects(candidate_id, top_k)
+            else:
+                results = await pinecone_executor.run(_retrieve_relevant_projects, vector_ids, top_k)
+                project_results = [
+                    {
+                        "project_id": result["project_id"],
+                        "overall_score": result["overall_score"],
+                        "description_score": result["description_score"],
+                        "skills_score": result["skills_score"]
+                    }
+                    for result in results["combined_ranked"]
+                ]
+        
+            # Filter out projects with past deadlines and fetch full project details
+            current_time = datetime.now(timezone.utc)
+            valid_projects = []
+            earliest_deadline = None
+            # Cached project documents; misses are fetched with one $in query
+            project_docs = await project_repo.get_many(r["project_id"] for r in project_results)
+        
+            for project_result in project_results:
+                project_id = project_result["project_id"]
+                project_doc = project_docs.get(project_id)
             
-            if not project_doc:
-                continue
+                if not project_doc:
+                    continue
             
-            # Check application_deadline
-            application_deadline = project_doc.get("application_deadline")
+                # Check application_deadline
+                application_deadline = project_doc.get("application_deadline")
             
-            if application_deadline:
-                try:
-                    deadline_str = str(application_deadline).strip()
+                if application_deadline:
+                    try:
+                        deadline_str = str(application_deadline).strip()
                     
-                    if deadline_str.endswith('Z'):
-                        if re.search(r'[+-]\d{2}:\d{2}Z?$', deadline_str):
-                            deadline_str = deadline_str.rstrip('Z')
-                        else:
-                            deadline_str = deadline_str.replace('Z', '+00:00')
+                        if deadline_str.endswith('Z'):
+                            if re.search(r'[+-]\d{2}:\d{2}Z?$', deadline_str):
+                                deadline_str = deadline_str.rstrip('Z')
+                            else:
+                                deadline_str = deadline_str.replace('Z', '+00:00')
                     
-                    deadline_dt = datetime.fromisoformat(deadline_str)
+                        deadline_dt = datetime.fromisoformat(deadline_str)
                     
-                    if deadline_dt.tzinfo is None:
-                        deadline_dt = deadline_dt.replace(tzinfo=timezone.utc)
+                        if deadline_dt.tzinfo is None:
+                            deadline_dt = deadline_dt.replace(tzinfo=timezone.utc)
                     
-                    if deadline_dt > current_time:
-                        # Add full project details to the result
-                        project_result["project_details"] = {
-                            "job_title": project_doc.get("job_title"),
-                            "project_description": project_doc.get("project_description"),
-                            "project_skills": project_doc.get("project_skills", []),
-                            "employment_type": project_doc.get("employment_type"),
-                            "job_location": project_doc.get("job_location"),
-                            "salary_min": project_doc.get("salary_min"),
-                            "salary_max": project_doc.get("salary_max"),
-                            "salary_frequency": project_doc.get("salary_frequency"),
-                            "application_deadline": project_doc.get("application_deadline"),
-                            "created_at": project_doc.get("created_at"),
-                            "interviewer_id": project_doc.get("interviewer_id")
-                        }
-                        valid_projects.append(project_result)
-                    else:
-                        logger.info(f"Skipping project {project_id} - deadline {application_deadline} is in the past")
-                except (ValueError, AttributeError) as e:
-                    logger.error(f"Invalid deadline format for project {project_id}: {application_deadline}. Error: {str(e)}")
-            else:
-                # No deadline specified, include the project with details
-                project_result["project_details"] = {
-                    "job_title": project_doc.get("job_title"),
-                    "project_description": project_doc.get("project_description"),
-                    "project_skills": project_doc.get("project_skills", []),
-                    "employment_type": project_doc.get("employment_type"),
-                    "job_location": project_doc.get("job_location"),
-                    "salary_min": project_doc.get("salary_min"),
-                    "salary_max": project_doc.get("salary_max"),
-                    "salary_frequency": project_doc.get("salary_frequency"),
-                    "application_deadline": project_doc.get("application_deadline"),
-                    "created_at": project_doc.get("created_at"),
-                    "interviewer_id": project_doc.get("interviewer_id")
-                }
-                valid_projects.append(project_result)
+                        if deadline_dt > current_time:
+                            if earliest_deadline is None or deadline_dt < earliest_deadline:
+                                earliest_deadline = deadline_dt
+                            # Add full project details to the result
+                            project_result["project_details"] = {
+                                "job_title": project_doc.get("job_title"),
+                                "project_description": project_doc.get("project_description"),
+                                "project_skills": project_doc.get("project_skills", []),
+                                "employment_type": project_doc.get("employment_type"),
+                                "job_location": project_doc.get("job_location"),
+                                "salary_min": project_doc.get("salary_min"),
+                                "salary_max": project_doc.get("salary_max"),
+                                "salary_frequency": project_doc.get("salary_frequency"),
+                                "application_deadline": project_doc.get("application_deadline"),
+                                "created_at": project_doc.get("created_at"),
+                                "interviewer_id": project_doc.get("interviewer_id")
+                            }
+                            valid_projects.append(project_result)
+                        else:
+                            logger.info(f"Skipping project {project_id} - deadline {application_deadline} is in the past")
+                    except (ValueError, AttributeError) as e:
+                        logger.error(f"Invalid deadline format for project {project_id}: {application_deadline}. Error: {str(e)}")
+                else:
+                    # No deadline specified, include the project with details
+                    project_result["project_details"] = {
+                        "job_title": project_doc.get("job_title"),
+                        "project_description": project_doc.get("project_description"),
+                        "project_skills": project_doc.get("project_skills", []),
+                        "employment_type": project_doc.get("employment_type"),
+                        "job_location": project_doc.get("job_location"),
+                        "salary_min": project_doc.get("salary_min"),
+                        "salary_max": project_doc.get("salary_max"),
+                        "salary_frequency": project_doc.get("salary_frequency"),
+                        "application_deadline": project_doc.get("application_deadline"),
+                        "created_at": project_doc.get("created_at"),
+                        "interviewer_id": project_doc.get("interviewer_id")
+                    }
+                    valid_projects.append(project_result)
         
-        return {
-            "success": True,
-            "candidate_id": str(candidate_doc["_id"]),
-            "user_id": str(candidate_doc.get("user_id")),
-            "candidate_name": candidate_doc.get("name", "Unknown"),
-            "total_projects_matched": len(project_results),
-            "total_valid_projects": len(valid_projects),
-            "projects": valid_projects
-        }
+            response = {
+                "success": True,
+                "candidate_id": candidate_id,
+                "user_id": str(candidate_doc.get("user_id")),
+                "candidate_name": candidate_doc.get("name", "Unknown"),
+                "total_projects_matched": len(project_results),
+                "total_valid_projects": len(valid_projects),
+                "projects": valid_projects
+            }
+
+            # Cached until a relevant write or the earliest listed deadline passes
+            return relevant_projects_cache.set(cache_key, candidate_id, response, expires_at=earliest_deadline)
+
+        # Identical concurrent requests (same candidate, top_k and cache versions)
+        # share one computation
+        return json_bytes_response(await relevant_projects_flights.do(cache_key, build))
         
     except HTTPException:
         raise
@@ -1227,37 +1494,26 @@ async def get_relevant_projects_for_current_candidate(
 # 12. Job Applications - Candidate & Interviewer views
 # ------------------------------------------------------------
 
-def _extract_user_id_from_request(request: Request) -> str:
-    """
-    Helper to consistently extract JWT user_id from FastAPI request/cookies.
-    Returns user_id string or raises HTTPException if not authenticated.
-    """
-    user_id = getattr(request.state, "user_id", None)
+def _application_match_query(query: Dict[str, Any], min_score: Optional[float]) -> Dict[str, Any]:
+    if min_score is not None:
+        query["match.overall_score"] = {"$gte": min_score}
+    return query
 
-    if not user_id:
-        token = request.cookies.get("token")
-        if token:
-            try:
-                decoded = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-                user_id = (
-                    decoded.get("userId")
-                    or decoded.get("user_id")
-                    or decoded.get("id")
-                    or decoded.get("userID")
-                )
-            except jwt.ExpiredSignatureError:
-                raise HTTPException(status_code=401, detail="Token expired")
-            except jwt.InvalidTokenError:
-                raise HTTPException(status_code=401, detail="Invalid token")
 
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Authentication required")
+APPLICANTS_PAGE_MAX = int(os.getenv("APPLICANTS_PAGE_MAX", "500"))
 
-    return user_id
+
+def _application_sort(sort: str) -> List[tuple]:
+    """Sort spec for application lists; "match" uses the stored match score."""
+    if sort == "match":
+        return [("match.overall_score", -1), ("created_at", -1)]
+    if sort == "created_at":
+        return [("created_at", -1)]
+    raise HTTPException(status_code=400, detail="Invalid sort. Allowed: created_at, match")
 
 
 @app.post("/api/applications/apply")
-async def apply_to_project(request: Request, payload: dict = Body(...)):
+async def apply_to_project(payload: dict = Body(...), user_id: str = Depends(require_user_id)):
     """
     Candidate applies to a project.
     Expects JSON with at minimum:
@@ -1271,27 +1527,17 @@ async def apply_to_project(request: Request, payload: dict = Body(...)):
         if not project_id:
             raise HTTPException(status_code=400, detail="project_id is required")
 
-        user_id = _extract_user_id_from_request(request)
-
         # Candidate profile must exist and be linked via user_id
-        candidate_doc = candidates_col.find_one({"user_id": user_id})
+        candidate_doc = await candidate_repo.get_by_user(user_id)
         if not candidate_doc:
             raise HTTPException(
                 status_code=400,
                 detail="Candidate profile not found. Please complete your profile first.",
             )
 
-        # Avoid duplicate applications
-        existing = applications_col.find_one(
-            {"user_id": user_id, "project_id": project_id}
-        )
-        if existing:
-            return {
-                "success": True,
-                "application_id": str(existing["_id"]),
-                "status": existing.get("status", "applied"),
-                "message": "You have already applied to this job.",
-            }
+        project_doc = await project_repo.get(project_id)
+        if not project_doc:
+            raise HTTPException(status_code=404, detail="Project not found")
 
         now = datetime.utcnow().isoformat() + "Z"
 
@@ -1312,11 +1558,41 @@ async def apply_to_project(request: Request, payload: dict = Body(...)):
             "project_id": project_id,
             "status": "applied",
             "project_snapshot": snapshot,
+            # Fused match score, filled in below once the application is known to be new
+            "match": None,
             "created_at": now,
             "updated_at": now,
         }
 
-        applications_col.insert_one(app_doc)
+        # Single upsert on the unique (user_id, project_id) index; returns the
+        # existing application if the user already applied
+        application_key = {"user_id": user_id, "project_id": project_id}
+        try:
+            existing = await applications_col.find_one_and_update(
+                application_key,
+                {"$setOnInsert": app_doc},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            # A concurrent apply by the same user won the insert
+            existing = await applications_col.find_one(application_key)
+        if existing:
+            return {
+                "success": True,
+                "application_id": str(existing["_id"]),
+                "status": existing.get("status", "applied"),
+                "message": "You have already applied to this job.",
+            }
+        # Score only new applications (duplicates and retries return above), so
+        # applicant lists can sort by it without vector calls
+        match = await pinecone_executor.run(application_scores.compute, candidate_doc, project_doc)
+        await application_repo.update(app_doc["_id"], {"$set": {"match": match or unavailable_match()}})
+
+        # Legacy projects without counters are left to the lazy backfill
+        await project_repo.update(project_id, created_inc(), where=WHERE_COUNTED)
+        response_cache.invalidate(f"project:{project_id}", f"interviewer:{project_doc.get('interviewer_id')}")
+
         logger.info(
             f"Created application {app_doc['_id']} for user_id {user_id} project {project_id}"
         )
@@ -1335,29 +1611,74 @@ async def apply_to_project(request: Request, payload: dict = Body(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/applications/mine")
-async def get_my_applications(request: Request):
+MY_APPLICATIONS_PAGE_MAX = int(os.getenv("MY_APPLICATIONS_PAGE_MAX", "200"))
+
+# Response field -> application document field
+APPLICATION_LIST_FIELDS = {
+    "application_id": "_id",
+    "project_id": "project_id",
+    "status": "status",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "project_snapshot": "project_snapshot",
+    "match": "match",
+}
+
+
+def _application_row(doc: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    row = {
+        "application_id": str(doc.get("_id")),
+        "project_id": doc.get("project_id"),
+        "status": doc.get("status", "applied"),
+        "created_at": doc.get("created_at"),
+        "updated_at": doc.get("updated_at"),
+        "project_snapshot": doc.get("project_snapshot", {}),
+        "match": doc.get("match"),
+    }
+    return row if fields is None else {f: row[f] for f in fields}
+
+
+@app.get("/api/applications/mine", dependencies=COMPRESSED)
+async def get_my_applications(
+    request: Request,
+    sort: str = "created_at",
+    min_score: Optional[float] = None,
+    fields: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    user_id: str = Depends(require_user_id),
+):
     """
     Candidate: list all applications for the logged-in user.
+    sort: "created_at" (default) or "match"; min_score filters on the stored match score.
+    fields: comma-separated subset of the application fields to return.
+    Pass limit for keyset pagination; the response's next_cursor fetches the next page.
+    With Accept: application/x-ndjson the applications are streamed one per line instead,
+    followed (when paginating) by a {"next_cursor": ...} line.
     """
     try:
-        user_id = _extract_user_id_from_request(request)
+        requested = parse_fields(fields, APPLICATION_LIST_FIELDS)
+        if limit is not None and not 1 <= limit <= MY_APPLICATIONS_PAGE_MAX:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MY_APPLICATIONS_PAGE_MAX}")
+
+        sort_spec = _application_sort(sort) + [("_id", -1)]
+        projection = projection_for(
+            [APPLICATION_LIST_FIELDS[f] for f in requested] if requested is not None else None,
+            required=[field for field, _ in sort_spec],
+        )
+        query = page_query(_application_match_query({"user_id": user_id}, min_score), sort_spec, cursor)
+        docs = applications_col.find(query, projection or None).sort(sort_spec)
+        if limit is not None:
+            docs = docs.limit(limit + 1)
 
-        cursor = applications_col.find({"user_id": user_id}).sort("created_at", -1)
-        applications = []
-        for doc in cursor:
-            applications.append(
-                {
-                    "application_id": str(doc.get("_id")),
-                    "project_id": doc.get("project_id"),
-                    "status": doc.get("status", "applied"),
-                    "created_at": doc.get("created_at"),
-                    "updated_at": doc.get("updated_at"),
-                    "project_snapshot": doc.get("project_snapshot", {}),
-                }
-            )
+        if _wants_ndjson(request):
+            return _stream_ndjson(docs, lambda doc: _application_row(doc, requested), sort_spec, limit)
+
+        rows = await docs.to_list(length=None)
+        page_cursor = next_cursor(rows, sort_spec, limit)
+        applications = [_application_row(doc, requested) for doc in rows]
 
-        return {"success": True, "applications": applications}
+        return {"success": True, "applications": applications, "next_cursor": page_cursor}
 
     except HTTPException:
         raise
@@ -1366,15 +1687,23 @@ async def get_my_applications(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/applications/by-project/{project_id}")
-async def get_applications_for_project(project_id: str, request: Request):
+@app.get("/api/applications/by-project/{project_id}", dependencies=COMPRESSED)
+async def get_applications_for_project(
+    project_id: str,
+    sort: str = "match",
+    min_score: Optional[float] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    user_id: str = Depends(require_user_id),
+):
     """
     Interviewer: list all applicants for a specific project they own.
+    Each applicant carries the match score stored on the application;
+    sort: "match" (default) or "created_at"; min_score filters on it.
+    Pass limit for keyset pagination; the response's next_cursor fetches the next page.
     """
     try:
-        user_id = _extract_user_id_from_request(request)
-
-        project_doc = projects_col.find_one({"_id": project_id})
+        project_doc = await project_repo.get(project_id)
         if not project_doc:
             raise HTTPException(status_code=404, detail="Project not found")
 
@@ -1383,39 +1712,75 @@ async def get_applications_for_project(project_id: str, request: Request):
                 status_code=403,
                 detail="You are not authorized to view applicants for this project",
             )
+        if limit is not None and not 1 <= limit <= APPLICANTS_PAGE_MAX:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {APPLICANTS_PAGE_MAX}")
+
+        sort_spec = _application_sort(sort) + [("_id", -1)]
+
+        if not cursor:
+            # Applications created before scores were stored: score just these
+            # applicants (batched vector fetch by ID) so the sort below sees them.
+            # Ones that can't be scored are marked unavailable, so this runs once each
+            unscored = await applications_col.find(
+                {"project_id": project_id, "match": None}, {"_id": 1, "candidate_id": 1}
+            ).to_list(length=None)
+            if unscored:
+                await pinecone_executor.run(application_scores.refresh_applications, unscored,
+                                            project_doc=project_doc, mark_unavailable=True)
+
+        # One round trip: page of applications joined with just the displayed candidate fields
+        query = _application_match_query({"project_id": project_id}, min_score)
+        pipeline = [
+            {"$match": page_query(query, sort_spec, cursor)},
+            {"$sort": dict(sort_spec)},
+        ]
+        if limit is not None:
+            pipeline.append({"$limit": limit + 1})
+        pipeline += [
+            {"$lookup": {
+                "from": candidates_col.name,
+                "let": {"candidate_id": "$candidate_id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$_id", "$$candidate_id"]}}},
+                    {"$project": {
+                        "_id": 0,
+                        "name": 1,
+                        "total_experience_years": 1,
+                        "current_role": {"$let": {
+                            "vars": {"first": {"$arrayElemAt": ["$experience", 0]}},
+                            "in": "$$first.designation",
+                        }},
+                    }},
+                ],
+                "as": "candidate",
+            }},
+            {"$project": {
+                "status": 1,
+                "candidate_id": 1,
+                "created_at": 1,
+                "updated_at": 1,
+                "match": 1,
+                "candidate": {"$arrayElemAt": ["$candidate", 0]},
+            }},
+        ]
+        docs = await applications_col.aggregate(pipeline).to_list(length=None)
+        next_page = next_cursor(docs, sort_spec, limit)
 
-        cursor = applications_col.find({"project_id": project_id}).sort(
-            "created_at", -1
-        )
         applicants = []
-
-        for doc in cursor:
-            candidate_id = doc.get("candidate_id")
-            candidate_doc = None
-            if candidate_id:
-                candidate_doc = candidates_col.find_one({"_id": candidate_id})
-
+        for doc in docs:
+            candidate_doc = doc.get("candidate") or {}
             applicants.append(
                 {
                     "application_id": str(doc.get("_id")),
                     "status": doc.get("status", "applied"),
                     "created_at": doc.get("created_at"),
                     "updated_at": doc.get("updated_at"),
+                    "match": doc.get("match"),
                     "candidate": {
-                        "candidate_id": candidate_id,
-                        "name": candidate_doc.get("name")
-                        if candidate_doc
-                        else "Unknown",
-                        "total_experience_years": candidate_doc.get(
-                            "total_experience_years"
-                        )
-                        if candidate_doc
-                        else None,
-                        "current_role": candidate_doc.get("experience", [{}])[0].get(
-                            "designation"
-                        )
-                        if candidate_doc and candidate_doc.get("experience")
-                        else None,
+                        "candidate_id": doc.get("candidate_id"),
+                        "name": candidate_doc.get("name") if candidate_doc else "Unknown",
+                        "total_experience_years": candidate_doc.get("total_experience_years"),
+                        "current_role": candidate_doc.get("current_role"),
                     },
                 }
             )
@@ -1424,6 +1789,7 @@ async def get_applications_for_project(project_id: str, request: Request):
             "success": True,
             "project_id": project_id,
             "applicants": applicants,
+            "next_cursor": next_page,
         }
 
     except HTTPException:
@@ -1434,23 +1800,33 @@ async def get_applications_for_project(project_id: str, request: Request):
 
 
 @app.get("/api/applications/counts-for-my-projects")
-async def get_application_counts_for_my_projects(request: Request):
+async def get_application_counts_for_my_projects(user_id: str = Depends(require_user_id)):
     """
     Interviewer: get application counts for all of their projects.
-    Returns a mapping of { project_id: count }.
+    Returns a mapping of { project_id: count } plus the per-status breakdown.
     """
     try:
-        user_id = _extract_user_id_from_request(request)
-
-        # Find all projects owned by this interviewer
-        projects = list(projects_col.find({"interviewer_id": user_id}, {"_id": 1}))
-        project_ids = [str(p["_id"]) for p in projects]
-
-        counts = {}
-        for pid in project_ids:
-            counts[pid] = applications_col.count_documents({"project_id": pid})
+        # Counters are maintained on each project document
+        projects = await projects_col.find(
+            {"interviewer_id": user_id}, {"_id": 1, COUNTS_FIELD: 1}
+        ).to_list(length=None)
+        status_counts = {str(p["_id"]): p.get(COUNTS_FIELD) for p in projects}
+
+        # Projects created before counters existed: count once and store
+        missing = [pid for pid, project_counts in status_counts.items() if project_counts is None]
+        if missing:
+            rows = await applications_col.aggregate(counts_pipeline(missing)).to_list(length=None)
+            for pid, project_counts in fold_counts(rows, missing).items():
+                status_counts[pid] = project_counts
+                await projects_col.update_one(
+                    {"_id": pid, COUNTS_FIELD: {"$exists": False}}, {"$set": {COUNTS_FIELD: project_counts}}
+                )
+                project_repo.invalidate(pid)
+                response_cache.invalidate(f"project:{pid}")
+            response_cache.invalidate(f"interviewer:{user_id}")
 
-        return {"success": True, "counts": counts}
+        counts = {pid: project_counts.get("total", 0) for pid, project_counts in status_counts.items()}
+        return {"success": True, "counts": counts, "status_counts": status_counts}
 
     except HTTPException:
         raise
@@ -1459,6 +1835,26 @@ async def get_application_counts_for_my_projects(request: Request):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+BULK_INVITE_MAX = int(os.getenv("BULK_INVITE_MAX", "500"))
+
+SMTP_CONFIG_MISSING = "Email configuration is missing. Please set SMTP_HOST, SMTP_USER, SMTP_PASSWORD, and SENDER_EMAIL."
+
+
+def _invitation_email(recipient_email: str, candidate_doc: Dict[str, Any],
+                      project_doc: Dict[str, Any]) -> OutgoingEmail:
+    project_title = project_doc.get("job_title") or project_doc.get("project_heading") or "Job Opportunity"
+    candidate_name = candidate_doc.get("name", "Candidate")
+
+    subject = f"Interview Opportunity: {project_title}"
+    html_body = f"""
+    <h3>Hi {candidate_name},</h3>
+    <p>You have been invited to apply for the role of <strong>{project_title}</strong>.</p>
+    <p>Please log in to the HireAI portal to review the job details and continue the interview process.</p>
+    <p>Best regards,<br/>HireAI Team</p>
+    """
+    return OutgoingEmail(to=recipient_email, subject=subject, html=html_body)
+
+
 @app.post("/api/invite-candidate")
 async def invite_candidate(payload: Dict[str, Any] = Body(...)):
     """
@@ -1466,6 +1862,8 @@ async def invite_candidate(payload: Dict[str, Any] = Body(...)):
     Expects JSON with:
       - project_id: str
       - candidate_id: str
+    The message goes through the email queue (pooled SMTP connection, retries)
+    and this call waits for its delivery.
     """
     try:
         project_id = payload.get("project_id")
@@ -1474,11 +1872,11 @@ async def invite_candidate(payload: Dict[str, Any] = Body(...)):
         if not project_id or not candidate_id:
             raise HTTPException(status_code=400, detail="project_id and candidate_id are required")
 
-        project_doc = projects_col.find_one({"_id": project_id})
+        project_doc = await project_repo.get(project_id)
         if not project_doc:
             raise HTTPException(status_code=404, detail="Project not found")
 
-        candidate_doc = candidates_col.find_one({"_id": candidate_id})
+        candidate_doc = await candidate_repo.get(candidate_id)
         if not candidate_doc:
             raise HTTPException(status_code=404, detail="Candidate not found")
 
@@ -1486,49 +1884,15 @@ async def invite_candidate(payload: Dict[str, Any] = Body(...)):
         if not recipient_email:
             raise HTTPException(status_code=400, detail="Candidate email not available")
 
-        project_title = project_doc.get("job_title") or project_doc.get("project_heading") or "Job Opportunity"
-        candidate_name = candidate_doc.get("name", "Candidate")
+        if not smtp_configured():
+            raise HTTPException(status_code=500, detail=SMTP_CONFIG_MISSING)
 
-        # Email configuration from environment
-        smtp_host = os.getenv("SMTP_HOST")
-        smtp_port = int(os.getenv("SMTP_PORT", "587"))
-        smtp_user = os.getenv("SMTP_USER")
-        smtp_password = os.getenv("SMTP_PASSWORD")
-        sender_email = os.getenv("SENDER_EMAIL", smtp_user)
+        job = email_queue.submit([_invitation_email(recipient_email, candidate_doc, project_doc)],
+                                 kind="invite", project_id=project_id)
+        await job.wait()
 
-        if not (smtp_host and smtp_user and smtp_password and sender_email):
-            raise HTTPException(
-                status_code=500,
-                detail="Email configuration is missing. Please set SMTP_HOST, SMTP_USER, SMTP_PASSWORD, and SENDER_EMAIL.",
-            )
-
-        subject = f"Interview Opportunity: {project_title}"
-        html_body = f"""
-        <h3>Hi {candidate_name},</h3>
-        <p>You have been invited to apply for the role of <strong>{project_title}</strong>.</p>
-        <p>Please log in to the HireAI portal to review the job details and continue the interview process.</p>
-        <p>Best regards,<br/>HireAI Team</p>
-        """
-
-        message = emails.html(
-            subject=subject,
-            html=html_body,
-            mail_from=sender_email,
-        )
-
-        response = message.send(
-            to=recipient_email,
-            smtp={
-                "host": smtp_host,
-                "port": smtp_port,
-                "user": smtp_user,
-                "password": smtp_password,
-                "tls": True,
-            },
-        )
-
-        if response.status_code not in (250, 251):
-            logger.error("Failed to send invite email. SMTP response: %s", response)
+        if job.failed:
+            logger.error("Failed to send invite email: %s", job.results)
             raise HTTPException(status_code=500, detail="Failed to send invitation email")
 
         return {
@@ -1543,31 +1907,97 @@ async def invite_candidate(payload: Dict[str, Any] = Body(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/invite-candidates", status_code=202)
+async def invite_candidates(payload: Dict[str, Any] = Body(...), user_id: str = Depends(require_user_id)):
+    """
+    Interviewer: queue invitation emails to many candidates for a project they own.
+    Expects JSON with:
+      - project_id: str
+      - candidate_ids: list of str
+    Returns a job ID immediately; poll /api/invite-jobs/{job_id} for delivery results.
+    """
+    try:
+        project_id = payload.get("project_id")
+        candidate_ids = payload.get("candidate_ids") or []
+
+        if not project_id or not isinstance(candidate_ids, list) or not candidate_ids:
+            raise HTTPException(status_code=400, detail="project_id and a non-empty candidate_ids list are required")
+        candidate_ids = list(dict.fromkeys(str(cid) for cid in candidate_ids))
+        if len(candidate_ids) > BULK_INVITE_MAX:
+            raise HTTPException(status_code=400, detail=f"At most {BULK_INVITE_MAX} candidates per request")
+
+        project_doc = await project_repo.get(project_id)
+        if not project_doc:
+            raise HTTPException(status_code=404, detail="Project not found")
+        if str(project_doc.get("interviewer_id")) != str(user_id):
+            raise HTTPException(status_code=403, detail="You are not authorized to invite candidates to this project")
+
+        if not smtp_configured():
+            raise HTTPException(status_code=500, detail=SMTP_CONFIG_MISSING)
+
+        # One $in query for every candidate not already cached
+        candidate_docs = await candidate_repo.get_many(candidate_ids)
+
+        messages = []
+        skipped = []
+        for candidate_id in candidate_ids:
+            candidate_doc = candidate_docs.get(candidate_id)
+            if not candidate_doc:
+                skipped.append({"candidate_id": candidate_id, "reason": "Candidate not found"})
+            elif not candidate_doc.get("mail"):
+                skipped.append({"candidate_id": candidate_id, "reason": "Candidate email not available"})
+            else:
+                messages.append(_invitation_email(candidate_doc["mail"], candidate_doc, project_doc))
+
+        job = email_queue.submit(messages, kind="invite", project_id=project_id, skipped=skipped,
+                                 user_id=user_id)
+
+        return {
+            "success": True,
+            "job_id": job.job_id,
+            "queued": len(messages),
+            "skipped": skipped,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Failed to queue invitation emails")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/invite-jobs/{job_id}")
+async def get_invite_job(job_id: str, user_id: str = Depends(require_user_id)):
+    """Progress and per-recipient results of a bulk invite (owner only)."""
+    job = job_registry.get(job_id)
+    if not job or job.kind != "invite" or job.meta.get("user_id") != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"success": True, "job": job.to_dict()}
+
+
 @app.patch("/api/applications/{application_id}/status")
 async def update_application_status(
-    application_id: str, request: Request, payload: dict = Body(...)
+    application_id: str, payload: dict = Body(...), user_id: str = Depends(require_user_id)
 ):
     """
     Interviewer: update status of an application.
     Allowed statuses: applied, shortlisted, rejected, hired.
     """
     try:
-        user_id = _extract_user_id_from_request(request)
         new_status = (payload.get("status") or "").lower()
 
-        allowed_statuses = {"applied", "shortlisted", "rejected", "hired"}
-        if new_status not in allowed_statuses:
+        if new_status not in APPLICATION_STATUSES:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid status. Allowed: {', '.join(sorted(allowed_statuses))}",
+                detail=f"Invalid status. Allowed: {', '.join(sorted(APPLICATION_STATUSES))}",
             )
 
-        app_doc = applications_col.find_one({"_id": application_id})
+        app_doc = await application_repo.get(application_id)
         if not app_doc:
             raise HTTPException(status_code=404, detail="Application not found")
 
         project_id = app_doc.get("project_id")
-        project_doc = projects_col.find_one({"_id": project_id})
+        project_doc = await project_repo.get(project_id)
         if not project_doc:
             raise HTTPException(status_code=404, detail="Project not found")
 
@@ -1578,10 +2008,19 @@ async def update_application_status(
             )
 
         now = datetime.utcnow().isoformat() + "Z"
-        applications_col.update_one(
+        # Read the previous status atomically with the write so the counters
+        # move exactly once even under concurrent updates
+        previous = await applications_col.find_one_and_update(
             {"_id": application_id},
             {"$set": {"status": new_status, "updated_at": now}},
+            projection={"status": 1},
+            return_document=ReturnDocument.BEFORE,
         )
+        application_repo.invalidate(application_id)
+        old_status = (previous or {}).get("status", "applied")
+        if previous and old_status != new_status:
+            await project_repo.update(project_id, status_change_inc(old_status, new_status), where=WHERE_COUNTED)
+            response_cache.invalidate(f"project:{project_id}", f"interviewer:{user_id}")
 
         return {
             "success": True,
@@ -1597,38 +2036,41 @@ async def update_application_status(
 
 # 12. Get Project by ID (NEW)
 # ------------------------------------------------------------
-@app.get("/api/project/{project_id}", response_model=ProjectResponse)
-async def get_project(project_id: str):
+@app.get("/api/project/{project_id}", response_model=ProjectResponse, dependencies=COMPRESSED)
+async def get_project(project_id: str, request: Request):
     """
     Retrieve project information by project ID.
     """
-    doc = projects_col.find_one({"_id": project_id})
-    if not doc:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Convert ObjectId to string for JSON serialization if present
-    if "_id" in doc:
-        doc["_id"] = str(doc["_id"])
-    
-    return {
-        "success": True, 
-        "project": doc,
-        "vector_ids": doc.get("vector_ids", {})
-    }
+    async def build():
+        doc = await project_repo.get(project_id)
+        if not doc:
+            raise HTTPException(status_code=404, detail="Project not found")
+
+        # Convert ObjectId to string for JSON serialization if present
+        if "_id" in doc:
+            doc["_id"] = str(doc["_id"])
+
+        return {
+            "success": True,
+            "project": doc,
+            "vector_ids": doc.get("vector_ids", {})
+        }
+
+    return await _cached_json(request, "project", project_id, [f"project:{project_id}"], build, ProjectResponse)
 
 
 # ------------------------------------------------------------
 # 13. Update Project (NEW)
 # ------------------------------------------------------------
 @app.put("/project/{project_id}", response_model=ProjectResponse)
-async def update_project(project_id: str, payload: ProjectUpdateRequest):
+async def update_project(project_id: str, payload: ProjectUpdateRequest, background_tasks: BackgroundTasks):
     """
     Update project JSON and update Pinecone.
     All fields are optional - only provided fields will be updated.
     """
     try:
         # Check if project exists
-        existing_doc = projects_col.find_one({"_id": project_id})
+        existing_doc = await project_repo.get(project_id)
         if not existing_doc:
             raise HTTPException(status_code=404, detail="Project not found")
 
@@ -1689,7 +2131,7 @@ async def update_project(project_id: str, payload: ProjectUpdateRequest):
             "project_description": project_description,
             "project_skills": project_skills
         }
-        pinecone_result = pinecone_vectoriser.update_project(pinecone_payload, project_id)
+        pinecone_result = await pinecone_executor.run(pinecone_vectoriser.update_project, pinecone_payload, project_id)
         
         if not pinecone_result["success"]:
             raise HTTPException(
@@ -1706,8 +2148,31 @@ async def update_project(project_id: str, payload: ProjectUpdateRequest):
         # Preserve created_at if it exists
         if "created_at" in existing_doc:
             payload_copy["created_at"] = existing_doc["created_at"]
+        # New vectors: the match column is stale until recomputed
+        payload_copy.pop("matches_computed_at", None)
+        # Counters are only ever moved by $inc; don't overwrite them with the value read above
+        payload_copy.pop(COUNTS_FIELD, None)
 
-        projects_col.replace_one({"_id": project_id}, payload_copy, upsert=True)
+        await project_repo.update(
+            project_id,
+            {
+                "$set": {k: v for k, v in payload_copy.items() if k != "_id"},
+                "$unset": {"matches_computed_at": ""},
+            },
+            upsert=True,
+        )
+
+        # Ranking inputs changed -> any candidate may be affected; otherwise only
+        # candidates whose cached list shows this project's details
+        ranking_fields = ("project_description", "project_skills", "application_deadline")
+        if any(payload_copy.get(f) != existing_doc.get(f) for f in ranking_fields):
+            relevant_projects_cache.invalidate_all()
+        else:
+            relevant_projects_cache.invalidate_project(project_id)
+        response_cache.invalidate(f"project:{project_id}", f"interviewer:{existing_doc.get('interviewer_id')}")
+
+        # Vectors were regenerated, so recompute this project's column
+        background_tasks.add_task(_refresh_in_background, _refresh_project_matches, project_id)
 
         logger.info(f"Successfully updated project: {project_id}")
         logger.info(f"Updated vector IDs: {pinecone_result['vector_ids']}")
@@ -1735,20 +2200,23 @@ async def delete_project(project_id: str):
     """
     try:
         # Get project first to log vector IDs
-        project = projects_col.find_one({"_id": project_id})
+        project = await project_repo.get(project_id)
         if not project:
             raise HTTPException(status_code=404, detail="Project not found")
 
         # Delete from MongoDB
-        result = projects_col.delete_one({"_id": project_id})
+        result = await project_repo.delete(project_id)
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Project not found")
+        await run_in_threadpool(match_store.remove_project, project_id)
+        relevant_projects_cache.invalidate_project(project_id)
+        response_cache.invalidate(f"project:{project_id}", f"interviewer:{project.get('interviewer_id')}")
 
         # Delete from Pinecone using stored vector IDs
         vector_ids = project.get("vector_ids", {})
         logger.info(f"Deleting project {project_id} with vector IDs: {vector_ids}")
         
-        success = pinecone_vectoriser.delete_project(project_id)
+        success = await pinecone_executor.run(pinecone_vectoriser.delete_project, project_id)
         
         if not success:
             logger.warning(f"Failed to delete project {project_id} from Pinecone")
@@ -1769,8 +2237,10 @@ async def delete_project(project_id: str):
 # 15. Get ranked candidates for project (UPDATED)
 # ------------------------------------------------------------
 
-@app.post("/get-ranked-candidates", response_model=GetRankedCandidatesResponse)
-@app.post("/api/get-ranked-candidates", response_model=GetRankedCandidatesResponse)
+@app.post("/get-ranked-candidates", response_model=GetRankedCandidatesResponse,
+          dependencies=COMPRESSED + [Depends(admission("ranked_candidates"))])
+@app.post("/api/get-ranked-candidates", response_model=GetRankedCandidatesResponse,
+          dependencies=COMPRESSED + [Depends(admission("ranked_candidates"))])
 async def get_ranked_candidates(request: GetRankedCandidatesRequest):
     """
     Get ranked candidates based on project ID.
@@ -1784,89 +2254,112 @@ async def get_ranked_candidates(request: GetRankedCandidatesRequest):
         # Convert filters to dict, keeping None values for filters that should be ignored
         filters = request.filters.model_dump() if request.filters else {}
         
-        # Fetch project from MongoDB
-        project_doc = projects_col.find_one({"_id": project_id})
-        if not project_doc:
-            raise HTTPException(status_code=404, detail="Project not found")
-        
-        # Extract project description and skills
-        project_description = project_doc.get("project_description", "")
-        project_skills_raw = project_doc.get("project_skills", [])
-        
-        # Handle project_skills - can be list or string
-        if isinstance(project_skills_raw, str):
-            # Convert comma-separated string to list
-            required_skills = [skill.strip() for skill in project_skills_raw.split(",") if skill.strip()]
-        elif isinstance(project_skills_raw, list):
-            required_skills = [str(skill).strip() for skill in project_skills_raw if skill]
-        else:
-            required_skills = []
-        
-        if not project_description:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Project description not found in project data"
-            )
-        
-        if not required_skills:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Project skills not found in project data"
-            )
+        async def build() -> bytes:
+            # Fetch project from MongoDB
+            project_doc = await project_repo.get(project_id)
+            if not project_doc:
+                raise HTTPException(status_code=404, detail="Project not found")
+        
+            # Extract project description and skills
+            project_description = project_doc.get("project_description", "")
+            project_skills_raw = project_doc.get("project_skills", [])
+        
+            # Handle project_skills - can be list or string
+            if isinstance(project_skills_raw, str):
+                # Convert comma-separated string to list
+                required_skills = [skill.strip() for skill in project_skills_raw.split(",") if skill.strip()]
+            elif isinstance(project_skills_raw, list):
+                required_skills = [str(skill).strip() for skill in project_skills_raw if skill]
+            else:
+                required_skills = []
         
-        # Initialize the retrieval pipeline
-        retrieval_pipeline = CandidateRetrievalPipeline()
+            if not project_description:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Project description not found in project data"
+                )
         
-        # Retrieve ranked candidates (this returns all candidates, not just top-k)
-        results = retrieval_pipeline.retrieve_ranked_candidates(
-            project_description=project_description,
-            required_skills=required_skills,
-            filters=filters
-        )
+            if not required_skills:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Project skills not found in project data"
+                )
         
-        # Limit to top_k results
-        combined_results = results["combined_ranked"][:top_k]
-
-        # Enrich each candidate with email + has_applied flag
-        enriched_results = []
-        for candidate in combined_results:
-            candidate_id = candidate.get("candidate_id")
-            email: Optional[str] = None
-            has_applied: bool = False
-
-            if candidate_id:
-                # Look up candidate profile for email
-                cand_doc = candidates_col.find_one({"_id": candidate_id})
-                if cand_doc:
-                    email = cand_doc.get("mail")
-
-                # Check if this candidate has already applied to the project
-                has_applied = applications_col.count_documents(
-                    {"candidate_id": candidate_id, "project_id": project_id}
-                ) > 0
-
-            enriched_candidate = dict(candidate)
-            enriched_candidate["email"] = email
-            enriched_candidate["has_applied"] = has_applied
-            enriched_results.append(enriched_candidate)
-
-        # Return only the enriched combined ranked results (top_k)
-        return {
-            "success": True,
-            "project_id": project_id,
-            "project_description": project_description,
-            "required_skills": required_skills,
-            "filters_applied": filters,
-            "top_k": top_k,
-            "results_count": {
-                "professional_summary": len(results["professional_summary_ranked"]),
-                "project_portfolio": len(results["project_portfolio_ranked"]),
-                "skills_matrix": len(results["skills_matrix_ranked"]),
-                "combined_total": len(results["combined_ranked"]),
-                "combined_returned": len(enriched_results)
-            },
-            "combined_ranked_results": enriched_results
-        }
+            combined_results = None
+            if project_doc.get("matches_computed_at") and top_k <= MATCH_STORE_TOP_N:
+                # Indexed top-k read from the match store (it keeps the top N per project)
+                combined_results = await match_store.top_candidates(project_id, top_k, filters)
+                # The top N are kept before filtering: a filter that leaves fewer
+                # than top_k of them needs the full pool
+                if len(combined_results) < top_k and any(v is not None for v in filters.values()):
+                    combined_results = None
+                else:
+                    # Counted over the candidates the store keeps for this project
+                    counts = await match_store.count_candidates(project_id, filters)
+                    results_count = {
+                        "professional_summary": counts["professional_score"],
+                        "project_portfolio": counts["project_score"],
+                        "skills_matrix": counts["skills_score"],
+                        "combined_total": counts["overall_score"],
+                    }
+            if combined_results is None:
+                # Column not computed yet (or not enough of it): run the live retrieval pipeline
+                # Retrieve ranked candidates (this returns all candidates, not just top-k)
+                results = await pinecone_executor.run(
+                    _retrieve_ranked_candidates, project_description, required_skills, filters
+                )
+            
+                # Limit to top_k results
+                combined_results = results["combined_ranked"][:top_k]
+                results_count = {
+                    "professional_summary": len(results["professional_summary_ranked"]),
+                    "project_portfolio": len(results["project_portfolio_ranked"]),
+                    "skills_matrix": len(results["skills_matrix_ranked"]),
+                    "combined_total": len(results["combined_ranked"]),
+                }
+
+            # Enrich each candidate with email + has_applied flag: one $in query per
+            # collection, joined in memory
+            candidate_ids = [c.get("candidate_id") for c in combined_results if c.get("candidate_id")]
+            emails_by_id = {}
+            applied_ids = set()
+            if candidate_ids:
+                emails_by_id = {
+                    doc["_id"]: doc.get("mail")
+                    async for doc in candidates_col.find({"_id": {"$in": candidate_ids}}, {"mail": 1})
+                }
+                applied_ids = set(await applications_col.distinct(
+                    "candidate_id", {"project_id": project_id, "candidate_id": {"$in": candidate_ids}}
+                ))
+
+            enriched_results = []
+            for candidate in combined_results:
+                candidate_id = candidate.get("candidate_id")
+                enriched_candidate = dict(candidate)
+                enriched_candidate["email"] = emails_by_id.get(candidate_id)
+                enriched_candidate["has_applied"] = candidate_id in applied_ids
+                enriched_results.append(enriched_candidate)
+
+            # Return only the enriched combined ranked results (top_k). Serialized here
+            # (once per coalesced group) so FastAPI skips jsonable_encoder and
+            # response_model validation; shape_like applies the model's field filtering
+            return dumps({
+                "success": True,
+                "project_id": project_id,
+                "project_description": project_description,
+                "required_skills": required_skills,
+                "filters_applied": filters,
+                "top_k": top_k,
+                "results_count": {
+                    **results_count,
+                    "combined_returned": len(enriched_results)
+                },
+                "combined_ranked_results": [shape_like(RankedCandidate, c) for c in enriched_results]
+            })
+
+        # Identical concurrent requests share one computation
+        flight_key = (project_id, top_k, dumps(filters, sort_keys=True))
+        return json_bytes_response(await ranking_flights.do(flight_key, build))
 
     except HTTPException:
         raise
@@ -1882,47 +2375,66 @@ async def get_ranked_candidates(request: GetRankedCandidatesRequest):
 # 16. Get All Projects under an Interviewer 
 # ------------------------------------------------------------
 
-@app.get("/api/get-my-projects")
-async def get_my_projects(request: Request):
+MY_PROJECTS_PAGE_MAX = int(os.getenv("MY_PROJECTS_PAGE_MAX", "200"))
+MY_PROJECTS_SORT = [("created_at", -1), ("_id", -1)]
+# Vector bookkeeping the dashboards never render; only returned when asked for via fields
+PROJECT_VECTOR_FIELDS = ("vector_ids", "pinecone_metadata")
+
+
+def _project_row(project: Dict[str, Any]) -> Dict[str, Any]:
+    project["_id"] = str(project["_id"])
+    return project
+
+
+@app.get("/api/get-my-projects", dependencies=COMPRESSED)
+async def get_my_projects(
+    request: Request,
+    fields: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    interviewer_id: str = Depends(require_user_id),
+):
     """
-    Fetch all projects created by the logged-in interviewer.
+    Fetch all projects created by the logged-in interviewer, newest first.
     interviewer_id is automatically extracted from cookie/JWT token.
+    fields: comma-separated project fields to return (default: all but vector_ids/pinecone_metadata).
+    Pass limit for keyset pagination; the response's next_cursor fetches the next page.
+    With Accept: application/x-ndjson the projects are streamed one per line instead,
+    followed (when paginating) by a {"next_cursor": ...} line.
     """
     try:
-        # Try to extract interviewer_id from request or cookie (same as register-project)
-        interviewer_id = getattr(request.state, 'user_id', None) or getattr(request, 'user_id', None)
-
-        # Try to decode from cookie if not found
-        if not interviewer_id:
-            token = request.cookies.get("token")
-            if token:
-                try:
-                    decoded = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-                    interviewer_id = decoded.get("userId") or decoded.get("id")
-                except jwt.ExpiredSignatureError:
-                    raise HTTPException(status_code=401, detail="Token expired")
-                except jwt.InvalidTokenError:
-                    raise HTTPException(status_code=401, detail="Invalid token")
-
-        if not interviewer_id:
-            raise HTTPException(status_code=401, detail="Authentication required")
-
-        # Fetch all projects from MongoDB for that interviewer
-        projects = list(projects_col.find({"interviewer_id": interviewer_id}))
-
-        # Convert ObjectId to string and format response
-        for project in projects:
-            project["_id"] = str(project["_id"])
-
-        if not projects:
-            return {"message": "No projects found for this interviewer", "projects": []}
+        requested = parse_fields(fields)
+        if limit is not None and not 1 <= limit <= MY_PROJECTS_PAGE_MAX:
+            raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MY_PROJECTS_PAGE_MAX}")
 
-        return {
-            "success": True,
-            "count": len(projects),
-            "projects": projects
-        }
+        projection = projection_for(requested, required=[field for field, _ in MY_PROJECTS_SORT],
+                                    exclude=PROJECT_VECTOR_FIELDS)
+        query = page_query({"interviewer_id": interviewer_id}, MY_PROJECTS_SORT, cursor)
+
+        def find():
+            docs = projects_col.find(query, projection).sort(MY_PROJECTS_SORT)
+            return docs.limit(limit + 1) if limit is not None else docs
+
+        if _wants_ndjson(request):
+            return _stream_ndjson(find(), _project_row, MY_PROJECTS_SORT, limit)
+
+        async def build():
+            projects = await find().to_list(length=None)
+            page_cursor = next_cursor(projects, MY_PROJECTS_SORT, limit)
+            projects = [_project_row(project) for project in projects]
+
+            if not projects and not cursor:
+                return {"message": "No projects found for this interviewer", "projects": []}
+
+            return {
+                "success": True,
+                "count": len(projects),
+                "projects": projects,
+                "next_cursor": page_cursor,
+            }
 
+        ident = f"{interviewer_id}:{','.join(requested or [])}:{limit}:{cursor}"
+        return await _cached_json(request, "my-projects", ident, [f"interviewer:{interviewer_id}"], build)
     except HTTPException:
         raise
     except Exception as e:
@@ -0,0 +1,149 @@
+"""
+Per-Route Admission Control
+The routes that call paid, rate-limited upstreams (LLM parsing, embeddings,
+Pinecone retrieval) each get a concurrency limit and a bounded wait queue:
+
+    @app.post("/api/parse-resume", dependencies=[Depends(admission("parse_resume"))])
+
+Requests beyond the limit wait for a slot; once ADMISSION_<ROUTE>_QUEUE are
+waiting, or a request has waited ADMISSION_MAX_WAIT_SECONDS, it is shed with
+503 + Retry-After instead of queueing without bound. This sits in front of the
+shared executors (services.executors), which still bound the total work per
+upstream across routes and serve interactive calls before background work.
+
+Configure with ADMISSION_<ROUTE>_LIMIT and ADMISSION_<ROUTE>_QUEUE.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from services.executors import ExecutorSaturated
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_MAX_WAIT_SECONDS = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "10"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "5"))
+
+
+class RouteLimiter:
+    def __init__(self, name: str, limit: int, max_queue: int,
+                 max_wait: float = ADMISSION_MAX_WAIT_SECONDS, retry_after: int = ADMISSION_RETRY_AFTER):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        self.queued = 0
+        self.running = 0
+        self.max_queue_depth = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+
+    def _reject(self, reason: str):
+        logger.warning(f"Shedding {self.name} request ({reason}): {self.running} running, {self.queued} queued")
+        raise ExecutorSaturated(f"{self.name} route", self.retry_after)
+
+    async def acquire(self):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.limit)
+        # Counted rather than semaphore.locked(): a burst arrives before any of it acquires
+        if self.running + self.queued >= self.limit + self.max_queue:
+            self.rejected += 1
+            self._reject("queue full")
+
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        enqueued = time.perf_counter()
+        acquire = asyncio.ensure_future(self._slots.acquire())
+        try:
+            done, _ = await asyncio.wait({acquire}, timeout=self.max_wait)
+        except asyncio.CancelledError:
+            # Client went away while waiting
+            self._abandon(acquire)
+            raise
+        finally:
+            self.queued -= 1
+        if not done:
+            self._abandon(acquire)
+            self.timed_out += 1
+            self._reject("waited too long")
+        self.total_wait += time.perf_counter() - enqueued
+        self.admitted += 1
+        self.running += 1
+
+    def _abandon(self, acquire: asyncio.Future):
+        """Cancel a slot wait; if the slot was granted anyway (cancel lost the race), give it back."""
+        acquire.cancel()
+        acquire.add_done_callback(self._release_if_acquired)
+
+    def _release_if_acquired(self, acquire: asyncio.Future):
+        if not acquire.cancelled() and acquire.exception() is None:
+            self._slots.release()
+
+    def release(self):
+        self.running -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait_ms": self.total_wait / self.admitted * 1000 if self.admitted else 0.0,
+        }
+
+
+def _limiter(name: str, limit: int, queue: int) -> RouteLimiter:
+    prefix = f"ADMISSION_{name.upper()}"
+    return RouteLimiter(
+        name,
+        limit=int(os.getenv(f"{prefix}_LIMIT", str(limit))),
+        max_queue=int(os.getenv(f"{prefix}_QUEUE", str(queue))),
+    )
+
+
+# Global instances
+ROUTE_LIMITERS: Dict[str, RouteLimiter] = {
+    limiter.name: limiter for limiter in (
+        _limiter("parse_resume", limit=8, queue=16),
+        # Each bulk upload buffers up to BULK_RESUME_MAX_UPLOAD_BYTES
+        _limiter("bulk_resumes", limit=2, queue=4),
+        _limiter("register_json", limit=16, queue=32),
+        _limiter("ranked_candidates", limit=16, queue=32),
+        _limiter("relevant_projects", limit=32, queue=64),
+    )
+}
+
+
+def admission(name: str) -> Callable:
+    """Route dependency holding one of the named limiter's slots for the request."""
+    limiter = ROUTE_LIMITERS[name]
+
+    async def admit():
+        await limiter.acquire()
+        try:
+            yield
+        finally:
+            limiter.release()
+
+    return admit
+
+
+def admission_stats() -> Dict[str, Dict[str, Any]]:
+    return {name: limiter.stats() for name, limiter in ROUTE_LIMITERS.items()}
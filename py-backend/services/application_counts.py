@@ -0,0 +1,109 @@
+"""
+Denormalised Application Counters on Projects
+Each project document carries
+    application_counts: {"total", "applied", "shortlisted", "rejected", "hired"}
+kept current with atomic $inc updates when an application is created or its
+status changes, so interviewer dashboards read counts with one projected query.
+
+Counters can drift if a request dies between the application write and the
+$inc; the reconcile job recomputes them from the applications collection.
+
+Projects created before counters existed have no application_counts. The $inc
+updates only apply WHERE_COUNTED, so they never create a partial sub-document
+of deltas; those projects are counted once by the lazy backfill instead.
+
+Usage:
+    python -m services.application_counts            # reconcile every project
+    python -m services.application_counts --project-id <id>
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+APPLICATION_STATUSES = ("applied", "shortlisted", "rejected", "hired")
+COUNTS_FIELD = "application_counts"
+# Filter for counter updates: only projects whose counters were initialised
+WHERE_COUNTED = {COUNTS_FIELD: {"$exists": True}}
+
+
+def empty_counts() -> Dict[str, int]:
+    return {"total": 0, **{status: 0 for status in APPLICATION_STATUSES}}
+
+
+def created_inc() -> Dict[str, Any]:
+    """$inc for a newly created application (status "applied")."""
+    return {"$inc": {f"{COUNTS_FIELD}.total": 1, f"{COUNTS_FIELD}.applied": 1}}
+
+
+def status_change_inc(old_status: str, new_status: str) -> Dict[str, Any]:
+    return {"$inc": {f"{COUNTS_FIELD}.{old_status}": -1, f"{COUNTS_FIELD}.{new_status}": 1}}
+
+
+def counts_pipeline(project_ids: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Aggregation yielding {_id: {project_id, status}, count} rows."""
+    pipeline: List[Dict[str, Any]] = []
+    if project_ids is not None:
+        pipeline.append({"$match": {"project_id": {"$in": project_ids}}})
+    pipeline.append({
+        "$group": {
+            "_id": {"project_id": "$project_id", "status": {"$ifNull": ["$status", "applied"]}},
+            "count": {"$sum": 1},
+        }
+    })
+    return pipeline
+
+
+def fold_counts(rows: Iterable[Dict[str, Any]], project_ids: Iterable[str] = ()) -> Dict[str, Dict[str, int]]:
+    """Fold counts_pipeline rows into {project_id: counts}; listed projects default to zeros."""
+    counts = {project_id: empty_counts() for project_id in project_ids}
+    for row in rows:
+        project_counts = counts.setdefault(row["_id"]["project_id"], empty_counts())
+        status = row["_id"]["status"]
+        if status in project_counts:
+            project_counts[status] += row["count"]
+        project_counts["total"] += row["count"]
+    return counts
+
+
+def reconcile(applications_col, projects_col, project_ids: Optional[List[str]] = None) -> int:
+    """Recompute counters from the applications collection; returns the number of projects fixed."""
+    if project_ids is None:
+        project_ids = [doc["_id"] for doc in projects_col.find({}, {"_id": 1})]
+    counts = fold_counts(applications_col.aggregate(counts_pipeline(project_ids)), project_ids)
+
+    stored = {
+        doc["_id"]: doc.get(COUNTS_FIELD)
+        for doc in projects_col.find({"_id": {"$in": project_ids}}, {COUNTS_FIELD: 1})
+    }
+    updates = [
+        UpdateOne({"_id": project_id}, {"$set": {COUNTS_FIELD: project_counts}})
+        for project_id, project_counts in counts.items()
+        if project_id in stored and stored[project_id] != project_counts
+    ]
+    if updates:
+        projects_col.bulk_write(updates, ordered=False)
+    logger.info(f"Reconciled application counts: {len(updates)} of {len(stored)} projects had drifted")
+    return len(updates)
+
+
+def main():
+    import argparse
+
+    from services.db import sync_collections
+
+    parser = argparse.ArgumentParser(description="Recompute per-project application counters.")
+    parser.add_argument("--project-id", action="append", help="Only reconcile these projects (repeatable)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    fixed = reconcile(sync_collections.applications, sync_collections.projects, args.project_id)
+    print(f"Fixed application counts on {fixed} projects")
+
+
+if __name__ == "__main__":
+    main()
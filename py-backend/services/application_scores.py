@@ -0,0 +1,129 @@
+"""
+Match Scores Persisted on Applications
+Each application stores the candidate <-> project fused score under `match`:
+    {"overall_score", "professional_score", "project_score", "skills_score", "computed_at"}
+so applicant and "my applications" lists can sort/filter with a plain Mongo
+index on `match.overall_score` (see services.indexes) and no vector calls on read.
+
+Scores are computed at apply time (match store first, stored vectors otherwise)
+and recomputed in the background whenever either side's vectors change. A
+recompute whose vector fetch fails raises and writes nothing, and pairs with
+missing vectors are skipped, so a stored score is never replaced by the 0.0 an
+absent vector would produce.
+
+A pair that cannot be scored (missing vector, failed fetch) is stored as
+    {"status": "unavailable", "at": ...}
+instead of None, so list reads don't retry it on every load; the next
+recompute for either side (e.g. the candidate revectorized) overwrites it.
+"""
+
+import logging
+from datetime import datetime
+from typing import Callable, List, Dict, Any, Optional
+
+from pymongo import UpdateOne
+
+from services.match_scoring import CANDIDATE_SCORE_COMPONENTS, get_match_scorer
+
+logger = logging.getLogger(__name__)
+
+
+MATCH_UNAVAILABLE = "unavailable"
+
+
+def _with_timestamp(scores: Dict[str, float]) -> Dict[str, Any]:
+    return {**scores, "computed_at": datetime.utcnow().isoformat() + "Z"}
+
+
+def unavailable_match() -> Dict[str, Any]:
+    """Stored in place of a score that could not be computed."""
+    return {"status": MATCH_UNAVAILABLE, "at": datetime.utcnow().isoformat() + "Z"}
+
+
+class ApplicationScores:
+    def __init__(self, applications_col, candidates_col, projects_col, matches_col,
+                 on_update: Optional[Callable[[List[str]], None]] = None):
+        self.applications_col = applications_col
+        self.candidates_col = candidates_col
+        self.projects_col = projects_col
+        self.matches_col = matches_col
+        # Called with the ids of applications whose scores were rewritten (cache invalidation)
+        self.on_update = on_update
+
+    def compute(self, candidate_doc: Dict[str, Any], project_doc: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Score one application; returns None if vectors are missing or cannot be fetched."""
+        candidate_id = str(candidate_doc["_id"])
+        project_id = str(project_doc["_id"])
+        try:
+            stored = self.matches_col.find_one({"_id": f"{project_id}:{candidate_id}"})
+            if stored:
+                return _with_timestamp({c: stored[c] for c in CANDIDATE_SCORE_COMPONENTS})
+            scores = get_match_scorer().score_candidates_for_project([candidate_doc], project_doc)
+        except Exception:
+            logger.exception(f"Failed to score application for candidate {candidate_id} / project {project_id}")
+            return None
+        return _with_timestamp(scores[candidate_id]) if candidate_id in scores else None
+
+    def _write(self, matches: Dict[str, Dict[str, Any]]):
+        """Persist {application_id: match}."""
+        if matches:
+            self.applications_col.bulk_write(
+                [UpdateOne({"_id": app_id}, {"$set": {"match": match}}) for app_id, match in matches.items()],
+                ordered=False,
+            )
+            if self.on_update:
+                self.on_update(list(matches))
+
+    def refresh_project(self, project_id: str) -> int:
+        """Recompute scores of all applications to a project (its vectors changed)."""
+        project_doc = self.projects_col.find_one({"_id": project_id}, {"_id": 1, "vector_ids": 1})
+        if not project_doc:
+            return 0
+        applications = list(self.applications_col.find({"project_id": project_id}, {"_id": 1, "candidate_id": 1}))
+        return self.refresh_applications(applications, project_doc=project_doc)
+
+    def refresh_applications(self, applications: List[Dict[str, Any]], project_doc: Dict[str, Any],
+                             mark_unavailable: bool = False) -> int:
+        """
+        Score the given applications of one project (batched vector fetch) and persist them.
+        mark_unavailable (for never-scored applications): store the unavailable
+        marker for those that cannot be scored - missing vectors, or a failed
+        fetch (VectorFetchError) - so list reads don't retry them.
+        """
+        candidate_ids = list({a["candidate_id"] for a in applications if a.get("candidate_id")})
+        scores: Dict[str, Dict[str, float]] = {}
+        if candidate_ids:
+            candidate_docs = list(self.candidates_col.find({"_id": {"$in": candidate_ids}}, {"_id": 1, "vector_ids": 1}))
+            try:
+                scores = get_match_scorer().score_candidates_for_project(candidate_docs, project_doc)
+            except Exception:
+                if not mark_unavailable:
+                    raise
+                logger.exception(f"Failed to score applications for project {project_doc['_id']}")
+        matches = {
+            a["_id"]: _with_timestamp(scores[a["candidate_id"]])
+            for a in applications if a.get("candidate_id") in scores
+        }
+        if mark_unavailable:
+            for a in applications:
+                matches.setdefault(a["_id"], unavailable_match())
+        self._write(matches)
+        return len(matches)
+
+    def refresh_candidate(self, candidate_id: str) -> int:
+        """Recompute scores of all applications by a candidate (their vectors changed)."""
+        candidate_doc = self.candidates_col.find_one({"_id": candidate_id}, {"_id": 1, "vector_ids": 1})
+        if not candidate_doc:
+            return 0
+        applications = list(self.applications_col.find({"candidate_id": candidate_id}, {"_id": 1, "project_id": 1}))
+        project_ids = list({a["project_id"] for a in applications if a.get("project_id")})
+        if not project_ids:
+            return 0
+        project_docs = list(self.projects_col.find({"_id": {"$in": project_ids}}, {"_id": 1, "vector_ids": 1}))
+        scores = get_match_scorer().score_projects_for_candidate(candidate_doc, project_docs)
+        matches = {
+            a["_id"]: _with_timestamp(scores[a["project_id"]])
+            for a in applications if a.get("project_id") in scores
+        }
+        self._write(matches)
+        return len(matches)
@@ -0,0 +1,125 @@
+"""
+Request Authentication
+The `token` cookie (a HS256 JWT issued by the node backend) is resolved once
+per request by AuthMiddleware, which sets request.state.user_id (or
+request.state.auth_error). Verified tokens are cached in a bounded LRU keyed by
+the token's SHA-256 and expiring at the token's `exp`, so each token pays
+signature verification once.
+
+Handlers declare what they need:
+    user_id: str = Depends(require_user_id)             # 401 if not logged in
+    user_id: Optional[str] = Depends(optional_user_id)  # None if not logged in
+"""
+
+import os
+import time
+import hashlib
+import logging
+from typing import Optional
+
+import jwt
+from fastapi import HTTPException, Request
+from starlette.requests import HTTPConnection
+from dotenv import load_dotenv
+
+from services.cache import InMemoryCache
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+JWT_SECRET = os.getenv("JWT_SECRET")
+JWT_ALGORITHMS = ["HS256"]
+AUTH_COOKIE = "token"
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+# Upper bound for tokens without `exp`
+AUTH_TOKEN_CACHE_TTL = int(os.getenv("AUTH_TOKEN_CACHE_TTL", "900"))
+
+# Claim names the node backend has used for the user id
+USER_ID_CLAIMS = ("userId", "user_id", "id", "userID")
+
+
+class AuthError(Exception):
+    pass
+
+
+class TokenVerifier:
+    def __init__(self, secret: Optional[str] = JWT_SECRET, max_entries: int = AUTH_TOKEN_CACHE_SIZE):
+        self.secret = secret
+        self.cache = InMemoryCache("auth_tokens", max_entries=max_entries)
+        self.hits = 0
+        self.misses = 0
+
+    def user_id_for(self, token: str) -> str:
+        """Verified user id for a token; raises AuthError if expired or invalid."""
+        key = hashlib.sha256(token.encode()).hexdigest()
+        user_id = self.cache.get(key)
+        if user_id is not None:
+            self.hits += 1
+            return user_id
+        self.misses += 1
+
+        try:
+            decoded = jwt.decode(token, self.secret, algorithms=JWT_ALGORITHMS)
+        except jwt.ExpiredSignatureError:
+            raise AuthError("Token expired")
+        except jwt.InvalidTokenError:
+            raise AuthError("Invalid token")
+
+        user_id = next((decoded[c] for c in USER_ID_CLAIMS if decoded.get(c)), None)
+        if not user_id:
+            raise AuthError("Invalid token")
+        user_id = str(user_id)
+
+        ttl = float(AUTH_TOKEN_CACHE_TTL)
+        if decoded.get("exp"):
+            ttl = min(ttl, float(decoded["exp"]) - time.time())
+        if ttl > 0:
+            self.cache.set(key, user_id, ttl=ttl)
+        return user_id
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            **self.cache.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# Global instance
+token_verifier = TokenVerifier()
+
+
+class AuthMiddleware:
+    """Resolves the auth cookie into request.state.user_id / auth_error (never rejects)."""
+
+    def __init__(self, app, verifier: TokenVerifier = token_verifier):
+        self.app = app
+        self.verifier = verifier
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            state = scope.setdefault("state", {})
+            state["user_id"] = None
+            state["auth_error"] = None
+            token = HTTPConnection(scope).cookies.get(AUTH_COOKIE)
+            if token:
+                try:
+                    state["user_id"] = self.verifier.user_id_for(token)
+                except AuthError as e:
+                    state["auth_error"] = str(e)
+        await self.app(scope, receive, send)
+
+
+def optional_user_id(request: Request) -> Optional[str]:
+    return getattr(request.state, "user_id", None)
+
+
+def require_user_id(request: Request) -> str:
+    user_id = getattr(request.state, "user_id", None)
+    if not user_id:
+        detail = getattr(request.state, "auth_error", None) or "Authentication required"
+        raise HTTPException(status_code=401, detail=detail)
+    return user_id
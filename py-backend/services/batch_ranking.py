@@ -0,0 +1,188 @@
+"""
+Batch Ranking Engine: all open projects x all candidates
+Loads every stored candidate and project vector into matrices, computes the fused
+professional/portfolio/skills score matrix in candidate blocks, and writes the
+top-k candidates per project and the top-k projects per candidate to Parquet
+for offline analysis.
+
+The API reads rankings from the incrementally maintained match store
+(services.match_store), so this job no longer materialises anything in MongoDB.
+
+Usage:
+    python -m services.batch_ranking --top-k 100 --out-dir ranking_output
+"""
+
+import os
+import re
+import time
+import logging
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from services.match_scoring import MatchScorer, VectorMatrix, CANDIDATE_SCORE_COMPONENTS
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BATCH_BLOCK_SIZE = int(os.getenv("BATCH_RANKING_BLOCK_SIZE", "2048"))
+
+
+def is_open(application_deadline: Any, now: datetime) -> bool:
+    """True if the project has no deadline or its deadline is still in the future."""
+    if not application_deadline:
+        return True
+    deadline_str = str(application_deadline).strip()
+    if deadline_str.endswith('Z'):
+        if re.search(r'[+-]\d{2}:\d{2}Z?$', deadline_str):
+            deadline_str = deadline_str.rstrip('Z')
+        else:
+            deadline_str = deadline_str.replace('Z', '+00:00')
+    try:
+        deadline_dt = datetime.fromisoformat(deadline_str)
+    except ValueError:
+        return False
+    if deadline_dt.tzinfo is None:
+        deadline_dt = deadline_dt.replace(tzinfo=timezone.utc)
+    return deadline_dt > now
+
+
+def _top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest entries of each column (unsorted)."""
+    if scores.shape[0] <= k:
+        return np.broadcast_to(np.arange(scores.shape[0])[:, None], scores.shape)
+    return np.argpartition(-scores, k - 1, axis=0)[:k]
+
+
+class BatchRankingEngine:
+    def __init__(self, scorer: Optional[MatchScorer] = None, block_size: int = BATCH_BLOCK_SIZE):
+        self.scorer = scorer or MatchScorer()
+        self.block_size = block_size
+
+    def rank(self, candidates: VectorMatrix, projects: VectorMatrix,
+             top_k: int) -> Tuple[Dict[str, List[Dict]], Dict[str, List[Dict]]]:
+        """
+        Returns (top candidates per project, top projects per candidate).
+        Candidates are scored block by block; a running top-k per project is
+        merged after each block so memory stays O(block_size x n_projects).
+        """
+        n_projects = len(projects)
+        best: Dict[str, np.ndarray] = {c: np.empty((0, n_projects), dtype=np.float32) for c in CANDIDATE_SCORE_COMPONENTS}
+        best_rows = np.empty((0, n_projects), dtype=np.int64)
+        per_candidate: Dict[str, List[Dict]] = {}
+
+        for start in range(0, len(candidates), self.block_size):
+            block = candidates.slice(start, start + self.block_size)
+            scores = MatchScorer.score(block, projects)
+
+            # Running top-k candidates for every project (column-wise)
+            rows = np.broadcast_to(np.arange(start, start + len(block))[:, None], (len(block), n_projects))
+            merged = {c: np.vstack([best[c], scores[c]]) for c in CANDIDATE_SCORE_COMPONENTS}
+            merged_rows = np.vstack([best_rows, rows])
+            keep = _top_k_rows(merged["overall_score"], top_k)
+            best = {c: np.take_along_axis(merged[c], keep, axis=0) for c in CANDIDATE_SCORE_COMPONENTS}
+            best_rows = np.take_along_axis(merged_rows, keep, axis=0)
+
+            # Top-k projects for every candidate in this block (row-wise)
+            project_scores = scores["project_overall_score"]
+            k = min(top_k, n_projects)
+            if k:
+                top_cols = np.argpartition(-project_scores, k - 1, axis=1)[:, :k]
+                for row, candidate_id in enumerate(block.ids):
+                    items = [
+                        {
+                            "project_id": projects.ids[col],
+                            "overall_score": float(project_scores[row, col]),
+                            "description_score": float(scores["description_score"][row, col]),
+                            "skills_score": float(scores["skills_score"][row, col]),
+                        }
+                        for col in top_cols[row] if project_scores[row, col] > 0
+                    ]
+                    items.sort(key=lambda x: x["overall_score"], reverse=True)
+                    per_candidate[candidate_id] = items
+
+        per_project: Dict[str, List[Dict]] = {}
+        for col, project_id in enumerate(projects.ids):
+            items = [
+                {
+                    "candidate_id": candidates.ids[best_rows[i, col]],
+                    **{c: float(best[c][i, col]) for c in CANDIDATE_SCORE_COMPONENTS},
+                }
+                for i in range(best_rows.shape[0]) if best["overall_score"][i, col] > 0
+            ]
+            items.sort(key=lambda x: x["overall_score"], reverse=True)
+            per_project[project_id] = items
+
+        return per_project, per_candidate
+
+    def run(self, candidate_docs: List[Dict[str, Any]], project_docs: List[Dict[str, Any]],
+            top_k: int) -> Tuple[Dict[str, List[Dict]], Dict[str, List[Dict]]]:
+        started = time.time()
+        candidates = self.scorer.load_candidates(candidate_docs)
+        projects = self.scorer.load_projects(project_docs)
+        loaded = time.time()
+        per_project, per_candidate = self.rank(candidates, projects, top_k)
+        logger.info(
+            f"Ranked {len(candidates)} candidates x {len(projects)} projects "
+            f"(load {loaded - started:.1f}s, score {time.time() - loaded:.1f}s)"
+        )
+        return per_project, per_candidate
+
+
+def write_parquet(out_dir: str, per_project: Dict[str, List[Dict]], per_candidate: Dict[str, List[Dict]]):
+    """Write flat (id, rank, ...) tables with pyarrow."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    os.makedirs(out_dir, exist_ok=True)
+    project_rows = [
+        {"project_id": pid, "rank": rank, **item}
+        for pid, items in per_project.items() for rank, item in enumerate(items, 1)
+    ]
+    candidate_rows = [
+        {"candidate_id": cid, "rank": rank, **item}
+        for cid, items in per_candidate.items() for rank, item in enumerate(items, 1)
+    ]
+    pq.write_table(pa.Table.from_pylist(project_rows), os.path.join(out_dir, "project_top_candidates.parquet"))
+    pq.write_table(pa.Table.from_pylist(candidate_rows), os.path.join(out_dir, "candidate_top_projects.parquet"))
+
+
+def main():
+    import argparse
+
+    from services.db import candidates_col, projects_col
+
+    parser = argparse.ArgumentParser(description="Rank all open projects against all candidates.")
+    parser.add_argument("--top-k", type=int, default=100, help="Results kept per project and per candidate")
+    parser.add_argument("--block-size", type=int, default=BATCH_BLOCK_SIZE, help="Candidates scored per block")
+    parser.add_argument("--out-dir", default="ranking_output", help="Directory for the Parquet tables")
+    parser.add_argument("--include-closed", action="store_true", help="Also rank projects past their deadline")
+    args = parser.parse_args()
+
+    # Parquet is the only output: fail before scoring, not after
+    import pyarrow.parquet  # noqa: F401
+
+    logging.basicConfig(level=logging.INFO)
+
+    now = datetime.now(timezone.utc)
+    project_docs = [
+        doc for doc in projects_col.find(
+            {"vector_ids": {"$exists": True}}, {"_id": 1, "vector_ids": 1, "application_deadline": 1}
+        )
+        if args.include_closed or is_open(doc.get("application_deadline"), now)
+    ]
+    candidate_docs = list(candidates_col.find({"vector_ids": {"$exists": True}}, {"_id": 1, "vector_ids": 1}))
+    print(f"Ranking {len(project_docs)} projects against {len(candidate_docs)} candidates...")
+
+    engine = BatchRankingEngine(block_size=args.block_size)
+    per_project, per_candidate = engine.run(candidate_docs, project_docs, args.top_k)
+
+    write_parquet(args.out_dir, per_project, per_candidate)
+    print(f"Wrote top-{args.top_k} rankings for {len(per_project)} projects and {len(per_candidate)} candidates")
+
+
+if __name__ == "__main__":
+    main()
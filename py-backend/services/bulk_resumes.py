@@ -0,0 +1,199 @@
+"""
+Bulk Resume Parsing Jobs
+Recruiters upload many PDFs (or zip archives of PDFs) in one request; the
+endpoint returns a job ID and the files are parsed in the background:
+
+- text extraction runs on the pdf process pool, at most its worker count at a time
+- LLM parsing runs on the openai executor, at most BULK_RESUME_LLM_CONCURRENCY at a time
+
+both as background work, so interactive /api/parse-resume calls get the
+executors first; if the background queues are full, the job backs off and retries.
+Per-file results (parsed JSON or the error) are recorded on the job (services.jobs).
+
+The upload itself is bounded before anything is buffered: the request body is
+capped at BULK_RESUME_MAX_UPLOAD_BYTES while it streams in (limited_receive),
+the form at BULK_RESUME_MAX_FILES parts, and oversized PDFs are skipped by
+their spooled size without being read into memory (read_uploads).
+"""
+
+import io
+import os
+import asyncio
+import logging
+import tempfile
+import zipfile
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from services.executors import ExecutorSaturated, openai_executor, pdf_executor
+from services.jobs import Job, job_registry
+from services.resumeParser import extract_text_from_pdf, parse_resume_with_genai
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BULK_RESUME_MAX_FILES = int(os.getenv("BULK_RESUME_MAX_FILES", "200"))
+BULK_RESUME_MAX_FILE_BYTES = int(os.getenv("BULK_RESUME_MAX_FILE_BYTES", str(10 * 1024 * 1024)))
+# Uncompressed total of all PDFs in one job (guards against zip bombs)
+BULK_RESUME_MAX_TOTAL_BYTES = int(os.getenv("BULK_RESUME_MAX_TOTAL_BYTES", str(200 * 1024 * 1024)))
+# Raw multipart request body (PDFs and zips as uploaded)
+BULK_RESUME_MAX_UPLOAD_BYTES = int(os.getenv("BULK_RESUME_MAX_UPLOAD_BYTES", str(BULK_RESUME_MAX_TOTAL_BYTES)))
+BULK_RESUME_LLM_CONCURRENCY = int(os.getenv("BULK_RESUME_LLM_CONCURRENCY", "4"))
+BULK_RESUME_SATURATED_RETRIES = 5
+
+
+class BulkUploadError(ValueError):
+    pass
+
+
+def limited_receive(receive, max_bytes: int = BULK_RESUME_MAX_UPLOAD_BYTES):
+    """ASGI receive that raises BulkUploadError once the request body passes max_bytes."""
+    received = 0
+
+    async def receive_limited():
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > max_bytes:
+                raise BulkUploadError(f"Upload exceeds {max_bytes} bytes")
+        return message
+
+    return receive_limited
+
+
+async def read_uploads(files) -> Tuple[List[Tuple[str, bytes]], List[Dict[str, str]]]:
+    """
+    Read spooled form uploads as (filename, content) for collect_pdfs, skipping
+    PDFs over the per-file limit without reading them.
+    """
+    uploads: List[Tuple[str, bytes]] = []
+    skipped: List[Dict[str, str]] = []
+    for file in files:
+        filename = file.filename or "upload"
+        if filename.lower().endswith(".pdf") and (file.size or 0) > BULK_RESUME_MAX_FILE_BYTES:
+            skipped.append({"filename": filename, "reason": "File too large"})
+            continue
+        uploads.append((filename, await file.read()))
+    return uploads, skipped
+
+
+def _extract_pdf_bytes(content: bytes) -> Optional[str]:
+    """Process-pool entry point: extract_text_from_pdf needs a file path."""
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as temp_file:
+        temp_file.write(content)
+        temp_file.flush()
+        return extract_text_from_pdf(temp_file.name)
+
+
+def collect_pdfs(uploads: List[Tuple[str, bytes]]) -> Tuple[List[Tuple[str, bytes]], List[Dict[str, str]]]:
+    """
+    Expand uploads (PDFs and zip archives of PDFs) into (filename, content) pairs.
+    Returns the PDFs and the skipped entries; raises BulkUploadError past the limits.
+    """
+    pdfs: List[Tuple[str, bytes]] = []
+    skipped: List[Dict[str, str]] = []
+    total = 0
+
+    def add(name: str, size: int, read):
+        nonlocal total
+        if size > BULK_RESUME_MAX_FILE_BYTES:
+            skipped.append({"filename": name, "reason": "File too large"})
+            return
+        total += size
+        if total > BULK_RESUME_MAX_TOTAL_BYTES:
+            raise BulkUploadError(f"Upload exceeds {BULK_RESUME_MAX_TOTAL_BYTES} bytes of PDFs")
+        pdfs.append((name, read()))
+        if len(pdfs) > BULK_RESUME_MAX_FILES:
+            raise BulkUploadError(f"At most {BULK_RESUME_MAX_FILES} resumes per upload")
+
+    for filename, content in uploads:
+        lower = filename.lower()
+        if lower.endswith(".pdf"):
+            add(filename, len(content), lambda: content)
+        elif lower.endswith(".zip"):
+            try:
+                archive = zipfile.ZipFile(io.BytesIO(content))
+            except zipfile.BadZipFile:
+                skipped.append({"filename": filename, "reason": "Not a valid zip archive"})
+                continue
+            with archive:
+                for info in archive.infolist():
+                    name = info.filename
+                    if info.is_dir() or name.startswith("__MACOSX/") or os.path.basename(name).startswith("."):
+                        continue
+                    if not name.lower().endswith(".pdf"):
+                        skipped.append({"filename": f"{filename}:{name}", "reason": "Only PDF files are supported"})
+                        continue
+                    # file_size is the declared uncompressed size, checked before inflating
+                    add(f"{filename}:{name}", info.file_size, lambda info=info: archive.read(info))
+        else:
+            skipped.append({"filename": filename, "reason": "Only PDF and zip files are supported"})
+    return pdfs, skipped
+
+
+class BulkResumeParser:
+    def __init__(self, llm_concurrency: int = BULK_RESUME_LLM_CONCURRENCY):
+        self.llm_concurrency = llm_concurrency
+        self._pdf_slots: Optional[asyncio.Semaphore] = None
+        self._llm_slots: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.files_parsed = 0
+        self.files_failed = 0
+
+    def submit(self, pdfs: List[Tuple[str, bytes]], **meta) -> Job:
+        """Start parsing in the background; returns the job to poll."""
+        if self._pdf_slots is None:
+            self._pdf_slots = asyncio.Semaphore(pdf_executor.max_workers)
+            self._llm_slots = asyncio.Semaphore(self.llm_concurrency)
+        job = job_registry.create("resume_parse", len(pdfs), **meta)
+        for filename, content in pdfs:
+            task = asyncio.create_task(self._parse(job, filename, content))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return job
+
+    @staticmethod
+    async def _run(executor, fn, *args) -> Any:
+        """Run on a shared executor, backing off while interactive traffic has it saturated."""
+        for attempt in range(BULK_RESUME_SATURATED_RETRIES):
+            try:
+                return await executor.run_background(fn, *args)
+            except ExecutorSaturated:
+                if attempt == BULK_RESUME_SATURATED_RETRIES - 1:
+                    raise
+                await asyncio.sleep(2 ** attempt)
+
+    async def _parse(self, job: Job, filename: str, content: bytes):
+        try:
+            async with self._pdf_slots:
+                resume_text = await self._run(pdf_executor, _extract_pdf_bytes, content)
+            if not resume_text:
+                raise ValueError("Could not extract text from PDF.")
+
+            async with self._llm_slots:
+                parsed_data = await self._run(openai_executor, parse_resume_with_genai, resume_text)
+            if "error" in parsed_data:
+                raise ValueError(f"Failed to parse resume: {parsed_data['error']}")
+        except Exception as e:
+            self.files_failed += 1
+            logger.warning(f"Bulk resume {filename} failed: {e}")
+            job.record(filename, ok=False, error=str(e) or e.__class__.__name__)
+            return
+
+        self.files_parsed += 1
+        job.record(filename, ok=True, data=parsed_data, text_length=len(resume_text))
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._tasks),
+            "files_parsed": self.files_parsed,
+            "files_failed": self.files_failed,
+        }
+
+
+# Global instance
+bulk_resume_parser = BulkResumeParser()
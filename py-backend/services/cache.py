@@ -0,0 +1,198 @@
+"""
+Cache backends shared by the API (in-process and Redis)
+"""
+
+import os
+import pickle
+import threading
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "10000"))
+
+
+class InMemoryCache:
+    """
+    Thread-safe LRU cache with per-key expiry.
+    Values are stored as-is, so callers must not mutate what they get back.
+    """
+
+    def __init__(self, namespace: str, max_entries: int = CACHE_MAX_ENTRIES):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        # Counters and sets carry invalidation state, so they are kept out of
+        # the LRU: evicting them would resurrect stale entries.
+        self._counters: Dict[str, int] = {}
+        self._sets: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _expired(self, expires_at: Optional[float]) -> bool:
+        return expires_at is not None and expires_at <= time.time()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if self._expired(expires_at):
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        """Set key only if it is absent (or expired); returns whether it was set."""
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and not self._expired(item[1]):
+                return False
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return True
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def add_to_set(self, key: str, *members: str, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            now = time.time()
+            if len(self._sets) > self.max_entries:
+                for k in [k for k, (_, exp) in self._sets.items() if exp is not None and exp <= now]:
+                    del self._sets[k]
+            item = self._sets.get(key)
+            current = item[0] if item and not self._expired(item[1]) else set()
+            current.update(members)
+            expires_at = now + ttl if ttl else None
+            if item and item[1] is not None and expires_at is not None:
+                expires_at = max(expires_at, item[1])
+            self._sets[key] = (current, expires_at)
+
+    def pop_set(self, key: str) -> List[str]:
+        with self._lock:
+            item = self._sets.pop(key, None)
+            if item is None or self._expired(item[1]):
+                return []
+            return list(item[0])
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+            self._sets.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "namespace": self.namespace, "entries": len(self._data)}
+
+
+class RedisCache:
+    """
+    Redis-backed cache with the same interface as InMemoryCache.
+    Keys are prefixed with the namespace; values are pickled.
+    """
+
+    def __init__(self, namespace: str, url: str = REDIS_URL):
+        import redis  # optional dependency, only needed for this backend
+
+        self.namespace = namespace
+        self.client = redis.Redis.from_url(url)
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self._key(key))
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        px = int(ttl * 1000) if ttl else None
+        self.client.set(self._key(key), pickle.dumps(value), px=px)
+
+    def add(self, key: str, value: Any, ttl: Optional[float] = None) -> bool:
+        px = int(ttl * 1000) if ttl else None
+        return bool(self.client.set(self._key(key), pickle.dumps(value), px=px, nx=True))
+
+    def delete(self, *keys: str) -> None:
+        if keys:
+            self.client.delete(*[self._key(k) for k in keys])
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self._key(key)))
+
+    def get_counter(self, key: str) -> int:
+        raw = self.client.get(self._key(key))
+        return int(raw) if raw is not None else 0
+
+    def add_to_set(self, key: str, *members: str, ttl: Optional[float] = None) -> None:
+        if not members:
+            return
+        pipe = self.client.pipeline()
+        pipe.sadd(self._key(key), *members)
+        if ttl:
+            pipe.pexpire(self._key(key), int(ttl * 1000))
+        pipe.execute()
+
+    def pop_set(self, key: str) -> List[str]:
+        pipe = self.client.pipeline()
+        pipe.smembers(self._key(key))
+        pipe.delete(self._key(key))
+        members, _ = pipe.execute()
+        return [m.decode("utf-8") if isinstance(m, bytes) else m for m in members]
+
+    def clear(self) -> None:
+        keys = list(self.client.scan_iter(match=self._key("*")))
+        if keys:
+            self.client.delete(*keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "namespace": self.namespace}
+
+
+def create_cache(namespace: str, backend: Optional[str] = None, max_entries: int = CACHE_MAX_ENTRIES):
+    """
+    Build a cache for the given namespace.
+    backend defaults to CACHE_BACKEND ("memory" or "redis"); if Redis is
+    selected but unavailable we fall back to the in-process cache.
+    """
+    backend = (backend or CACHE_BACKEND).lower()
+    if backend == "redis":
+        try:
+            cache = RedisCache(namespace)
+            cache.client.ping()
+            return cache
+        except Exception as e:
+            logger.warning(f"Redis cache unavailable for '{namespace}' ({e}); using in-process cache")
+    return InMemoryCache(namespace, max_entries=max_entries)
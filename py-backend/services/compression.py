@@ -0,0 +1,202 @@
+"""
+Response Compression (gzip / brotli)
+Routes opt in with the compress_response dependency:
+
+    @app.get("/api/heavy", dependencies=[Depends(compress_response)])
+
+CompressionMiddleware then compresses that route's responses of at least
+COMPRESSION_MIN_BYTES with the best encoding the client accepts (br if the
+optional `brotli` package is installed, else gzip). Streaming responses are
+compressed chunk by chunk with a sync flush so lines still arrive promptly.
+
+Responses that already carry Content-Encoding pass through untouched, so
+cached bodies can be stored pre-compressed (see encode_variants) and served
+without recompressing on every hit.
+"""
+
+import os
+import gzip
+import zlib
+import logging
+from typing import Dict, Iterable, Optional
+
+from fastapi import Request
+from starlette.datastructures import Headers, MutableHeaders
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+try:
+    import brotli  # optional dependency; gzip only without it
+except ImportError:
+    brotli = None
+
+# Server preference order
+SUPPORTED_ENCODINGS = (("br",) if brotli else ()) + ("gzip",)
+
+
+def choose_encoding(accept_encoding: Optional[str], available: Iterable[str] = SUPPORTED_ENCODINGS) -> Optional[str]:
+    """Best encoding from an Accept-Encoding header (q-values honoured), or None for identity."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    for encoding in available:
+        if weights.get(encoding, weights.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def encode_variants(body: bytes, min_size: int = COMPRESSION_MIN_BYTES) -> Dict[str, bytes]:
+    """Pre-compressed copies of a body worth compressing, keyed by encoding."""
+    if len(body) < min_size:
+        return {}
+    return {encoding: compress(body, encoding) for encoding in SUPPORTED_ENCODINGS}
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            # wbits 31 = gzip container
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+class CompressionStats:
+    def __init__(self):
+        self.responses = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record(self, raw: int, encoded: int, response: bool = True):
+        self.responses += int(response)
+        self.bytes_in += raw
+        self.bytes_out += encoded
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "encodings": list(SUPPORTED_ENCODINGS),
+            "min_bytes": COMPRESSION_MIN_BYTES,
+            "responses": self.responses,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": self.bytes_out / self.bytes_in if self.bytes_in else 0.0,
+        }
+
+
+# Global instance
+compression_stats = CompressionStats()
+
+
+def compress_response(request: Request):
+    """Route dependency: opt this route's responses into compression."""
+    request.state.compress = True
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_BYTES, stats: CompressionStats = compression_stats):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.stats = stats
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_StreamCompressor] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                # The route's dependencies have run by the time the response starts
+                opted_in = scope.get("state", {}).get("compress", False)
+                if (not opted_in or "content-encoding" in headers
+                        or message["status"] in (204, 304) or message["status"] < 200):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            headers = MutableHeaders(raw=start_message["headers"])
+
+            if compressor is None:
+                if not more_body:
+                    # Whole body in one message
+                    if len(body) < self.minimum_size:
+                        await send(start_message)
+                        await send(message)
+                        passthrough = True
+                        return
+                    compressed = compress(body, encoding)
+                    self.stats.record(len(body), len(compressed))
+                    headers["Content-Encoding"] = encoding
+                    headers["Content-Length"] = str(len(compressed))
+                    headers.add_vary_header("Accept-Encoding")
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": compressed})
+                    passthrough = True
+                    return
+                # Streaming: compress as it goes
+                compressor = _StreamCompressor(encoding)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "content-length" in headers:
+                    del headers["content-length"]
+                await send(start_message)
+                self.stats.record(0, 0)
+
+            data = compressor.chunk(body)
+            if not more_body:
+                data += compressor.finish()
+            self.stats.record(len(body), len(data), response=False)
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
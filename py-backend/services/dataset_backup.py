@@ -0,0 +1,306 @@
+"""
+Write-Behind Candidate Dataset Backups
+Request handlers hand candidate documents (and deletions) to an in-memory
+buffer; a writer thread appends them every BACKUP_FLUSH_SECONDS as compact
+JSON lines to a gzip segment log in DATASET_DIR:
+
+    segment-000042.jsonl.gz   {"id": ..., "op": "put" | "delete", "ts": ..., "doc": {...}}
+
+Segments roll at BACKUP_SEGMENT_MAX_BYTES. Once BACKUP_COMPACT_SEGMENTS closed
+segments pile up, they are compacted with the previous snapshot into a new
+snapshot-<seq>.jsonl.gz holding the latest version of each live candidate
+(tombstones dropped). Reading the directory replays snapshot then segments.
+
+Records still buffered when the process dies (at most BACKUP_FLUSH_SECONDS'
+worth) are lost; Mongo stays the source of truth. Run one writer per
+directory: with several API workers give each its own DATASET_DIR.
+
+Usage:
+    python -m services.dataset_backup --compact [--all]
+    python -m services.dataset_backup --import-legacy       # old dataset/<id>.json files
+    python -m services.dataset_backup --restore             # upsert every candidate into Mongo
+    python -m services.dataset_backup --reindex             # re-vectorise every candidate
+"""
+
+import os
+import re
+import gzip
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from services.serialization import dumps, loads
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+DATASET_DIR = os.getenv("DATASET_DIR", "dataset")
+BACKUP_FLUSH_SECONDS = float(os.getenv("BACKUP_FLUSH_SECONDS", "2"))
+BACKUP_SEGMENT_MAX_BYTES = int(os.getenv("BACKUP_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024)))
+BACKUP_COMPACT_SEGMENTS = int(os.getenv("BACKUP_COMPACT_SEGMENTS", "8"))
+
+SEGMENT_RE = re.compile(r"^(segment|snapshot)-(\d{6})\.jsonl\.gz$")
+
+
+def _line(record: Dict[str, Any]) -> bytes:
+    return dumps(record) + b"\n"
+
+
+def _log_files(directory: Path) -> Tuple[Optional[Path], List[Path]]:
+    """Latest snapshot and the segments after it, in sequence order."""
+    snapshot, snapshot_seq = None, -1
+    segments = []
+    for path in directory.glob("*.jsonl.gz"):
+        match = SEGMENT_RE.match(path.name)
+        if not match:
+            continue
+        seq = int(match.group(2))
+        if match.group(1) == "snapshot" and seq > snapshot_seq:
+            snapshot, snapshot_seq = path, seq
+        elif match.group(1) == "segment":
+            segments.append((seq, path))
+    return snapshot, [path for seq, path in sorted(segments) if seq > snapshot_seq]
+
+
+def _read_records(path: Path) -> Iterator[Dict[str, Any]]:
+    with gzip.open(path, "rb") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield loads(line)
+            except ValueError:
+                # A crash mid-append can leave a torn last line
+                logger.warning(f"Skipping corrupt record {path.name}:{line_no}")
+
+
+def load_documents(directory: str = DATASET_DIR, segments: Optional[List[Path]] = None) -> Dict[str, Dict[str, Any]]:
+    """Latest document of every live candidate: the snapshot replayed with later segments."""
+    directory = Path(directory)
+    snapshot, later = _log_files(directory)
+    paths = ([snapshot] if snapshot else []) + (later if segments is None else segments)
+    documents: Dict[str, Dict[str, Any]] = {}
+    for path in paths:
+        try:
+            for record in _read_records(path):
+                if record.get("op") == "delete":
+                    documents.pop(record["id"], None)
+                else:
+                    documents[record["id"]] = record["doc"]
+        except EOFError:
+            # Truncated final gzip member (crash mid-flush)
+            logger.warning(f"Segment {path.name} is truncated; using the records before the cut")
+    return documents
+
+
+class DatasetBackup:
+    def __init__(self, directory: str = DATASET_DIR, flush_seconds: float = BACKUP_FLUSH_SECONDS,
+                 segment_max_bytes: int = BACKUP_SEGMENT_MAX_BYTES,
+                 compact_segments: int = BACKUP_COMPACT_SEGMENTS):
+        self.directory = Path(directory)
+        self.flush_seconds = flush_seconds
+        self.segment_max_bytes = segment_max_bytes
+        self.compact_segments = compact_segments
+        self._buffer: List[bytes] = []
+        self._lock = threading.Lock()
+        # Serialises file writes between the writer thread, close() and compact()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+        self.records_written = 0
+        self.flushes = 0
+        self.compactions = 0
+        self.last_error: Optional[str] = None
+
+    # --- request path (no I/O) ---
+
+    def _append(self, record: Dict[str, Any]):
+        line = _line(record)
+        with self._lock:
+            self._buffer.append(line)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="dataset-backup", daemon=True)
+                self._thread.start()
+
+    def record(self, candidate_id: str, doc: Dict[str, Any]):
+        self._append({"id": candidate_id, "op": "put", "ts": datetime.utcnow().isoformat() + "Z", "doc": doc})
+
+    def delete(self, candidate_id: str):
+        self._append({"id": candidate_id, "op": "delete", "ts": datetime.utcnow().isoformat() + "Z"})
+
+    # --- writer thread ---
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+                if len(_log_files(self.directory)[1]) > self.compact_segments:
+                    self.compact()
+            except Exception as e:
+                self.last_error = str(e)
+                logger.exception("Dataset backup flush failed; records stay buffered")
+
+    def _next_seq(self) -> int:
+        seqs = [int(m.group(2)) for p in self.directory.glob("*.jsonl.gz") if (m := SEGMENT_RE.match(p.name))]
+        return max(seqs, default=0) + 1
+
+    def _active_segment(self) -> Path:
+        _, segments = _log_files(self.directory)
+        if segments and segments[-1].stat().st_size < self.segment_max_bytes:
+            return segments[-1]
+        return self.directory / f"segment-{self._next_seq():06d}.jsonl.gz"
+
+    def flush(self) -> int:
+        """Append buffered records to the active segment; returns how many were written."""
+        with self._io_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+            if not lines:
+                return 0
+            try:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                # Each flush appends one gzip member; concatenated members read back as one stream
+                with gzip.open(self._active_segment(), "ab") as f:
+                    f.writelines(lines)
+            except Exception:
+                with self._lock:
+                    self._buffer[:0] = lines
+                raise
+            self.records_written += len(lines)
+            self.flushes += 1
+            return len(lines)
+
+    def compact(self, include_active: bool = False) -> int:
+        """Fold the snapshot and closed segments into a new snapshot; returns live documents."""
+        with self._io_lock:
+            snapshot, segments = _log_files(self.directory)
+            # The newest segment is still being appended to unless the app is stopped
+            closed = segments if include_active else segments[:-1]
+            if not closed:
+                return 0
+            documents = load_documents(self.directory, segments=closed)
+
+            seq = int(SEGMENT_RE.match(closed[-1].name).group(2))
+            target = self.directory / f"snapshot-{seq:06d}.jsonl.gz"
+            tmp = target.with_suffix(".tmp")
+            now = datetime.utcnow().isoformat() + "Z"
+            with gzip.open(tmp, "wb") as f:
+                for candidate_id, doc in documents.items():
+                    f.write(_line({"id": candidate_id, "op": "put", "ts": now, "doc": doc}))
+            os.replace(tmp, target)
+
+            for path in closed + ([snapshot] if snapshot else []):
+                path.unlink()
+            self.compactions += 1
+            logger.info(f"Compacted {len(closed)} segments into {target.name} ({len(documents)} candidates)")
+            return len(documents)
+
+    def close(self):
+        """Stop the writer thread and flush what is buffered."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self._stopping = False
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Final dataset backup flush failed")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buffered = len(self._buffer)
+        return {
+            "buffered": buffered,
+            "records_written": self.records_written,
+            "flushes": self.flushes,
+            "compactions": self.compactions,
+            "last_error": self.last_error,
+        }
+
+
+# Global instance
+dataset_backup = DatasetBackup()
+
+
+def import_legacy(backup: DatasetBackup) -> int:
+    """Append every old per-candidate <id>.json file to the segment log."""
+    count = 0
+    for path in sorted(backup.directory.glob("*.json")):
+        with open(path, encoding="utf-8") as f:
+            doc = json.load(f)
+        backup.record(str(doc.get("_id") or path.stem), doc)
+        count += 1
+    backup.flush()
+    return count
+
+
+def restore(documents: Dict[str, Dict[str, Any]], batch_size: int = 1000) -> int:
+    from pymongo import ReplaceOne
+    from services.db import sync_collections
+
+    ops = [ReplaceOne({"_id": cid}, {**doc, "_id": cid}, upsert=True) for cid, doc in documents.items()]
+    for start in range(0, len(ops), batch_size):
+        sync_collections.candidates.bulk_write(ops[start:start + batch_size], ordered=False)
+    return len(ops)
+
+
+def reindex(documents: Dict[str, Dict[str, Any]], workers: int = 8) -> int:
+    """Re-vectorise every candidate (vector ids are deterministic, so this overwrites in place)."""
+    from concurrent.futures import ThreadPoolExecutor
+    from services.vectoriser import pinecone_vectoriser
+
+    def _add(item):
+        candidate_id, doc = item
+        return pinecone_vectoriser.add_candidate(doc, candidate_id).get("success", False)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(pool.map(_add, documents.items()))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain and load the candidate dataset backup log.")
+    parser.add_argument("--dir", default=DATASET_DIR, help="Backup directory (default: DATASET_DIR)")
+    parser.add_argument("--import-legacy", action="store_true", help="Append old <id>.json files to the log")
+    parser.add_argument("--compact", action="store_true", help="Compact closed segments into a snapshot")
+    parser.add_argument("--all", action="store_true", help="With --compact, include the active segment (app stopped)")
+    parser.add_argument("--restore", action="store_true", help="Upsert every backed-up candidate into Mongo")
+    parser.add_argument("--reindex", action="store_true", help="Re-vectorise every backed-up candidate")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent vectorisations for --reindex")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    backup = DatasetBackup(args.dir)
+
+    if not (args.import_legacy or args.compact or args.restore or args.reindex):
+        parser.error("pass at least one of --import-legacy, --compact, --restore, --reindex")
+    if args.import_legacy:
+        print(f"Imported {import_legacy(backup)} legacy candidate files")
+    if args.compact:
+        print(f"Snapshot holds {backup.compact(include_active=args.all)} candidates")
+    if args.restore or args.reindex:
+        started = time.time()
+        documents = load_documents(args.dir)
+        print(f"Loaded {len(documents)} candidates in {time.time() - started:.2f}s")
+        if args.restore:
+            print(f"Restored {restore(documents)} candidates into Mongo")
+        if args.reindex:
+            print(f"Re-vectorised {reindex(documents, args.workers)} of {len(documents)} candidates")
+
+
+if __name__ == "__main__":
+    main()
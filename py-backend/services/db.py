@@ -0,0 +1,91 @@
+"""
+MongoDB connection and collection handles shared by the API, background jobs and CLIs
+
+- async_collections (motor): used by the FastAPI handlers so queries never block the event loop
+- sync_collections (pymongo): used by background tasks (thread pool) and CLIs
+
+Both clients keep their own connection pool, sized by MONGO_MAX_POOL_SIZE /
+MONGO_MIN_POOL_SIZE.
+"""
+
+import os
+import logging
+
+from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def sanitize_mongo_name(name: str) -> str:
+    """
+    Sanitize MongoDB database/collection names by replacing invalid characters.
+    MongoDB names cannot contain: '.', ' ', '/', '\\', or null character.
+    """
+    if not name:
+        return name
+    # Replace invalid characters with underscore
+    invalid_chars = ['.', ' ', '/', '\\', '\x00']
+    sanitized = name
+    for char in invalid_chars:
+        sanitized = sanitized.replace(char, '_')
+    # Remove leading/trailing underscores and ensure it's not empty
+    sanitized = sanitized.strip('_')
+    if not sanitized:
+        sanitized = "default"
+    return sanitized
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+MONGO_DB_RAW = os.getenv("MONGO_DB", "rag_ats")
+MONGO_DB = sanitize_mongo_name(MONGO_DB_RAW)
+MONGO_COL_RAW = os.getenv("MONGO_COL", "candidates")
+MONGO_COL = sanitize_mongo_name(MONGO_COL_RAW)
+
+# Log if sanitization occurred
+if MONGO_DB_RAW != MONGO_DB:
+    logger.warning(f"MongoDB database name sanitized from '{MONGO_DB_RAW}' to '{MONGO_DB}'")
+if MONGO_COL_RAW != MONGO_COL:
+    logger.warning(f"MongoDB collection name sanitized from '{MONGO_COL_RAW}' to '{MONGO_COL}'")
+
+MONGO_POOL_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+    "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "10000")),
+}
+
+
+class Collections:
+    """Named collection handles on one database (pymongo or motor)."""
+
+    def __init__(self, database):
+        self.candidates = database[MONGO_COL]
+        self.projects = database[sanitize_mongo_name(os.getenv("MONGO_PROJECT_COL", "projects"))]
+        self.evaluations = database[sanitize_mongo_name(os.getenv("MONGO_EVAL_COL", "evaluations"))]
+        self.applications = database[sanitize_mongo_name(os.getenv("MONGO_APP_COL", "applications"))]
+        self.matches = database[sanitize_mongo_name(os.getenv("MONGO_MATCH_COL", "matches"))]
+
+
+# Synchronous client: background jobs and CLIs
+client = MongoClient(MONGO_URI, **MONGO_POOL_OPTIONS)
+db = client[MONGO_DB]
+sync_collections = Collections(db)
+
+candidates_col = sync_collections.candidates
+projects_col = sync_collections.projects
+evaluations_col = sync_collections.evaluations
+applications_col = sync_collections.applications
+matches_col = sync_collections.matches
+
+# Async client: request handlers. Motor binds to the running event loop on first use.
+async_client = AsyncIOMotorClient(MONGO_URI, **MONGO_POOL_OPTIONS)
+async_db = async_client[MONGO_DB]
+async_collections = Collections(async_db)
+
+
+def close_clients():
+    async_client.close()
+    client.close()
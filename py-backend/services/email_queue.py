@@ -0,0 +1,236 @@
+"""
+Background Email Queue
+Outgoing mail is queued and sent by a few async workers, so requests don't
+wait on SMTP. Sends run on the smtp executor over pooled SMTP connections
+(STARTTLS + login once per connection, reused until idle for
+SMTP_IDLE_SECONDS). Transient failures (dropped connections, 4xx replies, a
+saturated executor) are retried with exponential backoff; 5xx replies fail the
+message immediately.
+
+Each submit() creates a job (services.jobs) that records per-recipient results.
+
+Configure with SMTP_HOST, SMTP_PORT, SMTP_USER, SMTP_PASSWORD, SENDER_EMAIL,
+EMAIL_QUEUE_WORKERS, EMAIL_QUEUE_MAX and EMAIL_MAX_ATTEMPTS.
+"""
+
+import os
+import time
+import queue
+import random
+import asyncio
+import smtplib
+import logging
+import threading
+from email.message import EmailMessage
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from dotenv import load_dotenv
+
+from services.executors import ExecutorSaturated, smtp_executor
+from services.jobs import Job, job_registry
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SENDER_EMAIL = os.getenv("SENDER_EMAIL", SMTP_USER)
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+# Servers drop idle sessions after a few minutes; reconnect rather than find out mid-send
+SMTP_IDLE_SECONDS = float(os.getenv("SMTP_IDLE_SECONDS", "120"))
+
+EMAIL_QUEUE_WORKERS = int(os.getenv("EMAIL_QUEUE_WORKERS", str(smtp_executor.max_workers)))
+EMAIL_QUEUE_MAX = int(os.getenv("EMAIL_QUEUE_MAX", "10000"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "4"))
+EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "1"))
+
+
+class OutgoingEmail(NamedTuple):
+    to: str
+    subject: str
+    html: str
+
+
+def smtp_configured() -> bool:
+    return bool(SMTP_HOST and SMTP_USER and SMTP_PASSWORD and SENDER_EMAIL)
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError, ExecutorSaturated))
+
+
+class SMTPPool:
+    """Thread-safe pool of logged-in SMTP connections."""
+
+    def __init__(self, host: Optional[str] = SMTP_HOST, port: int = SMTP_PORT, user: Optional[str] = SMTP_USER,
+                 password: Optional[str] = SMTP_PASSWORD, sender: Optional[str] = SENDER_EMAIL,
+                 idle_seconds: float = SMTP_IDLE_SECONDS):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.sender = sender
+        self.idle_seconds = idle_seconds
+        # (connection, last used) pairs; LIFO keeps the warmest connection in use
+        self._idle: "queue.LifoQueue[tuple]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        try:
+            connection.ehlo()
+            if connection.has_extn("starttls"):
+                connection.starttls()
+                connection.ehlo()
+            if self.user and self.password:
+                connection.login(self.user, self.password)
+        except Exception:
+            self._quit(connection)
+            raise
+        with self._lock:
+            self.connections_opened += 1
+        return connection
+
+    @staticmethod
+    def _quit(connection: smtplib.SMTP):
+        try:
+            connection.quit()
+        except Exception:
+            connection.close()
+
+    def _acquire(self) -> smtplib.SMTP:
+        while True:
+            try:
+                connection, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - last_used < self.idle_seconds:
+                return connection
+            self._quit(connection)
+
+    def _build(self, email: OutgoingEmail) -> EmailMessage:
+        message = EmailMessage()
+        message["Subject"] = email.subject
+        message["From"] = self.sender
+        message["To"] = email.to
+        message.set_content("This message requires an HTML-capable email client.")
+        message.add_alternative(email.html, subtype="html")
+        return message
+
+    def send(self, email: OutgoingEmail):
+        """Send one message on a pooled connection (blocking; run it on the smtp executor)."""
+        message = self._build(email)
+        connection = self._acquire()
+        try:
+            connection.send_message(message)
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException, OSError):
+            # The session may be unusable; don't return it to the pool
+            connection.close()
+            raise
+        except smtplib.SMTPRecipientsRefused:
+            connection.rset()
+            self._idle.put((connection, time.monotonic()))
+            raise
+        self._idle.put((connection, time.monotonic()))
+
+    def close(self):
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._quit(connection)
+
+
+class EmailQueue:
+    def __init__(self, pool: Optional[SMTPPool] = None, workers: int = EMAIL_QUEUE_WORKERS,
+                 max_queue: int = EMAIL_QUEUE_MAX, max_attempts: int = EMAIL_MAX_ATTEMPTS,
+                 retry_base: float = EMAIL_RETRY_BASE_SECONDS):
+        self.pool = pool or SMTPPool()
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+
+    def _ensure_workers(self):
+        # Created on first submit so they bind to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        for _ in range(self.workers - len(self._tasks)):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    def submit(self, emails: List[OutgoingEmail], kind: str = "email", **meta) -> Job:
+        """Queue messages as one job; raises 503 (Retry-After) when the queue is full."""
+        self._ensure_workers()
+        if self._queue.qsize() + len(emails) > self.max_queue:
+            raise ExecutorSaturated("email queue")
+        job = job_registry.create(kind, len(emails), **meta)
+        for email in emails:
+            self._queue.put_nowait((job, email))
+        return job
+
+    async def _worker(self):
+        while True:
+            job, email = await self._queue.get()
+            try:
+                await self._deliver(job, email)
+            except Exception as e:
+                logger.exception(f"Email worker failed on message to {email.to}")
+                job.record(email.to, ok=False, error=str(e))
+            finally:
+                self._queue.task_done()
+
+    async def _deliver(self, job: Job, email: OutgoingEmail):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                await smtp_executor.run_background(self.pool.send, email)
+            except Exception as e:
+                if attempt < self.max_attempts and _is_transient(e):
+                    self.retried += 1
+                    delay = self.retry_base * 2 ** (attempt - 1) * random.uniform(0.8, 1.2)
+                    logger.warning(f"Email to {email.to} failed ({e}); retry {attempt} in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                self.failed += 1
+                logger.error(f"Email to {email.to} failed after {attempt} attempt(s): {e}")
+                job.record(email.to, ok=False, error=str(e), attempts=attempt)
+                return
+            self.sent += 1
+            job.record(email.to, ok=True, attempts=attempt)
+            return
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len([task for task in self._tasks if not task.done()]),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "connections_opened": self.pool.connections_opened,
+        }
+
+    def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self.pool.close()
+
+
+# Global instance
+email_queue = EmailQueue()
@@ -0,0 +1,228 @@
+"""
+Bounded Executors for Blocking Work
+Each class of blocking dependency gets its own executor so one slow class
+(e.g. a burst of resume parses) cannot starve the others or the event loop:
+
+- openai:   LLM calls (resume parsing)                    -> thread pool
+- pinecone: vectorisation, retrieval, vector fetches      -> thread pool
+- pdf:      PDF text extraction (CPU-bound)                -> process pool
+- smtp:     outgoing email                                 -> thread pool
+
+Concurrency per executor is capped at its worker count; callers beyond that
+wait in a bounded queue, and once the queue is full the request is rejected
+with 503 + Retry-After instead of piling up. Queue depth, wait time and run
+time are tracked per executor.
+
+Background work (bulk parsing, the vectorization and email queues) submits
+with run_background(): it waits in its own queue, which is only served when no
+interactive request is waiting, and never counts against the interactive cap.
+
+Configure with EXECUTOR_<NAME>_WORKERS and EXECUTOR_<NAME>_QUEUE.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import functools
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturated(HTTPException):
+    """Raised when an executor's wait queue is full; surfaces as 503 with Retry-After."""
+
+    def __init__(self, name: str, retry_after: int = 5):
+        super().__init__(
+            status_code=503,
+            detail=f"Server busy ({name} capacity exhausted). Please retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+        self.executor_name = name
+
+
+class _PrioritySlots:
+    """Semaphore that wakes interactive waiters before background ones."""
+
+    def __init__(self, value: int):
+        self._value = value
+        self._interactive: deque = deque()
+        self._background: deque = deque()
+
+    def locked(self) -> bool:
+        return self._value == 0
+
+    async def acquire(self, background: bool = False):
+        if self._value > 0:
+            self._value -= 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        waiters = self._background if background else self._interactive
+        waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot as we were cancelled; pass it on
+                self.release()
+            else:
+                waiters.remove(waiter)
+            raise
+
+    def release(self):
+        # Slots are handed straight to the next waiter, interactive first
+        for waiters in (self._interactive, self._background):
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+        self._value += 1
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, max_workers: int, max_queue: int,
+                 use_processes: bool = False, retry_after: int = 5):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[_PrioritySlots] = None
+
+        self.queued = 0
+        self.background_queued = 0
+        self.running = 0
+        self.max_queue_depth = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.background_submitted = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        # Created on first use so importing this module doesn't spawn workers
+        if self._executor is None:
+            if self.use_processes:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on this executor; for process pools fn and args must be picklable."""
+        return await self._submit(False, fn, *args, **kwargs)
+
+    async def run_background(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Like run(), but yields the executor to any waiting interactive call."""
+        return await self._submit(True, fn, *args, **kwargs)
+
+    async def _submit(self, background: bool, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        if self._slots is None:
+            self._slots = _PrioritySlots(self.max_workers)
+        queued = self.background_queued if background else self.queued
+        if self._slots.locked() and queued >= self.max_queue:
+            self.rejected += 1
+            logger.warning(f"Executor '{self.name}' saturated: {self.running} running, "
+                           f"{self.queued} queued, {self.background_queued} background")
+            raise ExecutorSaturated(self.name, self.retry_after)
+
+        self.submitted += 1
+        if background:
+            self.background_submitted += 1
+            self.background_queued += 1
+        else:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        enqueued = time.perf_counter()
+        try:
+            await self._slots.acquire(background)
+        finally:
+            if background:
+                self.background_queued -= 1
+            else:
+                self.queued -= 1
+
+        started = time.perf_counter()
+        wait = started - enqueued
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.running += 1
+        try:
+            call = functools.partial(fn, *args, **kwargs)
+            result = await asyncio.get_running_loop().run_in_executor(self.executor, call)
+            self.completed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.running -= 1
+            self.total_run += time.perf_counter() - started
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        started = self.completed + self.failed
+        return {
+            "kind": "process" if self.use_processes else "thread",
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "background_queue_depth": self.background_queued,
+            "submitted": self.submitted,
+            "background_submitted": self.background_submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": self.total_wait / started * 1000 if started else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+            "avg_run_ms": self.total_run / started * 1000 if started else 0.0,
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def _bounded(name: str, workers: int, queue: int, use_processes: bool = False) -> BoundedExecutor:
+    prefix = f"EXECUTOR_{name.upper()}"
+    return BoundedExecutor(
+        name,
+        max_workers=int(os.getenv(f"{prefix}_WORKERS", str(workers))),
+        max_queue=int(os.getenv(f"{prefix}_QUEUE", str(queue))),
+        use_processes=use_processes,
+    )
+
+
+# Global instances
+openai_executor = _bounded("openai", workers=8, queue=32)
+pinecone_executor = _bounded("pinecone", workers=16, queue=64)
+pdf_executor = _bounded("pdf", workers=2, queue=16, use_processes=True)
+smtp_executor = _bounded("smtp", workers=4, queue=32)
+
+EXECUTORS = (openai_executor, pinecone_executor, pdf_executor, smtp_executor)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    return {executor.name: executor.stats() for executor in EXECUTORS}
+
+
+def shutdown_executors():
+    for executor in EXECUTORS:
+        executor.shutdown()
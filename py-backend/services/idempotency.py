@@ -0,0 +1,136 @@
+"""
+Idempotency Keys for Expensive Writes
+Clients send an `Idempotency-Key` header (any unique string, e.g. a UUID per
+logical request) on register-json, register-project and parse-resume. The
+first request with a key records it as in flight, runs the handler and stores
+the response for IDEMPOTENCY_TTL_SECONDS; a retry with the same key gets the
+stored response back (marked `Idempotent-Replayed: true`) without redoing the
+LLM / embedding work or creating another project and vector pair.
+
+- a retry while the original is still running waits for it in the same
+  process, and gets 409 + Retry-After from another worker
+- reusing a key for a different request body is rejected with 422
+- failed requests are not stored, so a retry runs again
+- keys are scoped per route and authenticated user (anonymous callers can't send one)
+
+In-flight records expire after IDEMPOTENCY_LOCK_SECONDS so a crashed worker
+cannot block a key forever. Set IDEMPOTENCY_CACHE_BACKEND=redis to share keys
+between API workers.
+"""
+
+import os
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from dotenv import load_dotenv
+
+from services.cache import create_cache
+from services.serialization import dumps, json_bytes_response, shape_like
+from services.single_flight import SingleFlight
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "300"))
+IDEMPOTENCY_CACHE_BACKEND = os.getenv("IDEMPOTENCY_CACHE_BACKEND")
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+IN_FLIGHT = "in_flight"
+COMPLETED = "completed"
+
+
+def fingerprint(request_body: Any) -> str:
+    """Stable hash of a request body (raw bytes, or JSON-able data with keys sorted)."""
+    raw = request_body if isinstance(request_body, bytes) else dumps(request_body, sort_keys=True)
+    return hashlib.sha256(raw).hexdigest()
+
+
+class IdempotencyStore:
+    def __init__(self, cache=None, ttl: int = IDEMPOTENCY_TTL_SECONDS, lock_ttl: int = IDEMPOTENCY_LOCK_SECONDS):
+        self.cache = cache or create_cache("idempotency", backend=IDEMPOTENCY_CACHE_BACKEND)
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        # Retries that reach this process while the original is running share its result
+        self._flights = SingleFlight("idempotency")
+
+        self.stored = 0
+        self.replayed = 0
+        self.conflicts = 0
+        self.mismatched = 0
+
+    async def run(self, scope: str, key: Optional[str], request_fingerprint: str,
+                  handler: Callable[[], Awaitable[Any]], model: Type[BaseModel], status_code: int = 200) -> Any:
+        """
+        Run handler() at most once per (scope, key). Without a key the handler's
+        result is returned as-is; with one, the (stored) JSON response is.
+        """
+        if key is None:
+            return await handler()
+        if not key or len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            raise HTTPException(status_code=400,
+                                detail=f"Idempotency-Key must be 1-{IDEMPOTENCY_KEY_MAX_LENGTH} characters")
+
+        store_key = f"{scope}:{key}"
+        status, body, replayed = await self._flights.do(
+            (store_key, request_fingerprint),
+            lambda: self._execute(store_key, request_fingerprint, handler, model, status_code),
+        )
+        return json_bytes_response(body, status_code=status,
+                                   headers={"Idempotent-Replayed": "true"} if replayed else None)
+
+    async def _execute(self, store_key: str, request_fingerprint: str, handler: Callable[[], Awaitable[Any]],
+                       model: Type[BaseModel], status_code: int) -> Tuple[int, bytes, bool]:
+        record = self.cache.get(store_key)
+        if record is None:
+            if not self.cache.add(store_key, {"state": IN_FLIGHT, "fingerprint": request_fingerprint},
+                                  ttl=self.lock_ttl):
+                # Another worker claimed the key in between
+                record = self.cache.get(store_key) or {"state": IN_FLIGHT, "fingerprint": request_fingerprint}
+
+        if record is not None:
+            if record["fingerprint"] != request_fingerprint:
+                self.mismatched += 1
+                raise HTTPException(status_code=422,
+                                    detail="Idempotency-Key was already used for a different request")
+            if record["state"] == IN_FLIGHT:
+                self.conflicts += 1
+                raise HTTPException(status_code=409,
+                                    detail="A request with this Idempotency-Key is still being processed",
+                                    headers={"Retry-After": "5"})
+            self.replayed += 1
+            return record["status_code"], record["body"], True
+
+        try:
+            result = await handler()
+        except BaseException:
+            # Not stored: a retry with the same key runs again
+            self.cache.delete(store_key)
+            raise
+        # Same field filtering response_model would apply
+        body = dumps(shape_like(model, result))
+        self.cache.set(store_key, {
+            "state": COMPLETED,
+            "fingerprint": request_fingerprint,
+            "status_code": status_code,
+            "body": body,
+        }, ttl=self.ttl)
+        self.stored += 1
+        return status_code, body, False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.cache.stats(),
+            "stored": self.stored,
+            "replayed": self.replayed,
+            "conflicts": self.conflicts,
+            "mismatched": self.mismatched,
+        }
+
+
+# Global instance
+idempotency_store = IdempotencyStore()
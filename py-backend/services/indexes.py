@@ -0,0 +1,148 @@
+"""
+MongoDB Index Manifest
+Every index the API relies on, declared in one place and applied at startup.
+HOT_QUERIES lists the filter/sort shapes the handlers and background jobs
+issue; the check command runs explain() on each and fails on a collection scan.
+
+Usage:
+    python -m services.indexes --apply
+    python -m services.indexes --check
+"""
+
+import sys
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+
+class IndexSpec(NamedTuple):
+    keys: List[Tuple[str, int]]
+    unique: bool = False
+
+
+# Collections attribute (services.db.Collections) -> indexes
+INDEX_MANIFEST: Dict[str, List[IndexSpec]] = {
+    "candidates": [
+        IndexSpec([("user_id", ASCENDING)]),
+        # Restart recovery of the vectorization queue
+        IndexSpec([("vector_status", ASCENDING)]),
+    ],
+    "projects": [
+        IndexSpec([("interviewer_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ],
+    "applications": [
+        # One application per user and project; apply_to_project upserts on it
+        IndexSpec([("user_id", ASCENDING), ("project_id", ASCENDING)], unique=True),
+        IndexSpec([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexSpec([("project_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        IndexSpec([("candidate_id", ASCENDING), ("project_id", ASCENDING)]),
+        IndexSpec([("project_id", ASCENDING), ("match.overall_score", DESCENDING), ("created_at", DESCENDING),
+                   ("_id", DESCENDING)]),
+        IndexSpec([("user_id", ASCENDING), ("match.overall_score", DESCENDING), ("created_at", DESCENDING),
+                   ("_id", DESCENDING)]),
+    ],
+    "matches": [
+        IndexSpec([("project_id", ASCENDING), ("overall_score", DESCENDING)]),
+        IndexSpec([("candidate_id", ASCENDING), ("project_overall_score", DESCENDING)]),
+    ],
+}
+
+# (collection attribute, filter, sort) for each hot query shape
+HOT_QUERIES: List[Tuple[str, Dict[str, Any], Optional[List[Tuple[str, int]]]]] = [
+    ("candidates", {"user_id": "u"}, None),
+    ("candidates", {"vector_status": "pending"}, None),
+    ("projects", {"interviewer_id": "u"}, None),
+    ("projects", {"interviewer_id": "u"}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("applications", {"user_id": "u", "project_id": "p"}, None),
+    ("applications", {"user_id": "u"}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("applications", {"user_id": "u"},
+     [("match.overall_score", DESCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("applications", {"project_id": "p"}, [("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("applications", {"project_id": "p"},
+     [("match.overall_score", DESCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+    ("applications", {"project_id": "p", "match": None}, None),
+    ("applications", {"candidate_id": "c", "project_id": "p"}, None),
+    ("applications", {"candidate_id": "c"}, None),
+    ("matches", {"project_id": "p", "overall_score": {"$gt": 0}}, [("overall_score", DESCENDING)]),
+    ("matches", {"candidate_id": "c", "project_overall_score": {"$gt": 0}}, [("project_overall_score", DESCENDING)]),
+]
+
+
+def _index_name(spec: IndexSpec) -> str:
+    return "_".join(f"{field}_{direction}" for field, direction in spec.keys)
+
+
+def apply_indexes(collections) -> int:
+    """Create every manifest index (idempotent). Returns the number of indexes that failed."""
+    failures = 0
+    for attribute, specs in INDEX_MANIFEST.items():
+        collection = getattr(collections, attribute)
+        for spec in specs:
+            try:
+                collection.create_index(spec.keys, name=_index_name(spec), unique=spec.unique)
+            except OperationFailure as e:
+                # e.g. duplicates blocking a unique index, or an existing index with other options
+                failures += 1
+                logger.error(f"Could not create index {_index_name(spec)} on {collection.name}: {e}")
+    return failures
+
+
+def _plan_stages(plan: Dict[str, Any]) -> List[str]:
+    stages = [plan.get("stage", "")]
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            stages.extend(_plan_stages(plan[child_key]))
+    for child in plan.get("inputStages", []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+
+def check_hot_queries(collections) -> List[str]:
+    """explain() every hot query; returns a description of each one that scans a collection."""
+    problems = []
+    for attribute, query, sort in HOT_QUERIES:
+        cursor = getattr(collections, attribute).find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning_plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        stages = _plan_stages(winning_plan)
+        label = f"{attribute} find({query})" + (f".sort({sort})" if sort else "")
+        if "COLLSCAN" in stages:
+            problems.append(f"{label}: COLLSCAN")
+        elif "SORT" in stages:
+            logger.warning(f"{label}: in-memory SORT")
+        logger.info(f"{label}: {' <- '.join(s for s in stages if s)}")
+    return problems
+
+
+def main():
+    import argparse
+
+    from services.db import sync_collections
+
+    parser = argparse.ArgumentParser(description="Apply the MongoDB index manifest and verify hot queries.")
+    parser.add_argument("--apply", action="store_true", help="Create missing indexes")
+    parser.add_argument("--check", action="store_true", help="Fail if any hot query does a collection scan")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    if not (args.apply or args.check):
+        parser.error("pass --apply and/or --check")
+    if args.apply and apply_indexes(sync_collections):
+        sys.exit(1)
+    if args.check:
+        problems = check_hot_queries(sync_collections)
+        for problem in problems:
+            print(f"FAIL {problem}")
+        if problems:
+            sys.exit(1)
+        print(f"OK: {len(HOT_QUERIES)} hot queries use indexes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Background Job Registry
+Tracks progress of work handed off by a request (bulk invites, bulk resume
+parsing) so the endpoint can return a job ID immediately and clients poll a
+status endpoint.
+
+Jobs live in process memory; the most recent JOB_HISTORY_SIZE are kept. Run a
+single worker process (or pin clients to one) if status polling must survive
+load balancing.
+"""
+
+import os
+import asyncio
+import logging
+from uuid import uuid4
+from datetime import datetime
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+JOB_HISTORY_SIZE = int(os.getenv("JOB_HISTORY_SIZE", "1000"))
+# Per-item results kept on a job (the counters are always exact)
+JOB_MAX_RESULTS = int(os.getenv("JOB_MAX_RESULTS", "1000"))
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat() + "Z"
+
+
+class Job:
+    def __init__(self, kind: str, total: int, meta: Optional[Dict[str, Any]] = None):
+        self.job_id = str(uuid4())
+        self.kind = kind
+        self.total = total
+        self.meta = meta or {}
+        self.succeeded = 0
+        self.failed = 0
+        self.results: List[Dict[str, Any]] = []
+        self.created_at = _now()
+        self.finished_at: Optional[str] = None
+        self._done = asyncio.Event()
+        if total == 0:
+            self._finish()
+
+    @property
+    def status(self) -> str:
+        if self.finished_at:
+            return "completed" if not self.failed else ("failed" if not self.succeeded else "partial")
+        return "running" if self.succeeded or self.failed else "queued"
+
+    def _finish(self):
+        self.finished_at = _now()
+        self._done.set()
+
+    def record(self, item: str, ok: bool, error: Optional[str] = None, **details):
+        """Record one item's outcome; the job finishes once every item is recorded."""
+        if ok:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        if len(self.results) < JOB_MAX_RESULTS:
+            result = {"item": item, "ok": ok, **details}
+            if error:
+                result["error"] = error
+            self.results.append(result)
+        if self.succeeded + self.failed >= self.total and not self.finished_at:
+            self._finish()
+
+    async def wait(self):
+        await self._done.wait()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "kind": self.kind,
+            "status": self.status,
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "pending": self.total - self.succeeded - self.failed,
+            "results": self.results,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            **self.meta,
+        }
+
+
+class JobRegistry:
+    def __init__(self, max_jobs: int = JOB_HISTORY_SIZE):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+
+    def create(self, kind: str, total: int, **meta) -> Job:
+        job = Job(kind, total, meta)
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        running = sum(1 for job in self._jobs.values() if not job.finished_at)
+        return {"tracked": len(self._jobs), "running": running}
+
+
+# Global instance
+job_registry = JobRegistry()
@@ -0,0 +1,239 @@
+"""
+Local Candidate <-> Project Match Scoring
+Fetches stored vectors from Pinecone by ID and scores them with matrix products,
+instead of issuing one similarity query per candidate or project.
+
+Scores mirror the retrieval pipelines:
+- professional / portfolio / skills: candidate vectors vs project description / skills
+  (CandidateRetrievalPipeline), fused as the mean of the non-zero components
+- description / skills: average of professional + portfolio vs project description,
+  and skills vs project skills (ProjectRetrievalPipeline), fused the same way
+"""
+
+import os
+import logging
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+
+import numpy as np
+from pinecone import Pinecone
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+FETCH_BATCH_SIZE = int(os.getenv("VECTOR_FETCH_BATCH_SIZE", "100"))
+
+# Candidate-side score components (as in CandidateRetrievalPipeline results)
+CANDIDATE_SCORE_COMPONENTS = ("overall_score", "professional_score", "project_score", "skills_score")
+
+# vector_ids key -> Pinecone index name
+CANDIDATE_VECTOR_INDEXES = {
+    "professional_summary": "professional-summary",
+    "project_portfolio": "project-portfolio",
+    "skills_matrix": "skills-matrix",
+}
+PROJECT_VECTOR_INDEXES = {
+    "project_description": "project-description",
+    "project_skills": "project-skills",
+}
+
+
+def fuse_scores(*components: np.ndarray) -> np.ndarray:
+    """Elementwise mean of the positive components (0.0 where none are positive)."""
+    stacked = np.stack(components)
+    positive = stacked > 0
+    counts = positive.sum(axis=0)
+    totals = np.where(positive, stacked, 0.0).sum(axis=0)
+    return np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+
+
+class VectorFetchError(Exception):
+    """A batch of stored vectors could not be fetched; scores built without it would read as 0."""
+
+
+class VectorMatrix:
+    """
+    Row-aligned, L2-normalised vectors for a list of documents (zero rows where missing).
+    `missing` holds the ids of documents whose vector_ids reference a vector the
+    index did not return; their rows would score 0 and should not be trusted.
+    """
+
+    def __init__(self, ids: List[str], matrices: Dict[str, np.ndarray], missing: Optional[Set[str]] = None):
+        self.ids = ids
+        self.matrices = matrices
+        self.missing = missing or set()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def slice(self, start: int, stop: int) -> "VectorMatrix":
+        ids = self.ids[start:stop]
+        return VectorMatrix(
+            ids,
+            {field: matrix[start:stop] for field, matrix in self.matrices.items()},
+            self.missing.intersection(ids),
+        )
+
+
+class MatchScorer:
+    def __init__(self):
+        self.pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+        self._indexes: Dict[str, Any] = {}
+
+    def _index(self, index_name: str):
+        if index_name not in self._indexes:
+            self._indexes[index_name] = self.pc.Index(index_name)
+        return self._indexes[index_name]
+
+    def fetch_vectors(self, index_name: str, vector_ids: Iterable[str],
+                      batch_size: int = FETCH_BATCH_SIZE) -> Dict[str, List[float]]:
+        """Fetch stored vectors by ID in batches; raises VectorFetchError if a batch fails"""
+        vector_ids = [v for v in vector_ids if v]
+        index = self._index(index_name)
+        vectors = {}
+        for start in range(0, len(vector_ids), batch_size):
+            batch = vector_ids[start:start + batch_size]
+            try:
+                result = index.fetch(ids=batch)
+            except Exception as e:
+                logger.error(f"Error fetching {len(batch)} vectors from {index_name}: {e}")
+                raise VectorFetchError(f"Failed to fetch {len(batch)} vectors from {index_name}") from e
+            for vector_id, vector_data in (result.vectors or {}).items():
+                if hasattr(vector_data, "values"):
+                    vectors[vector_id] = list(vector_data.values)
+                elif isinstance(vector_data, dict) and "values" in vector_data:
+                    vectors[vector_id] = list(vector_data["values"])
+        return vectors
+
+    def load_matrix(self, docs: List[Dict[str, Any]], index_names: Dict[str, str]) -> VectorMatrix:
+        """
+        Build one matrix per vector type for docs carrying a `vector_ids` mapping.
+        Rows are L2-normalised so dot products are cosine similarities.
+        Documents whose referenced vectors are absent from the index are reported in `missing`.
+        """
+        ids = [str(doc["_id"]) for doc in docs]
+        matrices = {}
+        missing = set()
+        for field, index_name in index_names.items():
+            wanted = [(doc.get("vector_ids") or {}).get(field) for doc in docs]
+            fetched = self.fetch_vectors(index_name, wanted)
+            dim = len(next(iter(fetched.values()))) if fetched else 0
+            matrix = np.zeros((len(docs), dim), dtype=np.float32)
+            for row, vector_id in enumerate(wanted):
+                if vector_id in fetched:
+                    matrix[row] = fetched[vector_id]
+                elif vector_id:
+                    missing.add(ids[row])
+            matrices[field] = _normalise_rows(matrix)
+        if missing:
+            logger.warning(f"{len(missing)} of {len(docs)} documents reference vectors missing from the index")
+        return VectorMatrix(ids, matrices, missing)
+
+    def load_candidates(self, candidate_docs: List[Dict[str, Any]]) -> VectorMatrix:
+        return self.load_matrix(candidate_docs, CANDIDATE_VECTOR_INDEXES)
+
+    def load_projects(self, project_docs: List[Dict[str, Any]]) -> VectorMatrix:
+        return self.load_matrix(project_docs, PROJECT_VECTOR_INDEXES)
+
+    def score_candidates_for_project(self, candidate_docs: List[Dict[str, Any]],
+                                     project_doc: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+        """
+        Score only the given candidates against one project, fetching just their
+        stored vectors by ID. Cost grows with len(candidate_docs), not the pool size.
+        Returns {candidate_id: {overall_score, professional_score, project_score, skills_score}};
+        candidates whose vectors are missing (or all of them, if the project's are) are left out.
+        Raises VectorFetchError if the vectors cannot be fetched.
+        """
+        candidate_docs = [doc for doc in candidate_docs if doc.get("vector_ids")]
+        if not candidate_docs or not project_doc.get("vector_ids"):
+            return {}
+        candidates = self.load_candidates(candidate_docs)
+        projects = self.load_projects([project_doc])
+        if projects.missing:
+            return {}
+        scores = self.score(candidates, projects)
+        return {
+            candidate_id: {c: float(scores[c][row, 0]) for c in CANDIDATE_SCORE_COMPONENTS}
+            for row, candidate_id in enumerate(candidates.ids)
+            if candidate_id not in candidates.missing
+        }
+
+    def score_projects_for_candidate(self, candidate_doc: Dict[str, Any],
+                                     project_docs: List[Dict[str, Any]]) -> Dict[str, Dict[str, float]]:
+        """
+        Score one candidate against the given projects only.
+        Returns {project_id: {overall_score, professional_score, project_score, skills_score}},
+        leaving out pairs with missing vectors like score_candidates_for_project.
+        """
+        project_docs = [doc for doc in project_docs if doc.get("vector_ids")]
+        if not project_docs or not candidate_doc.get("vector_ids"):
+            return {}
+        candidates = self.load_candidates([candidate_doc])
+        projects = self.load_projects(project_docs)
+        if candidates.missing:
+            return {}
+        scores = self.score(candidates, projects)
+        return {
+            project_id: {c: float(scores[c][0, col]) for c in CANDIDATE_SCORE_COMPONENTS}
+            for col, project_id in enumerate(projects.ids)
+            if project_id not in projects.missing
+        }
+
+    @staticmethod
+    def score(candidates: VectorMatrix, projects: VectorMatrix) -> Dict[str, np.ndarray]:
+        """
+        Score every candidate against every project.
+        Returns (n_candidates, n_projects) matrices keyed by component.
+        """
+        shape = (len(candidates), len(projects))
+        prof = candidates.matrices["professional_summary"]
+        portfolio = candidates.matrices["project_portfolio"]
+        skills = candidates.matrices["skills_matrix"]
+        proj_desc = projects.matrices["project_description"]
+        proj_skills = projects.matrices["project_skills"]
+
+        professional_score = _dot(prof, proj_desc, shape)
+        project_score = _dot(portfolio, proj_desc, shape)
+        skills_score = _dot(skills, proj_skills, shape)
+
+        # cos(avg(prof, portfolio), desc) from the two dot products
+        if prof.shape[1] and portfolio.shape[1]:
+            avg_norm = np.linalg.norm((prof + portfolio) / 2, axis=1)[:, None]
+            description_score = np.divide(
+                (professional_score + project_score) / 2, avg_norm,
+                out=np.zeros(shape, dtype=np.float32), where=avg_norm > 0
+            )
+        else:
+            description_score = np.maximum(professional_score, project_score)
+
+        return {
+            "professional_score": professional_score,
+            "project_score": project_score,
+            "skills_score": skills_score,
+            "overall_score": fuse_scores(professional_score, project_score, skills_score),
+            "description_score": description_score,
+            "project_overall_score": fuse_scores(description_score, skills_score),
+        }
+
+
+_scorer: Optional[MatchScorer] = None
+
+
+def get_match_scorer() -> MatchScorer:
+    """Shared scorer, created on first use so importing this module stays offline."""
+    global _scorer
+    if _scorer is None:
+        _scorer = MatchScorer()
+    return _scorer
+
+
+def _normalise_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+
+def _dot(a: np.ndarray, b: np.ndarray, shape: Tuple[int, int]) -> np.ndarray:
+    if not a.shape[1] or not b.shape[1]:
+        return np.zeros(shape, dtype=np.float32)
+    return a @ b.T
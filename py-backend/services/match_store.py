@@ -0,0 +1,293 @@
+"""
+Incrementally Maintained Project <-> Candidate Match Store
+One document per (project, candidate) pair holding the fused scores from
+services.match_scoring, kept fresh on every write:
+
+- candidate registered/updated -> only that candidate's row is recomputed
+- project registered/updated   -> only that project's column is recomputed
+- candidate/project deleted    -> its row/column is pruned
+
+Reads are indexed top-k queries (indexes declared in services.indexes):
+- ranked candidates for a project: (project_id, overall_score desc)
+- relevant projects for a candidate: (candidate_id, project_overall_score desc)
+
+The store is capped, not dense: a candidate's pass keeps its top
+MATCH_STORE_TOP_N projects (flagged `row_top`) and a project's pass its top
+MATCH_STORE_TOP_N candidates (`column_top`); a pair is deleted once neither
+side keeps it, so the store holds at most N x (candidates + projects) pairs.
+Top-k reads with k <= N are answered from the store, larger ones go live. Pairs
+that would only enter a top N after a partner's scores drop (or it is deleted)
+appear at the owner's next recompute.
+
+Once a row/column has been computed the source document is stamped with
+`matches_computed_at`; a replace of that document (an update) clears the stamp,
+so callers fall back to live retrieval until the recompute lands.
+
+A recompute whose vector fetch fails raises (VectorFetchError) before it prunes
+or stamps anything, and one whose own vectors are missing from the index is
+skipped; partners with missing vectors keep their existing pairs. Scores built
+from absent vectors read as 0 and would otherwise empty the row/column.
+
+Recomputes run on the pinecone executor's background lane (behind interactive
+retrieval) on the pymongo collections; the top-k reads are awaited from request
+handlers on the motor matches collection.
+"""
+
+import os
+import heapq
+import logging
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Iterator, Set, Tuple
+
+from pymongo import DESCENDING, UpdateOne
+from dotenv import load_dotenv
+
+from services.match_scoring import MatchScorer, VectorMatrix, get_match_scorer
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+MATCH_STORE_BATCH = int(os.getenv("MATCH_STORE_BATCH", "1000"))
+MATCH_STORE_MIN_SCORE = float(os.getenv("MATCH_STORE_MIN_SCORE", "0"))
+MATCH_STORE_TOP_N = int(os.getenv("MATCH_STORE_TOP_N", "100"))
+
+# Per-vector component scores stored on each match
+COMPONENT_SCORE_FIELDS = ("professional_score", "project_score", "skills_score")
+
+# Candidate metadata copied onto each match so ranked reads need no extra lookups
+CANDIDATE_FILTER_FIELDS = ("name", "seniority_level", "highest_education", "has_leadership")
+
+
+class MatchStore:
+    def __init__(self, matches_col, candidates_col, projects_col, async_matches_col=None):
+        self.matches_col = matches_col
+        self.candidates_col = candidates_col
+        self.projects_col = projects_col
+        self.async_matches_col = async_matches_col
+
+    @property
+    def scorer(self) -> MatchScorer:
+        return get_match_scorer()
+
+    def _batches(self, collection, projection: Dict[str, int]) -> Iterator[List[Dict[str, Any]]]:
+        batch = []
+        for doc in collection.find({"vector_ids": {"$exists": True}}, projection):
+            batch.append(doc)
+            if len(batch) >= MATCH_STORE_BATCH:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _candidate_info(candidate_doc: Dict[str, Any]) -> Dict[str, Any]:
+        metadata = candidate_doc.get("pinecone_metadata") or {}
+        info = {field: metadata.get(field) for field in CANDIDATE_FILTER_FIELDS}
+        info["name"] = info["name"] or candidate_doc.get("name") or "Unknown"
+        return info
+
+    def _pairs(self, candidates: VectorMatrix, projects: VectorMatrix,
+               candidate_info: Dict[str, Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Match fields for the pairs above MATCH_STORE_MIN_SCORE;
+        pairs with a side whose vectors are missing are left out.
+        """
+        scores = MatchScorer.score(candidates, projects)
+        for row, candidate_id in enumerate(candidates.ids):
+            if candidate_id in candidates.missing:
+                continue
+            for col, project_id in enumerate(projects.ids):
+                if project_id in projects.missing:
+                    continue
+                overall = float(scores["overall_score"][row, col])
+                project_overall = float(scores["project_overall_score"][row, col])
+                if max(overall, project_overall) <= MATCH_STORE_MIN_SCORE:
+                    continue
+                yield {
+                    "project_id": project_id,
+                    "candidate_id": candidate_id,
+                    **candidate_info.get(candidate_id, {}),
+                    "overall_score": overall,
+                    "professional_score": float(scores["professional_score"][row, col]),
+                    "project_score": float(scores["project_score"][row, col]),
+                    "skills_score": float(scores["skills_score"][row, col]),
+                    "project_overall_score": project_overall,
+                    "description_score": float(scores["description_score"][row, col]),
+                }
+
+    def _write_top(self, owner_field: str, owner_id: str, partner_field: str, flag: str, other_flag: str,
+                   score_field: str, scored_batches: Iterator[Tuple[VectorMatrix, Iterator[Dict[str, Any]]]],
+                   stamp: str) -> int:
+        """
+        Keep the owner's top MATCH_STORE_TOP_N partners by score_field (flagged
+        with `flag`), refresh the scores of its other pairs that the partner's
+        own pass keeps (`other_flag`), then prune the rest.
+        """
+        existing = {
+            doc[partner_field]: doc.get(other_flag, False)
+            for doc in self.matches_col.find({owner_field: owner_id}, {partner_field: 1, other_flag: 1})
+        }
+        top: List[Tuple[float, str, Dict[str, Any]]] = []
+        refreshed: Dict[str, Dict[str, Any]] = {}
+        scored, skipped = set(), set()
+        for partners, pairs in scored_batches:
+            for fields in pairs:
+                partner_id = fields[partner_field]
+                entry = (fields[score_field], partner_id, fields)
+                if len(top) < MATCH_STORE_TOP_N:
+                    heapq.heappush(top, entry)
+                else:
+                    heapq.heappushpop(top, entry)
+                if existing.get(partner_id):
+                    refreshed[partner_id] = fields
+            scored.update(set(partners.ids) - partners.missing)
+            # Not rescored: leave whatever pairs they have
+            skipped.update(partners.missing)
+
+        kept = {partner_id for _, partner_id, _ in top}
+        ops = [
+            UpdateOne({"_id": f"{fields['project_id']}:{fields['candidate_id']}"},
+                      {"$set": {**fields, flag: True, "updated_at": stamp}}, upsert=True)
+            for _, _, fields in top
+        ] + [
+            UpdateOne({"_id": f"{fields['project_id']}:{fields['candidate_id']}"},
+                      {"$set": {**fields, flag: False, "updated_at": stamp}})
+            for partner_id, fields in refreshed.items() if partner_id not in kept
+        ]
+        for start in range(0, len(ops), MATCH_STORE_BATCH):
+            self.matches_col.bulk_write(ops[start:start + MATCH_STORE_BATCH], ordered=False)
+
+        self._prune(owner_field, owner_id, partner_field, other_flag, scored,
+                    kept | set(refreshed) | skipped, stamp)
+        return len(kept)
+
+    def _prune(self, owner_field: str, owner_id: str, partner_field: str, other_flag: str,
+               scored: Set[str], kept: Set[str], stamp: str) -> int:
+        """
+        Delete this row/column's pairs that no longer qualify: partners scored in
+        this pass that fell below the threshold or out of the top N (unless the
+        partner's own pass keeps them), and partners this pass never saw (vectors
+        gone) whose pair predates it. A pair for an unseen partner written after
+        this pass started came from a concurrent recompute and is kept.
+        """
+        stale = [
+            doc[partner_field]
+            for doc in self.matches_col.find({owner_field: owner_id},
+                                             {partner_field: 1, other_flag: 1, "updated_at": 1})
+            if doc[partner_field] not in kept
+            and ((doc[partner_field] in scored and not doc.get(other_flag)) or doc.get("updated_at", "") < stamp)
+        ]
+        if stale:
+            self.matches_col.delete_many({owner_field: owner_id, partner_field: {"$in": stale}})
+        return len(stale)
+
+    def recompute_candidate(self, candidate_id: str) -> int:
+        """Recompute one candidate's row against every project."""
+        candidate_doc = self.candidates_col.find_one(
+            {"_id": candidate_id}, {"_id": 1, "vector_ids": 1, "pinecone_metadata": 1, "name": 1}
+        )
+        if not candidate_doc or not candidate_doc.get("vector_ids"):
+            logger.warning(f"Skipping match row for candidate {candidate_id}: no stored vectors")
+            return 0
+
+        stamp = datetime.utcnow().isoformat() + "Z"
+        candidates = self.scorer.load_candidates([candidate_doc])
+        if candidates.missing:
+            logger.warning(f"Skipping match row for candidate {candidate_id}: vectors missing from the index")
+            return 0
+        info = {candidate_id: self._candidate_info(candidate_doc)}
+
+        def scored_batches():
+            for batch in self._batches(self.projects_col, {"_id": 1, "vector_ids": 1}):
+                projects = self.scorer.load_projects(batch)
+                yield projects, self._pairs(candidates, projects, info)
+
+        written = self._write_top("candidate_id", candidate_id, "project_id", "row_top", "column_top",
+                                  "project_overall_score", scored_batches(), stamp)
+        self.candidates_col.update_one({"_id": candidate_id}, {"$set": {"matches_computed_at": stamp}})
+        logger.info(f"Recomputed match row for candidate {candidate_id}: {written} matches")
+        return written
+
+    def recompute_project(self, project_id: str) -> int:
+        """Recompute one project's column against every candidate."""
+        project_doc = self.projects_col.find_one({"_id": project_id}, {"_id": 1, "vector_ids": 1})
+        if not project_doc or not project_doc.get("vector_ids"):
+            logger.warning(f"Skipping match column for project {project_id}: no stored vectors")
+            return 0
+
+        stamp = datetime.utcnow().isoformat() + "Z"
+        projects = self.scorer.load_projects([project_doc])
+        if projects.missing:
+            logger.warning(f"Skipping match column for project {project_id}: vectors missing from the index")
+            return 0
+        projection = {"_id": 1, "vector_ids": 1, "pinecone_metadata": 1, "name": 1}
+
+        def scored_batches():
+            for batch in self._batches(self.candidates_col, projection):
+                info = {str(doc["_id"]): self._candidate_info(doc) for doc in batch}
+                candidates = self.scorer.load_candidates(batch)
+                yield candidates, self._pairs(candidates, projects, info)
+
+        written = self._write_top("project_id", project_id, "candidate_id", "column_top", "row_top",
+                                  "overall_score", scored_batches(), stamp)
+        self.projects_col.update_one({"_id": project_id}, {"$set": {"matches_computed_at": stamp}})
+        logger.info(f"Recomputed match column for project {project_id}: {written} matches")
+        return written
+
+    def remove_candidate(self, candidate_id: str):
+        self.matches_col.delete_many({"candidate_id": candidate_id})
+
+    def remove_project(self, project_id: str):
+        self.matches_col.delete_many({"project_id": project_id})
+
+    @staticmethod
+    def _candidates_query(project_id: str, filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        query = {"project_id": project_id, "overall_score": {"$gt": 0}}
+        for field, value in (filters or {}).items():
+            if value is not None:
+                query[field] = value
+        return query
+
+    async def top_candidates(self, project_id: str, top_k: int,
+                             filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Top-k candidates for a project; filters use the same keys as CandidateFilters."""
+        cursor = self.async_matches_col.find(
+            self._candidates_query(project_id, filters), {"_id": 0}
+        ).sort("overall_score", DESCENDING).limit(top_k)
+        return await cursor.to_list(length=top_k)
+
+    async def count_candidates(self, project_id: str,
+                               filters: Optional[Dict[str, Any]] = None) -> Dict[str, int]:
+        """
+        Candidates the store holds for a project: in total ("overall_score") and
+        per component score field, counting those with that component above 0.
+        """
+        pipeline = [
+            {"$match": self._candidates_query(project_id, filters)},
+            {"$group": {
+                "_id": None,
+                "overall_score": {"$sum": 1},
+                **{field: {"$sum": {"$cond": [{"$gt": [f"${field}", 0]}, 1, 0]}}
+                   for field in COMPONENT_SCORE_FIELDS},
+            }},
+        ]
+        rows = await self.async_matches_col.aggregate(pipeline).to_list(length=1)
+        counts = rows[0] if rows else {}
+        return {field: counts.get(field, 0) for field in ("overall_score",) + COMPONENT_SCORE_FIELDS}
+
+    async def top_projects(self, candidate_id: str, top_k: int) -> List[Dict[str, Any]]:
+        """Top-k projects for a candidate, shaped like ProjectRetrievalPipeline results."""
+        cursor = self.async_matches_col.find(
+            {"candidate_id": candidate_id, "project_overall_score": {"$gt": 0}},
+            {"_id": 0, "project_id": 1, "project_overall_score": 1, "description_score": 1, "skills_score": 1},
+        ).sort("project_overall_score", DESCENDING).limit(top_k)
+        return [
+            {
+                "project_id": doc["project_id"],
+                "overall_score": doc["project_overall_score"],
+                "description_score": doc["description_score"],
+                "skills_score": doc["skills_score"],
+            }
+            async for doc in cursor
+        ]
@@ -300,6 +300,8 @@ class CandidateResponse(BaseModel):
     success: bool
     candidate_id: Optional[str] = None
     vector_ids: Optional[Dict[str, str]] = None
+    # "pending" while the profile is being vectorized, then "ready" or "failed"
+    vector_status: Optional[str] = None
     message: Optional[str] = None
     candidate: Optional[Dict[str, Any]] = None
     
@@ -0,0 +1,143 @@
+"""
+Keyset (cursor) pagination and field projection helpers for list endpoints
+A page is requested with the opaque cursor returned by the previous page, which
+encodes the sort-key values of its last row. The next page is the rows strictly
+after that key in sort order, so each page is an indexed range scan regardless
+of depth (no skip).
+
+Sort specs must end with a unique field (normally _id) so the order is total.
+MongoDB orders null/missing below every value, which the filters account for.
+
+A `fields` query parameter (comma-separated) maps to a Mongo projection, so
+list endpoints only read and send what the client renders.
+
+Streamed (NDJSON) pages send one row per line; when a limit is given the last
+line is {"next_cursor": ...} (null on the last page), since the cursor is only
+known once the rows have been sent.
+"""
+
+import re
+import json
+import base64
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from services.serialization import dumps
+
+SortSpec = List[Tuple[str, int]]
+
+FIELD_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+
+def _get_path(doc: Dict[str, Any], path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def encode_cursor(doc: Dict[str, Any], sort: SortSpec) -> str:
+    values = [_get_path(doc, field) for field, _ in sort]
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode()).decode()
+
+
+def decode_cursor(cursor: str, sort: SortSpec) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def _after(field: str, direction: int, value: Any) -> Optional[Dict[str, Any]]:
+    """Filter for values of `field` strictly after `value` in the given direction."""
+    if direction < 0:
+        if value is None:
+            return None  # nothing sorts below null
+        return {"$or": [{field: {"$lt": value}}, {field: None}]}
+    if value is None:
+        return {field: {"$ne": None}}
+    return {field: {"$gt": value}}
+
+
+def keyset_filter(sort: SortSpec, values: List[Any]) -> Dict[str, Any]:
+    """Rows strictly after `values` for the sort spec, as a Mongo filter."""
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        after = _after(field, direction, values[i])
+        if after is None:
+            continue
+        equal_prefix = [{f: values[j]} for j, (f, _) in enumerate(sort[:i])]
+        branches.append({"$and": equal_prefix + [after]} if equal_prefix else after)
+    return {"$or": branches} if branches else {"_id": {"$exists": False}}
+
+
+def page_query(query: Dict[str, Any], sort: SortSpec, cursor: Optional[str]) -> Dict[str, Any]:
+    """Combine a base query with the keyset filter for `cursor` (if any)."""
+    if not cursor:
+        return query
+    return {"$and": [query, keyset_filter(sort, decode_cursor(cursor, sort))]}
+
+
+def next_cursor(rows: List[Dict[str, Any]], sort: SortSpec, limit: Optional[int]) -> Optional[str]:
+    """
+    Trim a page fetched with limit + 1 rows in place and return the cursor for the
+    following page, or None if this is the last page.
+    """
+    if limit is None or len(rows) <= limit:
+        return None
+    del rows[limit:]
+    return encode_cursor(rows[-1], sort)
+
+
+async def ndjson_page(docs, row: Callable[[Dict[str, Any]], Any], sort: SortSpec,
+                      limit: Optional[int]) -> AsyncIterator[bytes]:
+    """
+    NDJSON lines for a cursor fetched with limit + 1 rows: at most `limit` rows,
+    then the next_cursor record (only when paginating).
+    """
+    sent = 0
+    last = None
+    page_cursor = None
+    async for doc in docs:
+        if limit is not None and sent == limit:
+            page_cursor = encode_cursor(last, sort)
+            break
+        yield dumps(row(doc)) + b"\n"
+        last = doc
+        sent += 1
+    if limit is not None:
+        yield dumps({"next_cursor": page_cursor}) + b"\n"
+
+
+def parse_fields(fields: Optional[str], allowed: Optional[Iterable[str]] = None) -> Optional[List[str]]:
+    """Requested field names, or None when the parameter is absent; 400 on unknown/invalid names."""
+    if not fields:
+        return None
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    allowed = set(allowed) if allowed is not None else None
+    invalid = [f for f in names if not FIELD_NAME_RE.match(f) or (allowed is not None and f not in allowed)]
+    if invalid or not names:
+        detail = f"Invalid fields: {', '.join(invalid)}" if invalid else "fields is empty"
+        if allowed is not None:
+            detail += f". Allowed: {', '.join(sorted(allowed))}"
+        raise HTTPException(status_code=400, detail=detail)
+    return names
+
+
+def projection_for(fields: Optional[List[str]], required: Iterable[str] = (),
+                   exclude: Iterable[str] = ()) -> Dict[str, int]:
+    """
+    Inclusion projection for the requested fields plus `required` (sort keys, so
+    cursors can be built), or, without fields, an exclusion of `exclude`.
+    """
+    if fields is None:
+        return {field: 0 for field in exclude}
+    paths = list(dict.fromkeys([*fields, *required]))
+    # Mongo rejects a path together with its parent ("match" and "match.overall_score")
+    return {p: 1 for p in paths if not any(p.startswith(parent + ".") for parent in paths)}
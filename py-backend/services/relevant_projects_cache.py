@@ -0,0 +1,106 @@
+"""
+Per-candidate cache for ranked relevant-project results
+
+A candidate's relevant projects only change when their own profile changes or
+when a project is registered, updated, deleted or passes its deadline, so the
+ranked response is cached and invalidated on exactly those events:
+
+- candidate writes bump that candidate's version
+- project registration (or a change to description/skills/deadline) bumps a
+  global generation, since any candidate's ranking may change
+- project deletes or detail-only edits bump the versions of the candidates
+  whose cached lists contain that project (tracked in a reverse index)
+- entries expire no later than the earliest deadline among their projects
+
+Responses are stored serialized (JSON bytes) so a hit is sent as-is.
+"""
+
+import os
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+from services.cache import create_cache
+from services.serialization import dumps
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+RELEVANT_PROJECTS_CACHE_TTL = int(os.getenv("RELEVANT_PROJECTS_CACHE_TTL", "3600"))
+RELEVANT_PROJECTS_CACHE_BACKEND = os.getenv("RELEVANT_PROJECTS_CACHE_BACKEND")
+
+
+class RelevantProjectsCache:
+    def __init__(self, cache=None, ttl: int = RELEVANT_PROJECTS_CACHE_TTL):
+        self.cache = cache or create_cache("relevant_projects", backend=RELEVANT_PROJECTS_CACHE_BACKEND)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, candidate_id: str, top_k: int) -> str:
+        """
+        Build the cache key for a request. Take the key BEFORE computing the
+        result so an invalidation that lands mid-computation is not lost.
+        """
+        generation = self.cache.get_counter("generation")
+        version = self.cache.get_counter(f"candidate:{candidate_id}")
+        return f"result:{candidate_id}:{top_k}:g{generation}:v{version}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """The cached response body (JSON bytes), or None."""
+        value = self.cache.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, candidate_id: str, response: Dict[str, Any],
+            expires_at: Optional[datetime] = None) -> bytes:
+        """
+        Store a response; expires_at is the earliest deadline among its projects.
+        Returns the serialized body.
+        """
+        body = dumps(response)
+        ttl = float(self.ttl)
+        if expires_at is not None:
+            ttl = min(ttl, (expires_at - datetime.now(timezone.utc)).total_seconds())
+        if ttl <= 0:
+            return body
+
+        for project in response.get("projects", []):
+            project_id = project.get("project_id")
+            if project_id:
+                self.cache.add_to_set(f"project:{project_id}", candidate_id, ttl=self.ttl)
+        self.cache.set(key, body, ttl=ttl)
+        return body
+
+    def invalidate_candidate(self, candidate_id: str) -> None:
+        self.cache.incr(f"candidate:{candidate_id}")
+
+    def invalidate_project(self, project_id: str) -> None:
+        """Drop cached lists that contain this project."""
+        candidate_ids = self.cache.pop_set(f"project:{project_id}")
+        for candidate_id in candidate_ids:
+            self.invalidate_candidate(candidate_id)
+        if candidate_ids:
+            logger.info(f"Invalidated relevant-projects cache for {len(candidate_ids)} candidates (project {project_id})")
+
+    def invalidate_all(self) -> None:
+        self.cache.incr("generation")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            **self.cache.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# Global instance
+relevant_projects_cache = RelevantProjectsCache()
@@ -0,0 +1,182 @@
+"""
+Document Repositories with a Read-Through Cache
+Candidates, projects and applications are read by id from many endpoints;
+each repository serves those reads from a size- and TTL-bounded LRU and only
+falls through to Mongo (motor) on a miss.
+
+Writes made through a repository invalidate the document. Writes made
+elsewhere (background jobs on the sync client, raw updates) must call
+invalidate(). Invalidation bumps a per-document version that is part of the
+cache key, and the key is taken before the database read, so a read racing a
+write can never re-populate the old version.
+
+Use REPOSITORY_CACHE_BACKEND=redis to share the cache (and invalidations)
+across workers.
+"""
+
+import os
+import copy
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from dotenv import load_dotenv
+
+from services.cache import create_cache
+from services.db import async_collections
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+REPOSITORY_CACHE_TTL = int(os.getenv("REPOSITORY_CACHE_TTL", "300"))
+REPOSITORY_CACHE_SIZE = int(os.getenv("REPOSITORY_CACHE_SIZE", "5000"))
+REPOSITORY_CACHE_BACKEND = os.getenv("REPOSITORY_CACHE_BACKEND")
+
+
+class CachedRepository:
+    def __init__(self, collection, namespace: str, cache=None, ttl: int = REPOSITORY_CACHE_TTL):
+        self.collection = collection
+        self.cache = cache or create_cache(
+            namespace, backend=REPOSITORY_CACHE_BACKEND, max_entries=REPOSITORY_CACHE_SIZE
+        )
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, doc_id: str) -> str:
+        return f"doc:{doc_id}:v{self.cache.get_counter(f'doc:{doc_id}')}"
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        doc = self.cache.get(key)
+        if doc is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        # Cached documents are shared; callers get their own copy to mutate
+        return copy.deepcopy(doc)
+
+    def _store(self, key: str, doc: Dict[str, Any]) -> None:
+        self.cache.set(key, copy.deepcopy(doc), ttl=self.ttl)
+
+    async def get(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        key = self._key(doc_id)
+        doc = self._lookup(key)
+        if doc is None:
+            doc = await self.collection.find_one({"_id": doc_id})
+            if doc is not None:
+                self._store(key, doc)
+        return doc
+
+    async def get_many(self, doc_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Documents by id; all misses are fetched with one $in query."""
+        docs: Dict[str, Dict[str, Any]] = {}
+        missing: Dict[str, str] = {}
+        for doc_id in dict.fromkeys(doc_ids):
+            key = self._key(doc_id)
+            doc = self._lookup(key)
+            if doc is None:
+                missing[doc_id] = key
+            else:
+                docs[doc_id] = doc
+        if missing:
+            async for doc in self.collection.find({"_id": {"$in": list(missing)}}):
+                self._store(missing[doc["_id"]], doc)
+                docs[doc["_id"]] = doc
+        return docs
+
+    def invalidate(self, *doc_ids: str) -> None:
+        for doc_id in doc_ids:
+            if doc_id:
+                self.cache.incr(f"doc:{doc_id}")
+
+    async def insert(self, doc: Dict[str, Any]):
+        result = await self.collection.insert_one(doc)
+        self.invalidate(doc["_id"])
+        return result
+
+    async def replace(self, doc_id: str, doc: Dict[str, Any], upsert: bool = False):
+        result = await self.collection.replace_one({"_id": doc_id}, doc, upsert=upsert)
+        self.invalidate(doc_id)
+        return result
+
+    async def update(self, doc_id: str, update: Dict[str, Any], upsert: bool = False,
+                     where: Optional[Dict[str, Any]] = None):
+        """Update one document; `where` adds conditions to the _id filter."""
+        result = await self.collection.update_one({**(where or {}), "_id": doc_id}, update, upsert=upsert)
+        self.invalidate(doc_id)
+        return result
+
+    async def delete(self, doc_id: str):
+        result = await self.collection.delete_one({"_id": doc_id})
+        self.invalidate(doc_id)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            **self.cache.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+class CandidateRepository(CachedRepository):
+    """Candidates, also looked up by the owning user's id."""
+
+    def __init__(self, collection, cache=None, ttl: int = REPOSITORY_CACHE_TTL):
+        super().__init__(collection, "repo_candidates", cache=cache, ttl=ttl)
+
+    def _user_key(self, user_id: str) -> str:
+        return f"user:{user_id}:v{self.cache.get_counter(f'user:{user_id}')}"
+
+    async def get_by_user(self, user_id: str) -> Optional[Dict[str, Any]]:
+        user_key = self._user_key(user_id)
+        candidate_id = self.cache.get(user_key)
+        if candidate_id is not None:
+            doc = await self.get(candidate_id)
+            if doc is not None and doc.get("user_id") == user_id:
+                return doc
+        else:
+            self.misses += 1
+
+        doc = await self.collection.find_one({"user_id": user_id})
+        if doc is not None:
+            # The document's own key may already have moved on; only cache it under the current version
+            self.cache.set(user_key, doc["_id"], ttl=self.ttl)
+        return doc
+
+    def invalidate_user(self, *user_ids: Optional[str]) -> None:
+        for user_id in user_ids:
+            if user_id:
+                self.cache.incr(f"user:{user_id}")
+
+    async def insert(self, doc: Dict[str, Any]):
+        result = await super().insert(doc)
+        self.invalidate_user(doc.get("user_id"))
+        return result
+
+    async def delete(self, doc_id: str, user_id: Optional[str] = None):
+        result = await super().delete(doc_id)
+        self.invalidate_user(user_id)
+        return result
+
+
+class ProjectRepository(CachedRepository):
+    def __init__(self, collection, cache=None, ttl: int = REPOSITORY_CACHE_TTL):
+        super().__init__(collection, "repo_projects", cache=cache, ttl=ttl)
+
+
+class ApplicationRepository(CachedRepository):
+    def __init__(self, collection, cache=None, ttl: int = REPOSITORY_CACHE_TTL):
+        super().__init__(collection, "repo_applications", cache=cache, ttl=ttl)
+
+
+def repository_stats(*repositories: CachedRepository) -> Dict[str, Dict[str, Any]]:
+    return {repo.cache.namespace: repo.stats() for repo in repositories}
+
+
+# Global instances
+candidate_repo = CandidateRepository(async_collections.candidates)
+project_repo = ProjectRepository(async_collections.projects)
+application_repo = ApplicationRepository(async_collections.applications)
@@ -0,0 +1,84 @@
+"""
+ETag Response Cache for read endpoints
+Serialized response bodies (JSON bytes) are cached server-side with a strong
+ETag (hash of the bytes), so a hit is neither re-encoded nor re-hashed. A poll carrying a matching If-None-Match gets a 304 without a
+database read or a body.
+
+Entries are tagged (e.g. "candidate:<id>", "user:<id>", "project:<id>",
+"interviewer:<id>"); the current version of every tag is part of the cache key,
+so a write invalidates by bumping its tags' versions. Entries also expire after
+RESPONSE_CACHE_TTL seconds.
+"""
+
+import os
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from services.cache import create_cache
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "60"))
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND")
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison (weak comparison, as RFC 9110 requires for this header)."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+class ResponseCache:
+    def __init__(self, cache=None, ttl: int = RESPONSE_CACHE_TTL):
+        self.cache = cache or create_cache("responses", backend=RESPONSE_CACHE_BACKEND)
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def key_for(self, route: str, ident: str, tags: Iterable[str]) -> str:
+        """Take the key BEFORE reading the database so a concurrent write is not lost."""
+        versions = ",".join(f"{tag}={self.cache.get_counter(tag)}" for tag in tags)
+        return f"{route}:{ident}:{versions}"
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes, Dict[str, bytes]]]:
+        value = self.cache.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, etag: str, body: bytes, variants: Optional[Dict[str, bytes]] = None) -> None:
+        """variants: pre-compressed copies of body keyed by content encoding."""
+        self.cache.set(key, (etag, body, variants or {}), ttl=self.ttl)
+
+    def invalidate(self, *tags: Optional[str]) -> None:
+        for tag in tags:
+            if tag:
+                self.cache.incr(tag)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            **self.cache.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+# Global instance
+response_cache = ResponseCache()
@@ -0,0 +1,54 @@
+"""
+Fast JSON Serialization (orjson)
+FastJSONResponse is the app's default response class. Hot endpoints return it
+(or pre-serialized bytes via json_bytes_response) directly, which skips
+FastAPI's jsonable_encoder pass and response_model validation; response_model
+stays on those routes for the OpenAPI schema, and shape_like() applies the
+same field filtering without validating.
+"""
+
+from typing import Any, Dict, Optional, Type
+
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
+
+JSON_MEDIA_TYPE = "application/json"
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(obj: Any) -> Any:
+    # ObjectId, Decimal and anything else orjson doesn't know
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return str(obj)
+
+
+def dumps(obj: Any, sort_keys: bool = False) -> bytes:
+    option = ORJSON_OPTIONS | orjson.OPT_SORT_KEYS if sort_keys else ORJSON_OPTIONS
+    return orjson.dumps(obj, default=_default, option=option)
+
+
+loads = orjson.loads
+
+
+class FastJSONResponse(ORJSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def json_bytes_response(body: bytes, status_code: int = 200,
+                        headers: Optional[Dict[str, str]] = None) -> Response:
+    """Response for an already-serialized JSON body."""
+    return Response(content=body, status_code=status_code, headers=headers, media_type=JSON_MEDIA_TYPE)
+
+
+def shape_like(model: Type[BaseModel], item: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    The model's fields of `item` (defaults for the missing optional ones),
+    i.e. what response_model filtering returns, minus validation.
+    """
+    return {
+        name: item.get(name, None if field.is_required() else field.get_default(call_default_factory=True))
+        for name, field in model.model_fields.items()
+    }
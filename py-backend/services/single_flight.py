@@ -0,0 +1,63 @@
+"""
+Single-Flight Request Coalescing
+Concurrent requests with the same normalized key share one in-flight
+computation: the first caller runs it, later callers await the same task and
+get the same result (or the same exception). Nothing is kept once the
+computation finishes; this only removes duplicate work during bursts, caching
+stays with the response caches.
+
+    body = await ranking_flights.do(("project-1", filters_key, 100), build)
+
+The computation runs as its own task, so a caller disconnecting (and being
+cancelled) does not cancel it for the others.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn() unless an identical call is in flight, then share its result."""
+        self.calls += 1
+        task = self._flights.get(key)
+        if task is None:
+            task = asyncio.create_task(fn())
+            self._flights[key] = task
+            task.add_done_callback(lambda done, key=key: self._landed(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _landed(self, key: Hashable, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # Mark the exception retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._flights),
+        }
+
+
+# Global instances
+ranking_flights = SingleFlight("ranked_candidates")
+relevant_projects_flights = SingleFlight("relevant_projects")
+
+
+def single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    return {flight.name: flight.stats() for flight in (ranking_flights, relevant_projects_flights)}
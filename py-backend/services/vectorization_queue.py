@@ -0,0 +1,209 @@
+"""
+Write-Behind Candidate Vectorization Queue
+Registration stores the candidate with
+    vector_status: "pending", vector_request_id: <uuid>
+and enqueues it here instead of waiting on three embeddings and three Pinecone
+upserts. Workers vectorize on the pinecone executor (as background work, behind
+interactive retrieval) with exponential backoff,
+then set vector_ids / pinecone_metadata and vector_status "ready" (or "failed"
+with vector_error once retries are exhausted) and call on_change so the API
+can refresh match data and caches.
+
+The candidate document is read when the job runs, and the result is only
+written if vector_request_id still matches, so a re-registration while a job
+is queued supersedes it instead of racing it. Mongo is the durable record of
+pending work: requeue_pending() re-enqueues anything left pending by a restart.
+
+Configure with VECTORIZE_WORKERS, VECTORIZE_QUEUE_MAX and VECTORIZE_MAX_ATTEMPTS.
+"""
+
+import os
+import random
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from services.db import async_collections
+from services.executors import ExecutorSaturated, pinecone_executor
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+VECTORIZE_WORKERS = int(os.getenv("VECTORIZE_WORKERS", "4"))
+VECTORIZE_QUEUE_MAX = int(os.getenv("VECTORIZE_QUEUE_MAX", "10000"))
+VECTORIZE_MAX_ATTEMPTS = int(os.getenv("VECTORIZE_MAX_ATTEMPTS", "5"))
+VECTORIZE_RETRY_BASE_SECONDS = float(os.getenv("VECTORIZE_RETRY_BASE_SECONDS", "2"))
+
+VECTOR_PENDING = "pending"
+VECTOR_READY = "ready"
+VECTOR_FAILED = "failed"
+
+# Fields the queue manages; never part of the vectorized content
+QUEUE_FIELDS = ("vector_status", "vector_request_id", "vector_error", "vectorized_at")
+# Set by the server on candidate documents, never taken from a client payload
+MANAGED_FIELDS = ("_id", "user_id", "vector_ids", "pinecone_metadata", "matches_computed_at") + QUEUE_FIELDS
+
+
+def client_fields(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """A registration/update payload without the server-managed fields."""
+    return {k: v for k, v in payload.items() if k not in MANAGED_FIELDS}
+
+
+def pending_fields(request_id: str) -> Dict[str, Any]:
+    """Fields to store on a candidate document that is being (re)vectorized."""
+    return {"vector_status": VECTOR_PENDING, "vector_request_id": request_id}
+
+
+class VectorizationQueue:
+    def __init__(self, collection, vectorize: Callable[[Dict[str, Any], str], Dict[str, Any]],
+                 workers: int = VECTORIZE_WORKERS, max_queue: int = VECTORIZE_QUEUE_MAX,
+                 max_attempts: int = VECTORIZE_MAX_ATTEMPTS, retry_base: float = VECTORIZE_RETRY_BASE_SECONDS):
+        """
+        collection: motor candidates collection.
+        vectorize(candidate_doc, candidate_id): blocking, returns the vectoriser's result dict.
+        """
+        self.collection = collection
+        self.vectorize = vectorize
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        # Awaited with (candidate_id, status) after the document changed
+        self.on_change: Optional[Callable[[str, str], Awaitable[None]]] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+        self.enqueued = 0
+        self.ready = 0
+        self.failed = 0
+        self.retried = 0
+        self.superseded = 0
+
+    def _ensure_workers(self):
+        # Created on first use so they bind to the running event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        for _ in range(self.workers - len(self._tasks)):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    def check_capacity(self):
+        """Raise 503 (Retry-After) when the queue is full; call before storing a pending document."""
+        if self._queue is not None and self._queue.qsize() >= self.max_queue:
+            raise ExecutorSaturated("vectorization queue")
+
+    def enqueue(self, candidate_id: str, request_id: str):
+        """Queue a candidate whose document was stored with pending_fields(request_id)."""
+        self._ensure_workers()
+        self._queue.put_nowait((candidate_id, request_id))
+        self.enqueued += 1
+
+    async def requeue_pending(self) -> int:
+        """Enqueue every candidate still pending (e.g. after a restart)."""
+        count = 0
+        async for doc in self.collection.find({"vector_status": VECTOR_PENDING}, {"vector_request_id": 1}):
+            self.enqueue(doc["_id"], doc.get("vector_request_id"))
+            count += 1
+        if count:
+            logger.info(f"Re-queued {count} pending candidate vectorizations")
+        return count
+
+    async def _worker(self):
+        while True:
+            candidate_id, request_id = await self._queue.get()
+            try:
+                await self._process(candidate_id, request_id)
+            except Exception:
+                logger.exception(f"Vectorization worker failed on candidate {candidate_id}")
+            finally:
+                self._queue.task_done()
+
+    async def _current(self, candidate_id: str, request_id: str) -> Optional[Dict[str, Any]]:
+        doc = await self.collection.find_one({"_id": candidate_id, "vector_request_id": request_id})
+        if doc is None:
+            self.superseded += 1
+        return doc
+
+    async def _process(self, candidate_id: str, request_id: str):
+        doc = await self._current(candidate_id, request_id)
+        if doc is None:
+            return
+        content = {k: v for k, v in doc.items() if k not in QUEUE_FIELDS}
+
+        error = None
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                result = await pinecone_executor.run_background(self.vectorize, content, candidate_id)
+                if result.get("success"):
+                    await self._finish(candidate_id, request_id, {
+                        "vector_status": VECTOR_READY,
+                        "vector_ids": result["vector_ids"],
+                        "pinecone_metadata": result["metadata"],
+                        "vectorized_at": datetime.utcnow().isoformat() + "Z",
+                    }, unset={"vector_error": ""})
+                    return
+                error = result.get("error", "Unknown error")
+            except Exception as e:
+                error = str(e)
+            if attempt < self.max_attempts:
+                self.retried += 1
+                delay = self.retry_base * 2 ** (attempt - 1) * random.uniform(0.8, 1.2)
+                logger.warning(f"Vectorizing candidate {candidate_id} failed ({error}); retry {attempt} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                # A newer registration supersedes this job
+                if await self._current(candidate_id, request_id) is None:
+                    return
+
+        logger.error(f"Vectorizing candidate {candidate_id} failed after {self.max_attempts} attempts: {error}")
+        await self._finish(candidate_id, request_id, {"vector_status": VECTOR_FAILED, "vector_error": error})
+
+    async def _finish(self, candidate_id: str, request_id: str, fields: Dict[str, Any],
+                      unset: Optional[Dict[str, str]] = None):
+        update: Dict[str, Any] = {"$set": fields}
+        if unset:
+            update["$unset"] = unset
+        result = await self.collection.update_one({"_id": candidate_id, "vector_request_id": request_id}, update)
+        if not result.matched_count:
+            self.superseded += 1
+            return
+        status = fields["vector_status"]
+        if status == VECTOR_READY:
+            self.ready += 1
+        else:
+            self.failed += 1
+        if self.on_change:
+            try:
+                await self.on_change(candidate_id, status)
+            except Exception:
+                logger.exception(f"Vectorization on_change hook failed for candidate {candidate_id}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len([task for task in self._tasks if not task.done()]),
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue": self.max_queue,
+            "enqueued": self.enqueued,
+            "ready": self.ready,
+            "failed": self.failed,
+            "retried": self.retried,
+            "superseded": self.superseded,
+        }
+
+    def close(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+
+def _add_candidate(candidate_doc: Dict[str, Any], candidate_id: str) -> Dict[str, Any]:
+    # Imported on first use so importing this module stays offline
+    from services.vectoriser import pinecone_vectoriser
+    return pinecone_vectoriser.add_candidate(candidate_doc, candidate_id)
+
+
+# Global instance
+vectorization_queue = VectorizationQueue(async_collections.candidates, _add_candidate)
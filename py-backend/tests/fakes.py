@@ -0,0 +1,70 @@
+"""In-memory stand-ins for the Pinecone indexes and pymongo collections the services use."""
+
+from types import SimpleNamespace
+
+import services.match_scoring as match_scoring
+from services.match_scoring import MatchScorer
+
+
+class FakeIndex:
+    def __init__(self, vectors=None, fail=False):
+        self.vectors = vectors or {}
+        self.fail = fail
+
+    def fetch(self, ids):
+        if self.fail:
+            raise ConnectionError("index unavailable")
+
+        class Result:
+            vectors = {i: SimpleNamespace(values=self.vectors[i]) for i in ids if i in self.vectors}
+        return Result()
+
+
+class FakeCollection:
+    """Just enough of a pymongo collection for the match store and application scores."""
+
+    def __init__(self, *docs):
+        self.docs = {doc["_id"]: dict(doc) for doc in docs}
+
+    @staticmethod
+    def _matches(doc, query):
+        for field, condition in query.items():
+            if isinstance(condition, dict) and "$exists" in condition:
+                if (field in doc) != condition["$exists"]:
+                    return False
+            elif isinstance(condition, dict) and "$in" in condition:
+                if doc.get(field) not in condition["$in"]:
+                    return False
+            elif doc.get(field) != condition:
+                return False
+        return True
+
+    def find(self, query, projection=None):
+        return [dict(doc) for doc in self.docs.values() if self._matches(doc, query)]
+
+    def find_one(self, query, projection=None):
+        found = self.find(query)
+        return found[0] if found else None
+
+    def update_one(self, query, update, upsert=False):
+        for doc in self.docs.values():
+            if self._matches(doc, query):
+                doc.update(update["$set"])
+                return
+        if upsert:
+            self.docs[query["_id"]] = {"_id": query["_id"], **update["$set"]}
+
+    def bulk_write(self, ops, ordered=True):
+        for op in ops:
+            self.update_one(op._filter, op._doc, upsert=op._upsert)
+
+    def delete_many(self, query):
+        for doc_id in [i for i, doc in self.docs.items() if self._matches(doc, query)]:
+            del self.docs[doc_id]
+
+
+def use_indexes(monkeypatch, indexes):
+    """Make get_match_scorer() fetch from the given {index_name: FakeIndex}."""
+    scorer = MatchScorer.__new__(MatchScorer)
+    scorer._indexes = indexes
+    monkeypatch.setattr(match_scoring, "_scorer", scorer)
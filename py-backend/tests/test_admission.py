@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from services.admission import RouteLimiter
+from services.executors import ExecutorSaturated
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_sheds_once_running_and_queued_are_full():
+    async def scenario():
+        limiter = RouteLimiter("test", limit=1, max_queue=1, max_wait=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        with pytest.raises(ExecutorSaturated):
+            await limiter.acquire()
+
+        limiter.release()
+        await waiter
+        limiter.release()
+        return limiter
+
+    limiter = _run(scenario())
+    assert limiter.admitted == 2
+    assert limiter.rejected == 1
+    assert not limiter._slots.locked()
+
+
+def test_timed_out_wait_leaves_capacity_intact():
+    async def scenario():
+        limiter = RouteLimiter("test", limit=1, max_queue=4, max_wait=0.01)
+        await limiter.acquire()
+        with pytest.raises(ExecutorSaturated):
+            await limiter.acquire()
+        limiter.release()
+
+        await limiter.acquire()
+        limiter.release()
+        return limiter
+
+    limiter = _run(scenario())
+    assert limiter.timed_out == 1
+    assert limiter.queued == 0
+    assert not limiter._slots.locked()
+
+
+def test_cancelled_wait_leaves_capacity_intact():
+    async def scenario():
+        limiter = RouteLimiter("test", limit=1, max_queue=4, max_wait=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        limiter.release()
+        await asyncio.sleep(0)
+        return limiter
+
+    limiter = _run(scenario())
+    assert limiter.queued == 0
+    assert not limiter._slots.locked()
+
+
+def test_slot_granted_as_the_wait_is_abandoned_is_given_back():
+    async def scenario():
+        limiter = RouteLimiter("test", limit=1, max_queue=4)
+        limiter._slots = asyncio.Semaphore(1)
+        # The acquire completed before the timeout handling got to cancel it
+        acquire = asyncio.ensure_future(limiter._slots.acquire())
+        await asyncio.sleep(0)
+        assert acquire.done() and limiter._slots.locked()
+
+        limiter._abandon(acquire)
+        await asyncio.sleep(0)
+        return limiter
+
+    limiter = _run(scenario())
+    assert not limiter._slots.locked()
@@ -0,0 +1,75 @@
+import asyncio
+
+from services.application_counts import (
+    COUNTS_FIELD,
+    WHERE_COUNTED,
+    created_inc,
+    empty_counts,
+    fold_counts,
+    status_change_inc,
+)
+from services.cache import InMemoryCache
+from services.repositories import ProjectRepository
+
+
+class UpdateResult:
+    def __init__(self, matched_count):
+        self.matched_count = matched_count
+
+
+class FakeProjects:
+    """Just enough of a motor collection for counter updates: _id, $exists, $inc."""
+
+    def __init__(self, *docs):
+        self.docs = {doc["_id"]: doc for doc in docs}
+
+    def _matches(self, doc, query):
+        for field, condition in query.items():
+            if isinstance(condition, dict) and "$exists" in condition:
+                if (field in doc) != condition["$exists"]:
+                    return False
+            elif doc.get(field) != condition:
+                return False
+        return True
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.get(query["_id"])
+        if doc is None or not self._matches(doc, query):
+            return UpdateResult(0)
+        for path, delta in update.get("$inc", {}).items():
+            parent, _, leaf = path.partition(".")
+            counters = doc.setdefault(parent, {})
+            counters[leaf] = counters.get(leaf, 0) + delta
+        return UpdateResult(1)
+
+
+def _repo(*docs):
+    return ProjectRepository(FakeProjects(*docs), cache=InMemoryCache("test"))
+
+
+def test_apply_on_legacy_project_leaves_counts_to_backfill():
+    repo = _repo({"_id": "legacy"})
+
+    asyncio.run(repo.update("legacy", created_inc(), where=WHERE_COUNTED))
+    asyncio.run(repo.update("legacy", status_change_inc("applied", "shortlisted"), where=WHERE_COUNTED))
+
+    # No partial sub-document of deltas, so the backfill still picks it up
+    assert COUNTS_FIELD not in repo.collection.docs["legacy"]
+
+    rows = [{"_id": {"project_id": "legacy", "status": "shortlisted"}, "count": 1}]
+    backfilled = fold_counts(rows, ["legacy"])["legacy"]
+    assert backfilled["total"] == 1
+    assert backfilled["shortlisted"] == 1
+    assert backfilled["applied"] == 0
+
+
+def test_apply_on_counted_project_increments():
+    repo = _repo({"_id": "p1", COUNTS_FIELD: empty_counts()})
+
+    asyncio.run(repo.update("p1", created_inc(), where=WHERE_COUNTED))
+    asyncio.run(repo.update("p1", status_change_inc("applied", "hired"), where=WHERE_COUNTED))
+
+    counts = repo.collection.docs["p1"][COUNTS_FIELD]
+    assert counts["total"] == 1
+    assert counts["applied"] == 0
+    assert counts["hired"] == 1
@@ -0,0 +1,101 @@
+import pytest
+
+from fakes import FakeCollection, FakeIndex, use_indexes
+from services.application_scores import MATCH_UNAVAILABLE, ApplicationScores
+from services.match_scoring import VectorFetchError
+
+STORED = {"overall_score": 0.7, "professional_score": 0.7, "project_score": 0.7, "skills_score": 0.7,
+          "computed_at": "2000-01-01T00:00:00Z"}
+
+
+def _candidate(candidate_id):
+    return {"_id": candidate_id, "vector_ids": {
+        "professional_summary": f"{candidate_id}-prof",
+        "project_portfolio": f"{candidate_id}-port",
+        "skills_matrix": f"{candidate_id}-skills",
+    }}
+
+
+@pytest.fixture
+def indexes(monkeypatch):
+    indexes = {
+        "professional-summary": FakeIndex({"c1-prof": [1.0, 0.0], "c2-prof": [1.0, 0.0]}),
+        "project-portfolio": FakeIndex({"c1-port": [1.0, 0.0], "c2-port": [1.0, 0.0]}),
+        "skills-matrix": FakeIndex({"c1-skills": [1.0, 0.0], "c2-skills": [1.0, 0.0]}),
+        "project-description": FakeIndex({"p1-desc": [1.0, 0.0]}),
+        "project-skills": FakeIndex({"p1-skills": [1.0, 0.0]}),
+    }
+    use_indexes(monkeypatch, indexes)
+    return indexes
+
+
+@pytest.fixture
+def scores():
+    return ApplicationScores(
+        FakeCollection(
+            {"_id": "a1", "candidate_id": "c1", "project_id": "p1", "match": dict(STORED)},
+            {"_id": "a2", "candidate_id": "c2", "project_id": "p1", "match": dict(STORED)},
+        ),
+        FakeCollection(_candidate("c1"), _candidate("c2")),
+        FakeCollection({"_id": "p1", "vector_ids": {"project_description": "p1-desc", "project_skills": "p1-skills"}}),
+        FakeCollection(),
+    )
+
+
+def _match(scores, app_id):
+    return scores.applications_col.docs[app_id]["match"]
+
+
+def test_refresh_rescores_applications(indexes, scores):
+    assert scores.refresh_project("p1") == 2
+    assert _match(scores, "a1")["overall_score"] == pytest.approx(1.0)
+
+
+def test_failed_fetch_keeps_stored_scores(indexes, scores):
+    indexes["project-description"].fail = True
+
+    with pytest.raises(VectorFetchError):
+        scores.refresh_project("p1")
+    with pytest.raises(VectorFetchError):
+        scores.refresh_candidate("c1")
+
+    assert _match(scores, "a1") == STORED
+    assert _match(scores, "a2") == STORED
+
+
+def test_missing_vectors_keep_stored_score(indexes, scores):
+    del indexes["skills-matrix"].vectors["c2-skills"]
+
+    assert scores.refresh_project("p1") == 1
+
+    assert _match(scores, "a1")["overall_score"] == pytest.approx(1.0)
+    assert _match(scores, "a2") == STORED
+
+
+def test_compute_returns_none_when_fetch_fails(indexes, scores):
+    indexes["skills-matrix"].fail = True
+    project_doc = scores.projects_col.docs["p1"]
+
+    assert scores.compute(_candidate("c1"), project_doc) is None
+
+
+def test_backfill_marks_unscorable_applications_when_fetch_fails(indexes, scores):
+    indexes["project-skills"].fail = True
+    unscored = [{"_id": "a1", "candidate_id": "c1"}, {"_id": "a2", "candidate_id": "c2"}]
+
+    written = scores.refresh_applications(unscored, project_doc=scores.projects_col.docs["p1"],
+                                          mark_unavailable=True)
+
+    assert written == 2
+    assert _match(scores, "a1")["status"] == MATCH_UNAVAILABLE
+    assert _match(scores, "a2")["status"] == MATCH_UNAVAILABLE
+
+
+def test_backfill_marks_only_applications_with_missing_vectors(indexes, scores):
+    del indexes["professional-summary"].vectors["c2-prof"]
+    unscored = [{"_id": "a1", "candidate_id": "c1"}, {"_id": "a2", "candidate_id": "c2"}]
+
+    scores.refresh_applications(unscored, project_doc=scores.projects_col.docs["p1"], mark_unavailable=True)
+
+    assert _match(scores, "a1")["overall_score"] == pytest.approx(1.0)
+    assert _match(scores, "a2")["status"] == MATCH_UNAVAILABLE
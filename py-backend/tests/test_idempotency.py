@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+from services.cache import InMemoryCache
+from services.idempotency import IN_FLIGHT, IdempotencyStore, fingerprint
+
+
+class Created(BaseModel):
+    candidate_id: str
+
+
+class Handler:
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+
+    async def __call__(self):
+        self.calls += 1
+        if self.fail:
+            raise HTTPException(status_code=500, detail="upstream down")
+        return {"candidate_id": f"c{self.calls}", "internal": "not in the model"}
+
+
+def _store():
+    return IdempotencyStore(cache=InMemoryCache("test-idempotency"))
+
+
+def _run(store, key, body, handler):
+    return asyncio.run(store.run("register-json:u1", key, fingerprint(body), handler, Created, status_code=201))
+
+
+def test_retry_with_the_same_key_replays_the_stored_response():
+    store, handler = _store(), Handler()
+
+    first = _run(store, "k1", {"name": "Ada"}, handler)
+    retry = _run(store, "k1", {"name": "Ada"}, handler)
+
+    assert handler.calls == 1
+    assert first.status_code == retry.status_code == 201
+    assert json.loads(retry.body) == {"candidate_id": "c1"}
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint({"a": 1, "b": 2}) == fingerprint({"b": 2, "a": 1})
+
+
+def test_reusing_a_key_for_a_different_body_is_rejected():
+    store, handler = _store(), Handler()
+    _run(store, "k1", {"name": "Ada"}, handler)
+
+    with pytest.raises(HTTPException) as error:
+        _run(store, "k1", {"name": "Grace"}, handler)
+
+    assert error.value.status_code == 422
+    assert handler.calls == 1
+    assert store.mismatched == 1
+
+
+def test_failed_requests_are_not_stored():
+    store = _store()
+    with pytest.raises(HTTPException):
+        _run(store, "k1", {"name": "Ada"}, Handler(fail=True))
+
+    handler = Handler()
+    response = _run(store, "k1", {"name": "Ada"}, handler)
+
+    assert handler.calls == 1
+    assert json.loads(response.body) == {"candidate_id": "c1"}
+
+
+def test_key_in_flight_on_another_worker_gets_409():
+    store = _store()
+    body = {"name": "Ada"}
+    store.cache.set("register-json:u1:k1", {"state": IN_FLIGHT, "fingerprint": fingerprint(body)}, ttl=60)
+
+    with pytest.raises(HTTPException) as error:
+        _run(store, "k1", body, Handler())
+
+    assert error.value.status_code == 409
+    assert error.value.headers["Retry-After"]
+
+
+def test_without_a_key_the_handler_result_is_returned_as_is():
+    handler = Handler()
+
+    assert _run(_store(), None, {"name": "Ada"}, handler) == {"candidate_id": "c1", "internal": "not in the model"}
@@ -0,0 +1,146 @@
+import pytest
+
+import services.match_store as match_store
+from fakes import FakeCollection, FakeIndex, use_indexes
+from services.match_scoring import VectorFetchError
+from services.match_store import MatchStore
+
+
+def _candidate(candidate_id):
+    return {"_id": candidate_id, "name": candidate_id, "vector_ids": {
+        "professional_summary": f"{candidate_id}-prof",
+        "project_portfolio": f"{candidate_id}-port",
+        "skills_matrix": f"{candidate_id}-skills",
+    }}
+
+
+def _project(project_id):
+    return {"_id": project_id, "vector_ids": {"project_description": f"{project_id}-desc",
+                                              "project_skills": f"{project_id}-skills"}}
+
+
+def _pair(project_id, candidate_id, updated_at="2000-01-01T00:00:00Z"):
+    return {"_id": f"{project_id}:{candidate_id}", "project_id": project_id, "candidate_id": candidate_id,
+            "overall_score": 0.9, "project_overall_score": 0.9, "updated_at": updated_at}
+
+
+@pytest.fixture
+def indexes(monkeypatch):
+    """
+    Pinecone indexes by name: c1 points along x, p1 matches it, p2 is orthogonal;
+    c2 and p4 sit in between (c1 x p4 = c2 x p1 = 0.6).
+    """
+    candidates = {"c1": [1.0, 0.0], "c2": [0.6, 0.8]}
+    projects = {"p1": [1.0, 0.0], "p2": [0.0, 1.0], "p4": [0.6, 0.8]}
+    indexes = {
+        name: FakeIndex({f"{c}-{suffix}": v for c, v in candidates.items()})
+        for name, suffix in (("professional-summary", "prof"), ("project-portfolio", "port"),
+                             ("skills-matrix", "skills"))
+    }
+    indexes.update({
+        name: FakeIndex({f"{p}-{suffix}": v for p, v in projects.items()})
+        for name, suffix in (("project-description", "desc"), ("project-skills", "skills"))
+    })
+    use_indexes(monkeypatch, indexes)
+    return indexes
+
+
+def _store(*pairs, projects=("p1", "p2"), candidates=("c1",)):
+    return MatchStore(
+        FakeCollection(*pairs),
+        FakeCollection(*[_candidate(c) for c in candidates]),
+        FakeCollection(*[_project(p) for p in projects]),
+    )
+
+
+def test_recompute_prunes_pairs_that_no_longer_qualify_and_stamps(indexes):
+    store = _store(_pair("p1", "c1"), _pair("p2", "c1"))
+
+    assert store.recompute_candidate("c1") == 1
+
+    assert set(store.matches_col.docs) == {"p1:c1"}
+    assert store.matches_col.docs["p1:c1"]["overall_score"] == pytest.approx(1.0)
+    assert store.candidates_col.docs["c1"]["matches_computed_at"]
+
+
+def test_prune_keeps_pairs_written_by_a_concurrent_recompute(indexes):
+    # p3 was not part of this pass, but its column was recomputed after the pass started
+    store = _store(_pair("p3", "c1", updated_at="9999-01-01T00:00:00Z"))
+
+    store.recompute_candidate("c1")
+
+    assert "p3:c1" in store.matches_col.docs
+
+
+def test_failed_fetch_aborts_without_pruning_or_stamping(indexes):
+    indexes["project-description"].fail = True
+    store = _store(_pair("p1", "c1"), _pair("p2", "c1"))
+
+    with pytest.raises(VectorFetchError):
+        store.recompute_candidate("c1")
+
+    assert set(store.matches_col.docs) == {"p1:c1", "p2:c1"}
+    assert "matches_computed_at" not in store.candidates_col.docs["c1"]
+
+
+def test_failed_fetch_leaves_project_column_alone(indexes):
+    indexes["skills-matrix"].fail = True
+    store = _store(_pair("p1", "c1"))
+
+    with pytest.raises(VectorFetchError):
+        store.recompute_project("p1")
+
+    assert set(store.matches_col.docs) == {"p1:c1"}
+    assert "matches_computed_at" not in store.projects_col.docs["p1"]
+
+
+def test_partner_with_missing_vectors_keeps_its_pair(indexes):
+    del indexes["project-description"].vectors["p2-desc"]
+    store = _store(_pair("p2", "c1"))
+
+    store.recompute_candidate("c1")
+
+    assert store.matches_col.docs["p2:c1"]["overall_score"] == 0.9
+    assert "p1:c1" in store.matches_col.docs
+
+
+def test_own_vectors_missing_skips_the_recompute(indexes):
+    del indexes["skills-matrix"].vectors["c1-skills"]
+    store = _store(_pair("p1", "c1"), _pair("p2", "c1"))
+
+    assert store.recompute_candidate("c1") == 0
+
+    assert set(store.matches_col.docs) == {"p1:c1", "p2:c1"}
+    assert "matches_computed_at" not in store.candidates_col.docs["c1"]
+
+
+def test_row_keeps_only_the_top_n_projects(indexes, monkeypatch):
+    monkeypatch.setattr(match_store, "MATCH_STORE_TOP_N", 1)
+    store = _store(_pair("p4", "c1"), projects=("p1", "p4"))
+
+    assert store.recompute_candidate("c1") == 1
+
+    assert set(store.matches_col.docs) == {"p1:c1"}
+    assert store.matches_col.docs["p1:c1"]["row_top"] is True
+
+
+def test_pair_kept_by_the_other_side_is_refreshed_not_pruned(indexes, monkeypatch):
+    monkeypatch.setattr(match_store, "MATCH_STORE_TOP_N", 1)
+    store = _store({**_pair("p4", "c1"), "column_top": True}, projects=("p1", "p4"))
+
+    store.recompute_candidate("c1")
+
+    assert set(store.matches_col.docs) == {"p1:c1", "p4:c1"}
+    assert store.matches_col.docs["p4:c1"]["row_top"] is False
+    assert store.matches_col.docs["p4:c1"]["project_overall_score"] == pytest.approx(0.6)
+
+
+def test_column_keeps_only_the_top_n_candidates(indexes, monkeypatch):
+    monkeypatch.setattr(match_store, "MATCH_STORE_TOP_N", 1)
+    store = _store(projects=("p1",), candidates=("c1", "c2"))
+
+    assert store.recompute_project("p1") == 1
+
+    assert set(store.matches_col.docs) == {"p1:c1"}
+    assert store.matches_col.docs["p1:c1"]["column_top"] is True
+    assert store.projects_col.docs["p1"]["matches_computed_at"]
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+from services.pagination import encode_cursor, ndjson_page, next_cursor, page_query
+
+SORT = [("created_at", -1), ("_id", -1)]
+
+
+def _compare(value, op, other):
+    # Mongo orders null/missing below every value
+    key = (value is not None, value)
+    other_key = (other is not None, other)
+    return {"$lt": key < other_key, "$gt": key > other_key, "$ne": value != other}[op]
+
+
+def _matches(doc, query):
+    """Evaluate the $and/$or/$lt/$gt/$ne filters page_query builds."""
+    for field, condition in query.items():
+        if field == "$and":
+            if not all(_matches(doc, q) for q in condition):
+                return False
+        elif field == "$or":
+            if not any(_matches(doc, q) for q in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not all(_compare(doc.get(field), op, value) for op, value in condition.items()):
+                return False
+        elif doc.get(field) != condition:
+            return False
+    return True
+
+
+DOCS = [
+    {"_id": "a", "created_at": "2024-01-03"},
+    {"_id": "b", "created_at": "2024-01-02"},
+    {"_id": "c", "created_at": "2024-01-02"},
+    {"_id": "d", "created_at": None},
+    {"_id": "e", "created_at": None},
+]
+
+
+def _find(query, limit):
+    rows = [doc for doc in DOCS if _matches(doc, query)]
+    rows.sort(key=lambda d: (d["created_at"] is not None, d["created_at"] or "", d["_id"]), reverse=True)
+    return rows[:limit + 1]
+
+
+class AsyncCursor:
+    def __init__(self, docs):
+        self.docs = list(docs)
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for doc in self.docs:
+            yield doc
+
+
+def _stream(docs, limit):
+    async def collect():
+        return [json.loads(line) async for line in ndjson_page(AsyncCursor(docs), dict, SORT, limit)]
+    return asyncio.run(collect())
+
+
+def test_keyset_pages_visit_every_row_once():
+    seen, cursor = [], None
+    while True:
+        rows = _find(page_query({}, SORT, cursor), limit=2)
+        cursor = next_cursor(rows, SORT, 2)
+        seen += [row["_id"] for row in rows]
+        if cursor is None:
+            break
+    assert seen == ["a", "c", "b", "e", "d"]
+
+
+def test_ndjson_page_sends_limit_rows_then_next_cursor():
+    lines = _stream(_find({}, limit=2), limit=2)
+
+    assert [line["_id"] for line in lines[:-1]] == ["a", "c"]
+    assert lines[-1] == {"next_cursor": encode_cursor(DOCS[2], SORT)}
+
+
+def test_ndjson_pages_match_json_pages():
+    streamed, cursor = [], None
+    while True:
+        lines = _stream(_find(page_query({}, SORT, cursor), limit=2), limit=2)
+        streamed += [line["_id"] for line in lines[:-1]]
+        cursor = lines[-1]["next_cursor"]
+        if cursor is None:
+            break
+    assert streamed == ["a", "c", "b", "e", "d"]
+
+
+def test_ndjson_without_limit_streams_everything_without_cursor_record():
+    lines = _stream(DOCS, limit=None)
+
+    assert [line["_id"] for line in lines] == [doc["_id"] for doc in DOCS]
@@ -0,0 +1,112 @@
+import asyncio
+
+from services.vectorization_queue import (
+    VECTOR_PENDING,
+    VECTOR_READY,
+    VectorizationQueue,
+    client_fields,
+    pending_fields,
+)
+
+
+class UpdateResult:
+    def __init__(self, matched_count):
+        self.matched_count = matched_count
+
+
+class FakeCandidates:
+    """Just enough of a motor collection for the queue: find_one and update_one by _id + request id."""
+
+    def __init__(self, *docs):
+        self.docs = {doc["_id"]: dict(doc) for doc in docs}
+
+    def _find(self, query):
+        doc = self.docs.get(query["_id"])
+        if doc is None or any(doc.get(field) != value for field, value in query.items()):
+            return None
+        return doc
+
+    async def find_one(self, query):
+        doc = self._find(query)
+        return dict(doc) if doc else None
+
+    async def update_one(self, query, update):
+        doc = self._find(query)
+        if doc is None:
+            return UpdateResult(0)
+        doc.update(update.get("$set", {}))
+        for field in update.get("$unset", {}):
+            doc.pop(field, None)
+        return UpdateResult(1)
+
+
+def _queue(collection, vectorize):
+    changes = []
+
+    async def on_change(candidate_id, status):
+        changes.append((candidate_id, status))
+
+    queue = VectorizationQueue(collection, vectorize, max_attempts=1)
+    queue.on_change = on_change
+    return queue, changes
+
+
+def _vectorized(doc, candidate_id):
+    return {"success": True, "vector_ids": {"skills_matrix": f"{candidate_id}-skills"}, "metadata": {}}
+
+
+def test_job_marks_the_candidate_ready():
+    collection = FakeCandidates({"_id": "c1", "name": "Ada", **pending_fields("r1")})
+    queue, changes = _queue(collection, _vectorized)
+
+    asyncio.run(queue._process("c1", "r1"))
+
+    assert collection.docs["c1"]["vector_status"] == VECTOR_READY
+    assert collection.docs["c1"]["vector_ids"] == {"skills_matrix": "c1-skills"}
+    assert changes == [("c1", VECTOR_READY)]
+
+
+def test_reregistration_before_the_job_runs_supersedes_it():
+    collection = FakeCandidates({"_id": "c1", **pending_fields("r2")})
+    calls = []
+    queue, changes = _queue(collection, lambda doc, candidate_id: calls.append(candidate_id))
+
+    asyncio.run(queue._process("c1", "r1"))
+
+    assert calls == []
+    assert queue.superseded == 1
+    assert changes == []
+
+
+def test_reregistration_while_vectorizing_discards_the_stale_result():
+    collection = FakeCandidates({"_id": "c1", **pending_fields("r1")})
+
+    def vectorize(doc, candidate_id):
+        # The candidate re-registers while this job's embeddings are running
+        collection.docs["c1"].update(pending_fields("r2"))
+        return _vectorized(doc, candidate_id)
+
+    queue, changes = _queue(collection, vectorize)
+
+    asyncio.run(queue._process("c1", "r1"))
+
+    assert collection.docs["c1"]["vector_status"] == VECTOR_PENDING
+    assert collection.docs["c1"]["vector_request_id"] == "r2"
+    assert "vector_ids" not in collection.docs["c1"]
+    assert queue.superseded == 1
+    assert changes == []
+
+
+def test_client_fields_drops_server_managed_fields():
+    payload = {
+        "name": "Ada",
+        "_id": "other",
+        "user_id": "someone-else",
+        "vector_status": "ready",
+        "vector_request_id": "r1",
+        "vector_ids": {"skills_matrix": "not-mine"},
+        "pinecone_metadata": {},
+        "matches_computed_at": "2000-01-01T00:00:00Z",
+    }
+
+    assert client_fields(payload) == {"name": "Ada"}